@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 import environ
 
@@ -59,6 +60,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'nba_stats.timing.TimingMiddleware',
 ]
 
 ROOT_URLCONF = 'cs412.urls'
@@ -86,6 +88,14 @@ DATABASES = {
     'default': env.db('DATABASE_URL', default='sqlite:///db.sqlite3')
 }
 
+# Cache for rendered season table fragments, season rows and career charts (and for career stats when
+# NBA_STATS_CAREER_CACHE['BACKEND'] is 'django'). The default file cache is shared by every gunicorn
+# worker on a machine. Set CACHE_URL to share it between machines too, e.g. rediscache://host:6379/0 or
+# dbcache://nba_stats_cache (after `manage.py createcachetable`). locmemcache:// makes it per worker.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='filecache://' + os.path.join(BASE_DIR, 'cache', 'django'))
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -151,3 +161,96 @@ else:
     # Development-specific settings
     ALLOWED_HOSTS = ['localhost', '127.0.0.1']
     SECURE_SSL_REDIRECT = False
+
+# Career stats cache used by nba_stats.player_details.
+# BACKEND is one of 'database', 'django' (uses CACHES[CACHE_ALIAS]), 'file' (JSON files in FILE_DIR)
+# or a dotted path to a custom backend class. TTLs are in seconds. With STALE_WHILE_REVALIDATE, entries
+# up to MAX_STALENESS seconds past their TTL are served immediately and refreshed in the background.
+NBA_STATS_CAREER_CACHE = {
+    'BACKEND': env('NBA_STATS_CACHE_BACKEND', default='database'),
+    'CACHE_ALIAS': 'default',
+    'FILE_DIR': os.path.join(BASE_DIR, 'cache', 'career_stats'),
+    'ACTIVE_TTL': 60 * 60 * 6,
+    'RETIRED_TTL': 60 * 60 * 24 * 365,
+    'STALE_WHILE_REVALIDATE': True,
+    'MAX_STALENESS': 60 * 60 * 24,
+}
+
+# Player name/headshot store (PlayerHeadShot). Rows are re-scraped from nba.com after these many days;
+# placeholder rows (no headshot found) are retried sooner.
+NBA_STATS_HEADSHOT_REFRESH_DAYS = 30
+NBA_STATS_PLACEHOLDER_REFRESH_DAYS = 1
+
+# Background worker threads used to refresh expired player data while the stale copy is served
+# (see NBA_STATS_CAREER_CACHE['STALE_WHILE_REVALIDATE'] and ['MAX_STALENESS']).
+NBA_STATS_REVALIDATE_WORKERS = 4
+
+# Per-call timeout (seconds) for upstream fetches made by nba_stats.player_details_async.
+# Kept well below Heroku's 30 second router timeout.
+NBA_STATS_UPSTREAM_TIMEOUT = 8
+
+# Serve player pages only from the local stats store (see `manage.py ingest_stats`) and never
+# call stats.nba.com or nba.com at request time.
+NBA_STATS_OFFLINE = env.bool('NBA_STATS_OFFLINE', default=False)
+
+# Upstream HTTP client (nba_stats/upstream.py) used for every stats.nba.com and nba.com call:
+# one pooled keep-alive session, (connect, read) timeouts well under Heroku's 30s router limit,
+# bounded retries with exponential backoff, and a per-host circuit breaker that fails fast
+# (so cached or stale data is served) after BREAKER_THRESHOLD consecutive failures.
+NBA_STATS_UPSTREAM = {
+    'STATS_BASE_URL': env('NBA_STATS_UPSTREAM_STATS_URL', default='https://stats.nba.com/stats'),
+    'WEB_BASE_URL': env('NBA_STATS_UPSTREAM_WEB_URL', default='https://www.nba.com'),
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 8,
+    'RETRIES': 2,
+    'BACKOFF': 0.5,
+    'POOL_SIZE': 10,
+    'BREAKER_THRESHOLD': 5,
+    'BREAKER_RESET': 60,
+}
+
+# Cache warming for rostered and most viewed players (`manage.py warm_cache`, run on a schedule).
+# Set INTERVAL (seconds) to also run it from a background thread in each web process. RATE bounds
+# upstream requests per second; page views are buffered for VIEW_FLUSH_INTERVAL seconds before being written.
+NBA_STATS_WARM = {
+    'INTERVAL': env.int('NBA_STATS_WARM_INTERVAL', default=0),
+    'TOP_VIEWED': 100,
+    'WORKERS': 2,
+    'RATE': 0.5,
+    'VIEW_FLUSH_INTERVAL': 60,
+}
+
+# Resized WebP/JPEG headshot variants served by nba_stats.headshot_image (created on first request).
+NBA_STATS_HEADSHOT_DIR = os.path.join(BASE_DIR, 'cache', 'headshots')
+
+# Part of every player/roster page ETag, so browsers stop reusing pages rendered by an older
+# release. Heroku sets HEROKU_RELEASE_VERSION when runtime dyno metadata is enabled.
+NBA_STATS_PAGE_VERSION = env('HEROKU_RELEASE_VERSION', default='')
+
+# Request instrumentation (nba_stats/timing.py). SAMPLE_RATE of requests get per-phase timings, a
+# Server-Timing header and a JSON log line; /nba_stats/metrics/ serves the totals in Prometheus format
+# to staff users or to scrapers sending the METRICS_TOKEN as a bearer token. Test runs sample nothing,
+# so their output is not interleaved with timing lines (tests of the instrumentation override this).
+TESTING = sys.argv[1:2] == ['test']
+NBA_STATS_TIMING = {
+    'SAMPLE_RATE': 0 if TESTING else env.float('NBA_STATS_TIMING_SAMPLE_RATE', default=0.1),
+    'SERVER_TIMING': True,
+    'LOG': True,
+    'METRICS_TOKEN': env('NBA_STATS_METRICS_TOKEN', default=''),
+}
+
+# Send the sampled request timing lines to stdout (collected by the Heroku log router)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'nba_stats.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Prebuilt player search index loaded by every worker at start-up; written by
+# `manage.py build_player_index` (see Dockerfile). Workers build the index in memory when it is missing.
+NBA_STATS_PLAYER_INDEX = os.path.join(BASE_DIR, 'cache', 'player_index.bin')
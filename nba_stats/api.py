@@ -0,0 +1,146 @@
+"""
+File: api.py
+Description: Request parsing and serialization for the read-only JSON stats API (api_player and api_players
+in views.py). Players are served from the local career stats cache and stats store, with optional projection
+of top-level fields and stat columns. Per-game averages for a whole batch are computed in one vectorized
+pass per table.
+"""
+
+from .search import find_player
+from .stats import PER_GAME_COLUMNS, PER_36_COLUMNS, with_averages
+from .store import SEASON_COLUMNS
+
+# Most players one batch request may ask for
+API_BATCH_LIMIT = 50
+
+# Stat table fields and the career stats result set each one is built from
+TABLE_FIELDS = {
+    'career': 'CareerTotalsRegularSeason',
+    'career_postseason': 'CareerTotalsPostSeason',
+    'seasons': 'SeasonTotalsRegularSeason',
+    'seasons_postseason': 'SeasonTotalsPostSeason',
+}
+
+# Every top-level field a player can be serialized with, and the defaults when ?fields is not given
+FIELDS = ['id', 'name', 'is_active', 'fetched_at'] + list(TABLE_FIELDS)
+DEFAULT_FIELDS = ['id', 'name', 'is_active', 'fetched_at', 'career']
+
+# Stat columns accepted by ?stats (raw API columns plus the derived ones added by with_averages)
+STAT_FIELDS = (
+    set(SEASON_COLUMNS) | set(PER_GAME_COLUMNS) | set(PER_36_COLUMNS) | {'TS_PCT', 'PLAYER_ID'}
+)
+
+# Columns always kept in season rows so projected rows stay identifiable
+SEASON_KEY_COLUMNS = ['SEASON_ID', 'TEAM_ABBREVIATION']
+
+
+def parse_list(value):
+    """Split a comma-separated query parameter into its non-empty, stripped items."""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def parse_fields(value):
+    """
+    Parse the ?fields parameter.
+
+    Raises:
+        ValueError: An unknown field was requested.
+    """
+    fields = parse_list(value)
+    if not fields:
+        return DEFAULT_FIELDS
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(FIELDS)}.")
+    return fields
+
+
+def parse_stats(value):
+    """
+    Parse the ?stats parameter (stat columns to keep in each row), or None to keep every column.
+
+    Raises:
+        ValueError: An unknown stat column was requested.
+    """
+    stats = [stat.upper() for stat in parse_list(value)]
+    if not stats:
+        return None
+    unknown = [stat for stat in stats if stat not in STAT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown stats: {', '.join(unknown)}.")
+    return stats
+
+
+def parse_ids(value, limit=API_BATCH_LIMIT):
+    """
+    Parse the ?ids parameter into a list of unique player IDs, in request order.
+
+    Raises:
+        ValueError: The IDs are missing, not integers, or more than `limit`.
+    """
+    items = parse_list(value)
+    if not items:
+        raise ValueError("Pass one or more comma-separated player IDs in ?ids.")
+    try:
+        player_ids = list(dict.fromkeys(int(item) for item in items))
+    except ValueError:
+        raise ValueError("Player IDs must be integers.")
+    if len(player_ids) > limit:
+        raise ValueError(f"At most {limit} players can be requested at once.")
+    return player_ids
+
+
+def project(row, stats, keep=()):
+    """Return only the requested stat columns of a row (plus any `keep` columns), or the whole row."""
+    if stats is None:
+        return row
+    return {column: row.get(column) for column in list(keep) + [stat for stat in stats if stat not in keep]}
+
+
+def serialize_players(player_ids, entries, fields, stats=None):
+    """
+    Serialize players for the API.
+
+    Args:
+        player_ids (list): Players to serialize, in output order; each must have an entry.
+        entries (dict): Maps player_id to a cache-style entry {'data': career_dict, 'fetched_at': timestamp}.
+        fields (list): Top-level fields to include (see FIELDS).
+        stats (list): Stat columns to keep in table rows, or None for all of them.
+
+    Returns:
+        list: One dict per player.
+    """
+    players = []
+    for player_id in player_ids:
+        static = find_player(player_id) or {}
+        player = {}
+        if 'id' in fields:
+            player['id'] = player_id
+        if 'name' in fields:
+            player['name'] = static.get('full_name', f'Player {player_id}')
+        if 'is_active' in fields:
+            player['is_active'] = static.get('is_active', False)
+        if 'fetched_at' in fields:
+            player['fetched_at'] = entries[player_id]['fetched_at']
+        players.append(player)
+
+    for field, result_set in TABLE_FIELDS.items():
+        if field not in fields:
+            continue
+
+        # Averages for every player's rows of this table in one pass, then split back per player
+        owners, rows = [], []
+        for index, player_id in enumerate(player_ids):
+            for row in entries[player_id]['data'].get(result_set, []):
+                owners.append(index)
+                rows.append(row)
+        tables = [[] for _ in player_ids]
+        keep = SEASON_KEY_COLUMNS if field.startswith('seasons') else ()
+        for index, row in zip(owners, with_averages(rows)):
+            tables[index].append(project(row, stats, keep))
+
+        for player, table in zip(players, tables):
+            # Career fields hold a single totals row rather than a list
+            player[field] = table if field.startswith('seasons') else (table[0] if table else None)
+
+    return players
@@ -1,6 +1,22 @@
+import sys
+
 from django.apps import AppConfig
 
 
 class NbaStatsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'nba_stats'
+
+    def ready(self):
+        # Management commands other than runserver load the player search index on first use (if at all)
+        # and never start the warming worker
+        if 'manage.py' in sys.argv[0] and sys.argv[1:2] != ['runserver']:
+            return
+
+        # Load the player search index at start-up instead of on the first search request
+        from .search import get_index
+        get_index()
+
+        # Optionally keep popular players warm from inside the web process (NBA_STATS_WARM['INTERVAL'])
+        from .warm import start_worker
+        start_worker()
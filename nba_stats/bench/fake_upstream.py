@@ -0,0 +1,211 @@
+"""
+File: fake_upstream.py
+Description: A local stand-in for stats.nba.com, nba.com and the headshot CDN, used by the benchmark command.
+Serves deterministic canned PlayerCareerStats and CommonPlayerInfo responses, player pages with a headshot
+tag in the same markup the scraper looks for, and a PNG headshot, with configurable latency and injected
+errors. Counts every request by endpoint so benchmarks can report upstream call volume.
+"""
+
+import io
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+SEASON_HEADERS = [
+    'PLAYER_ID', 'SEASON_ID', 'LEAGUE_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'PLAYER_AGE', 'GP', 'GS', 'MIN',
+    'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST',
+    'STL', 'BLK', 'TOV', 'PF', 'PTS',
+]
+CAREER_HEADERS = ['PLAYER_ID', 'LEAGUE_ID', 'Team_ID'] + SEASON_HEADERS[6:]
+TEAMS = ['ATL', 'BOS', 'CHI', 'DAL', 'DEN', 'GSW', 'LAL', 'MIA', 'NYK', 'SAS']
+
+
+def season_row(player_id, year, rng):
+    """Build one plausible season totals row."""
+    gp = rng.randint(20, 82)
+    fga = gp * rng.randint(5, 20)
+    fg3a = gp * rng.randint(0, 8)
+    fta = gp * rng.randint(1, 8)
+    fgm, fg3m, ftm = int(fga * rng.uniform(0.4, 0.55)), int(fg3a * rng.uniform(0.3, 0.42)), int(fta * rng.uniform(0.65, 0.9))
+    oreb, dreb = gp * rng.randint(0, 3), gp * rng.randint(1, 8)
+    return [
+        player_id, f'{year}-{str(year + 1)[-2:]}', '00', 1610612700 + rng.randint(37, 66), rng.choice(TEAMS),
+        float(20 + year % 15), gp, rng.randint(0, gp), float(gp * rng.randint(12, 38)),
+        fgm, fga, round(fgm / fga, 3) if fga else 0, fg3m, fg3a, round(fg3m / fg3a, 3) if fg3a else 0,
+        ftm, fta, round(ftm / fta, 3) if fta else 0, oreb, dreb, oreb + dreb, gp * rng.randint(1, 8),
+        gp * rng.randint(0, 2), gp * rng.randint(0, 2), gp * rng.randint(1, 3), gp * rng.randint(1, 3),
+        2 * fgm + fg3m + ftm,
+    ]
+
+
+def career_row(player_id, seasons):
+    """Sum season rows into a career totals row."""
+    totals = [sum(row[index] for row in seasons) for index in range(6, len(SEASON_HEADERS))]
+    row = dict(zip(SEASON_HEADERS[6:], totals))
+    for pct, made, attempted in (('FG_PCT', 'FGM', 'FGA'), ('FG3_PCT', 'FG3M', 'FG3A'), ('FT_PCT', 'FTM', 'FTA')):
+        row[pct] = round(row[made] / row[attempted], 3) if row[attempted] else 0
+    return [player_id, '00', 0] + [row[header] for header in CAREER_HEADERS[3:]]
+
+
+def career_stats_response(player_id):
+    """Return a canned PlayerCareerStats response body, the same for every call with this player_id."""
+    rng = random.Random(player_id)
+    first_year = rng.randint(1990, 2015)
+    regular = [season_row(player_id, year, rng) for year in range(first_year, first_year + rng.randint(2, 18))]
+    post = [season_row(player_id, year, rng) for year in range(first_year + 1, first_year + 1 + rng.randint(0, 6))]
+
+    def result_set(name, headers, rows):
+        return {'name': name, 'headers': headers, 'rowSet': rows}
+
+    return {
+        'resource': 'playercareerstats',
+        'parameters': {'PerMode': 'Totals', 'PlayerID': player_id, 'LeagueID': None},
+        'resultSets': [
+            result_set('SeasonTotalsRegularSeason', SEASON_HEADERS, regular),
+            result_set('CareerTotalsRegularSeason', CAREER_HEADERS, [career_row(player_id, regular)]),
+            result_set('SeasonTotalsPostSeason', SEASON_HEADERS, post),
+            result_set('CareerTotalsPostSeason', CAREER_HEADERS, [career_row(player_id, post)] if post else []),
+        ],
+    }
+
+
+def player_info_response(player_id, name):
+    """Return a canned CommonPlayerInfo response body."""
+    first, _, last = name.partition(' ')
+    return {
+        'resource': 'commonplayerinfo',
+        'parameters': {'PlayerID': player_id},
+        'resultSets': [{
+            'name': 'CommonPlayerInfo',
+            'headers': ['PERSON_ID', 'FIRST_NAME', 'LAST_NAME', 'DISPLAY_FIRST_LAST', 'DISPLAY_LAST_COMMA_FIRST'],
+            'rowSet': [[player_id, first, last, name, f'{last}, {first}']],
+        }],
+    }
+
+
+def player_page(player_id, image_url):
+    """Return a player page with the headshot markup the nba.com scraper expects."""
+    return (
+        '<html><body><div class="PlayerSummary_mainInnerTeam____nFZ">'
+        f'<img class="PlayerImage_image__wH_YX PlayerSummary_playerImage__sysif" src="{image_url}">'
+        '</div></body></html>'
+    )
+
+
+def headshot_png():
+    """Return a 1040x760 PNG, the size of nba.com headshots."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (1040, 760), (29, 66, 138)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class FakeUpstream:
+    """
+    A threaded HTTP server impersonating the NBA upstreams.
+
+    Args:
+        latency (float): Seconds added to every response.
+        jitter (float): Up to this many extra seconds, chosen at random per request.
+        error_rate (float): Fraction of requests answered with a 503.
+        names (dict): player_id -> display name returned by CommonPlayerInfo.
+
+    Attributes:
+        calls (Counter): Requests received per endpoint ('playercareerstats', 'commonplayerinfo',
+                         'player_page', 'headshot').
+        errors (Counter): Injected errors per endpoint.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, names=None, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.names = names or {}
+        self.calls = Counter()
+        self.errors = Counter()
+        self.lock = threading.Lock()
+        self.rng = random.Random(0)
+        self.image = headshot_png()
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def handler_class(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                upstream.handle(self)
+
+        return Handler
+
+    def route(self, path, query):
+        """Return (endpoint, content_type, body) for a request path, or None if it is not served."""
+        if path == '/stats/playercareerstats':
+            player_id = int(query['PlayerID'][0])
+            return 'playercareerstats', 'application/json', json.dumps(career_stats_response(player_id)).encode()
+        if path == '/stats/commonplayerinfo':
+            player_id = int(query['PlayerID'][0])
+            name = self.names.get(player_id, f'Player {player_id}')
+            return 'commonplayerinfo', 'application/json', json.dumps(player_info_response(player_id, name)).encode()
+        match = re.fullmatch(r'/player/(\d+)/?', path)
+        if match:
+            image_url = f'{self.base_url}/headshots/{match.group(1)}.png'
+            return 'player_page', 'text/html', player_page(int(match.group(1)), image_url).encode()
+        if re.fullmatch(r'/headshots/\d+\.png', path):
+            return 'headshot', 'image/png', self.image
+        return None
+
+    def handle(self, request):
+        url = urlparse(request.path)
+        routed = self.route(url.path, parse_qs(url.query))
+        if routed is None:
+            request.send_error(404)
+            return
+        endpoint, content_type, body = routed
+
+        with self.lock:
+            self.calls[endpoint] += 1
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            fail = self.rng.random() < self.error_rate
+            if fail:
+                self.errors[endpoint] += 1
+        if delay:
+            time.sleep(delay)
+
+        if fail:
+            request.send_error(503)
+            return
+        request.send_response(200)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name='fake-upstream', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counts(self):
+        with self.lock:
+            self.calls.clear()
+            self.errors.clear()
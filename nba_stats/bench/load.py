@@ -0,0 +1,233 @@
+"""
+File: load.py
+Description: Benchmark scenarios and load drivers for the benchmark command. Each scenario (home page,
+player search, player page, add to roster, roster page) is run either in-process through the Django test
+client or over HTTP against a threaded WSGI server with concurrent clients, and reported as latency
+percentiles, throughput and the number of upstream calls it caused.
+"""
+
+import random
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.contrib.auth.models import User
+from django.core.servers.basehttp import ThreadedWSGIServer
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import Client
+from django.test.testcases import QuietWSGIRequestHandler
+from django.urls import reverse
+
+from nba_stats.models import UserProfile
+from nba_stats.revalidate import player_revalidator
+from nba_stats.search import get_index
+from nba_stats.singleflight import get_stats as get_flight_stats
+
+# Scenarios in run order. Each one is (name, method, path(player_id), form data(player), needs login).
+# Search goes through the home page form, which redirects to the best match.
+SCENARIOS = [
+    ('home', 'GET', lambda player_id: reverse('nba_stats:home'), None, False),
+    ('search', 'POST', lambda player_id: reverse('nba_stats:home'),
+     lambda player: {'player_name': player['full_name']}, False),
+    ('player_details', 'GET', lambda player_id: reverse('nba_stats:player_details', args=[player_id]), None, False),
+    ('add_to_roster', 'POST', lambda player_id: reverse('nba_stats:add_to_roster', args=[player_id]), None, True),
+    ('user_roster', 'GET', lambda player_id: reverse('nba_stats:roster'), None, True),
+]
+
+SCENARIO_NAMES = [name for name, *_ in SCENARIOS]
+
+
+def pick_players(count, seed=0):
+    """Pick `count` players from the static player list, active players first, in a repeatable order."""
+    everyone = sorted(get_index().by_id.values(), key=lambda player: (not player['is_active'], player['id']))
+    chosen = everyone[:max(count * 4, count)]
+    random.Random(seed).shuffle(chosen)
+    return chosen[:count]
+
+
+def create_users(count):
+    """Create `count` benchmark users, each with a UserProfile."""
+    users = []
+    for index in range(count):
+        user = User.objects.create_user(username=f'bench{index}', password=secrets.token_hex(8))
+        UserProfile.objects.create(user=user)
+        users.append(user)
+    return users
+
+
+def percentile(sorted_values, pct):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def upstream_snapshot(upstream):
+    """Return the counters used to attribute upstream calls to a scenario."""
+    return {
+        'upstream': dict(upstream.calls),
+        'upstream_errors': sum(upstream.errors.values()),
+        'flights': {name: stats['coalesced'] for name, stats in get_flight_stats().items()},
+        'revalidations': player_revalidator.stats()['scheduled'],
+    }
+
+
+def summarize(name, mode, latencies, errors, elapsed, before, after):
+    """Build one scenario's report from its latencies (seconds) and before/after upstream snapshots."""
+    latencies = sorted(latencies)
+    upstream = {
+        endpoint: after['upstream'].get(endpoint, 0) - before['upstream'].get(endpoint, 0)
+        for endpoint in after['upstream']
+    }
+    return {
+        'scenario': name,
+        'mode': mode,
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'upstream_calls': sum(upstream.values()),
+        'upstream': {endpoint: calls for endpoint, calls in upstream.items() if calls},
+        'upstream_errors': after['upstream_errors'] - before['upstream_errors'],
+        'coalesced': sum(after['flights'].values()) - sum(before['flights'].values()),
+        'revalidations': after['revalidations'] - before['revalidations'],
+    }
+
+
+def wait_for_revalidation(timeout=30):
+    """Wait until background refreshes scheduled by a scenario have finished, so they are counted there."""
+    deadline = time.monotonic() + timeout
+    while player_revalidator.stats()['pending'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class ClientDriver:
+    """
+    Runs scenarios in-process, one request at a time, through the Django test client. Measures the
+    whole request/response cycle except the network.
+    """
+
+    mode = 'client'
+
+    def __init__(self, users):
+        self.anonymous = Client()
+        self.clients = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            self.clients.append(client)
+
+    def request(self, index, method, path, data, needs_login):
+        client = self.clients[index % len(self.clients)] if needs_login else self.anonymous
+        response = client.post(path, data or {}) if method == 'POST' else client.get(path)
+        return response.status_code
+
+    def run(self, requests_per_scenario, concurrency, call):
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for index in range(requests_per_scenario):
+            latency, ok = call(self, index)
+            latencies.append(latency)
+            errors += not ok
+        return latencies, errors, time.perf_counter() - started
+
+
+class HTTPDriver:
+    """
+    Runs scenarios over real HTTP against a threaded WSGI server in this process, with `concurrency`
+    clients sending requests at the same time. Each logged-in client reuses its user's session cookie and
+    sends a CSRF token pair so POSTs pass CsrfViewMiddleware.
+    """
+
+    mode = 'http'
+
+    def __init__(self, users, host='127.0.0.1'):
+        self.server = ThreadedWSGIServer((host, 0), QuietWSGIRequestHandler, allow_reuse_address=False)
+        self.server.set_app(get_wsgi_application())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='bench-http', daemon=True)
+        self.thread.start()
+        self.base_url = f'http://{host}:{self.server.server_address[1]}'
+
+        self.session_cookies = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            self.session_cookies.append(client.cookies['sessionid'].value)
+        self.local = threading.local()
+
+    def session(self, index, needs_login):
+        """Return this thread's requests session, logged in as one of the users if `needs_login`."""
+        sessions = getattr(self.local, 'sessions', None)
+        if sessions is None:
+            sessions = self.local.sessions = {}
+        key = index % len(self.session_cookies) if needs_login else None
+        if key not in sessions:
+            session = sessions[key] = requests.Session()
+            token = secrets.token_hex(16)
+            session.cookies.set('csrftoken', token)
+            session.headers['X-CSRFToken'] = token
+            if key is not None:
+                session.cookies.set('sessionid', self.session_cookies[key])
+        return sessions[key]
+
+    def request(self, index, method, path, data, needs_login):
+        session = self.session(index, needs_login)
+        response = session.request(method, self.base_url + path, data=data, allow_redirects=False, timeout=60)
+        return response.status_code
+
+    def run(self, requests_per_scenario, concurrency, call):
+        latencies, errors = [], 0
+        lock = threading.Lock()
+
+        def worker(index):
+            nonlocal errors
+            latency, ok = call(self, index)
+            with lock:
+                latencies.append(latency)
+                errors += not ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(requests_per_scenario)))
+        return latencies, errors, time.perf_counter() - started
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        connections.close_all()
+
+
+def run_scenarios(driver, upstream, players, requests_per_scenario, concurrency=1, scenarios=None):
+    """
+    Run every scenario (or only those named in `scenarios`) with `driver` and return one report per scenario.
+
+    Requests cycle through `players`, so with fewer players than requests the later player pages are served
+    from local data; the upstream call counts show how many requests actually reached the upstream.
+    """
+    reports = []
+    for name, method, path, data, needs_login in SCENARIOS:
+        if scenarios and name not in scenarios:
+            continue
+
+        def call(driver, index):
+            player = players[index % len(players)]
+            started = time.perf_counter()
+            try:
+                status = driver.request(index, method, path(player['id']), data and data(player), needs_login)
+            except Exception:
+                status = None
+            # Redirects are expected (search redirects to the player page)
+            return time.perf_counter() - started, status is not None and status < 400
+
+        before = upstream_snapshot(upstream)
+        latencies, errors, elapsed = driver.run(requests_per_scenario, concurrency, call)
+        wait_for_revalidation()
+        reports.append(summarize(name, driver.mode, latencies, errors, elapsed, before, upstream_snapshot(upstream)))
+    return reports
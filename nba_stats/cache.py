@@ -0,0 +1,314 @@
+"""
+File: cache.py
+Description: Read-through cache for PlayerCareerStats responses. Career stats are looked up by player_id
+in a pluggable backend (Django cache, local JSON files or a database table), then in the local stats
+store, before falling back to the NBA API, so repeat page views and dropdown submits do not touch
+stats.nba.com.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from . import upstream
+from .revalidate import player_revalidator
+from .search import find_player
+from .singleflight import career_stats_flight
+from .store import load_career_dict, load_career_dicts, save_career_dict
+from .timing import phase, record_cache
+
+# Default cache configuration, overridable through settings.NBA_STATS_CAREER_CACHE
+DEFAULTS = {
+    'BACKEND': 'database',
+    'CACHE_ALIAS': 'default',
+    'FILE_DIR': os.path.join(settings.BASE_DIR, 'cache', 'career_stats'),
+    'ACTIVE_TTL': 60 * 60 * 6,          # active players' stats change after every game
+    'RETIRED_TTL': 60 * 60 * 24 * 365,  # retired players' stats are effectively immutable
+    'STALE_WHILE_REVALIDATE': True,     # serve expired entries while refreshing them in the background
+    'MAX_STALENESS': 60 * 60 * 24,      # how long past its TTL an entry may still be served
+}
+
+
+def get_setting(name):
+    """Return a career cache setting, falling back to DEFAULTS."""
+    return getattr(settings, 'NBA_STATS_CAREER_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class DjangoCacheBackend:
+    """
+    Stores cache entries in one of the Django caches configured in settings.CACHES.
+
+    Every backend implements get(player_id), get_many(player_ids) (a dict of the entries found) and
+    set(player_id, entry).
+    """
+
+    def __init__(self):
+        self.cache = caches[get_setting('CACHE_ALIAS')]
+
+    def key(self, player_id):
+        return f'nba_stats:career:{player_id}'
+
+    def get(self, player_id):
+        return self.cache.get(self.key(player_id))
+
+    def get_many(self, player_ids):
+        entries = self.cache.get_many([self.key(player_id) for player_id in player_ids])
+        return {player_id: entries[self.key(player_id)] for player_id in player_ids if self.key(player_id) in entries}
+
+    def set(self, player_id, entry):
+        # Entries never expire in the backend; freshness is decided by get_career_stats
+        self.cache.set(self.key(player_id), entry, timeout=None)
+
+
+class FileCacheBackend:
+    """Stores each player's cache entry as a JSON file in a local directory."""
+
+    def __init__(self):
+        self.directory = str(get_setting('FILE_DIR'))
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, player_id):
+        return os.path.join(self.directory, f'{int(player_id)}.json')
+
+    def get(self, player_id):
+        try:
+            with open(self.path(player_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_many(self, player_ids):
+        entries = {player_id: self.get(player_id) for player_id in player_ids}
+        return {player_id: entry for player_id, entry in entries.items() if entry is not None}
+
+    def set(self, player_id, entry):
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self.path(player_id))
+
+
+class DatabaseCacheBackend:
+    """Stores cache entries in the CachedCareerStats table."""
+
+    def get(self, player_id):
+        from .models import CachedCareerStats
+
+        row = CachedCareerStats.objects.filter(player_id=player_id).first()
+        if row is None:
+            return None
+        return {'data': row.data, 'fetched_at': row.fetched_at}
+
+    def get_many(self, player_ids):
+        from .models import CachedCareerStats
+
+        # One query for the whole batch
+        return {
+            row.player_id: {'data': row.data, 'fetched_at': row.fetched_at}
+            for row in CachedCareerStats.objects.filter(player_id__in=player_ids)
+        }
+
+    def set(self, player_id, entry):
+        from .models import CachedCareerStats
+
+        CachedCareerStats.objects.update_or_create(
+            player_id=player_id,
+            defaults={'data': entry['data'], 'fetched_at': entry['fetched_at']},
+        )
+
+
+# Short names accepted for the BACKEND setting; anything else is treated as a dotted path
+BACKENDS = {
+    'django': DjangoCacheBackend,
+    'file': FileCacheBackend,
+    'database': DatabaseCacheBackend,
+}
+
+_backend = None
+
+
+def get_backend():
+    """Return the configured cache backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        backend = get_setting('BACKEND')
+        backend_class = BACKENDS.get(backend) or import_string(backend)
+        _backend = backend_class()
+    return _backend
+
+
+def get_ttl(player_id):
+    """
+    Return how long (in seconds) a player's cached career stats stay fresh.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+
+    Returns:
+        int: RETIRED_TTL for players flagged inactive in the static player list, otherwise ACTIVE_TTL.
+    """
+    player = find_player(player_id)
+    if player and not player['is_active']:
+        return get_setting('RETIRED_TTL')
+    return get_setting('ACTIVE_TTL')
+
+
+def is_fresh(entry, player_id):
+    """Return True if a cache entry is younger than the player's TTL."""
+    return entry is not None and time.time() - entry['fetched_at'] < get_ttl(player_id)
+
+
+def is_servable_stale(entry, player_id):
+    """
+    Return True if an expired cache entry may still be served while it is refreshed in the background,
+    i.e. stale-while-revalidate is enabled and the entry is no more than MAX_STALENESS past its TTL.
+    """
+    if entry is None or not get_setting('STALE_WHILE_REVALIDATE'):
+        return False
+    return time.time() - entry['fetched_at'] < get_ttl(player_id) + get_setting('MAX_STALENESS')
+
+
+def _fetch_career_stats(player_id):
+    return upstream.get_career_stats(player_id)
+
+
+def fetch_career_stats(player_id):
+    """
+    Fetch a player's normalized career stats dict directly from the NBA API.
+    Concurrent calls for the same player share a single API request.
+    """
+    with phase('career_api'):
+        return career_stats_flight.do(player_id, _fetch_career_stats, player_id)
+
+
+def is_offline():
+    """Return True if the app is configured to never call the NBA API at request time."""
+    return getattr(settings, 'NBA_STATS_OFFLINE', False)
+
+
+def get_stale_entry(player_id):
+    """
+    Return a player's newest locally stored entry regardless of age, or None if there is none.
+
+    The cache is read first; only when its entry is missing or expired is the local stats store read,
+    and the newer of the two is returned. A store snapshot that is fresh (or any snapshot, when offline)
+    is copied into the cache, keeping its original fetch time so it expires from the cache on schedule.
+    """
+    backend = get_backend()
+    entry = backend.get(player_id)
+    if is_fresh(entry, player_id):
+        return entry
+    snapshot = load_career_dict(player_id)
+    if snapshot is None or (entry is not None and entry['fetched_at'] >= snapshot['fetched_at']):
+        return entry
+    if is_offline() or is_fresh(snapshot, player_id):
+        backend.set(player_id, snapshot)
+    return snapshot
+
+
+def is_usable(entry, player_id):
+    """Return True if an entry may be served as-is: it is fresh, or the app is offline and it exists."""
+    return entry is not None and (is_offline() or is_fresh(entry, player_id))
+
+
+def get_local_career_stats(player_id):
+    """
+    Return a player's career stats from the cache or, failing that, the local stats store,
+    without calling the NBA API.
+
+    Entries must be fresh unless the app is offline, in which case any stored snapshot is used.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+
+    Returns:
+        dict or None: The normalized career stats dict, or None if nothing usable is stored locally.
+    """
+    entry = get_stale_entry(player_id)
+    return entry['data'] if is_usable(entry, player_id) else None
+
+
+def get_stale_entries(player_ids):
+    """
+    Batch version of get_stale_entry: one cache lookup for every player, then one store lookup for
+    the players whose cache entry is missing or expired (the newer entry wins).
+
+    Returns:
+        dict: Maps player_id to a cache-style entry, for the players with any local data.
+    """
+    entries = get_backend().get_many(player_ids)
+    missing = [player_id for player_id in player_ids if not is_fresh(entries.get(player_id), player_id)]
+    if missing:
+        for player_id, snapshot in load_career_dicts(missing).items():
+            entry = entries.get(player_id)
+            if entry is None or snapshot['fetched_at'] > entry['fetched_at']:
+                entries[player_id] = snapshot
+    return entries
+
+
+def store_career_stats(player_id, data):
+    """Store a freshly fetched career stats dict in the cache and the local stats store."""
+    get_backend().set(player_id, {'data': data, 'fetched_at': time.time()})
+    save_career_dict(player_id, data)
+
+
+def refresh_career_stats(player_id):
+    """Fetch a player's career stats from the NBA API and store them."""
+    store_career_stats(player_id, fetch_career_stats(player_id))
+
+
+def revalidate_career_stats(player_id):
+    """Queue a background refresh of a player's career stats, unless one is already pending."""
+    return player_revalidator.schedule(('career', player_id), refresh_career_stats, player_id)
+
+
+def get_career_stats(player_id):
+    """
+    Retrieve a player's normalized career stats, using the cache or the local stats store when
+    they hold fresh data and calling the NBA API otherwise.
+
+    Expired data no more than MAX_STALENESS past its TTL is returned immediately while a background
+    worker refreshes it (stale-while-revalidate); older data is refreshed synchronously. If the API
+    call fails (or its circuit breaker is open), any expired entry is served instead. When
+    NBA_STATS_OFFLINE is set the API is never called and players without a stored snapshot get an
+    empty dict.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+
+    Returns:
+        dict: The normalized PlayerCareerStats dict (CareerTotalsRegularSeason, SeasonTotalsRegularSeason, ...).
+
+    Raises:
+        upstream.UpstreamError: The API call failed and nothing is stored locally for the player.
+    """
+    # One read of the cache (and, if needed, the store) decides between hit, stale and miss
+    stale = get_stale_entry(player_id)
+    if is_usable(stale, player_id):
+        record_cache('career', 'hit')
+        return stale['data']
+    if is_offline():
+        record_cache('career', 'miss')
+        return {}
+
+    if is_servable_stale(stale, player_id):
+        record_cache('career', 'stale')
+        revalidate_career_stats(player_id)
+        return stale['data']
+    record_cache('career', 'miss')
+
+    # Nothing usable stored locally: go to the API and store the result
+    try:
+        data = fetch_career_stats(player_id)
+    except upstream.UpstreamError:
+        if stale is None:
+            raise
+        return stale['data']
+    store_career_stats(player_id, data)
+    return data
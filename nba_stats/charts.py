@@ -0,0 +1,132 @@
+"""
+File: charts.py
+Description: Career trajectory charts built with Plotly: a player's points, rebounds and assists per game
+by season, Regular Season and Post Season. A chart's figure JSON is built once per version of the player's
+career stats and cached, and the player page loads it from career_chart (views.py) as a separate,
+versioned asset after the page itself has been served. plotly.js is loaded from its CDN by the browser.
+"""
+
+import logging
+
+from django.core.cache import caches
+
+from .cache import get_career_stats
+from .conditional import fresh_stats_version, make_etag
+from .stats import with_averages
+from .upstream import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# Stats drawn on the chart -> (legend name, line colour)
+CHART_STATS = {
+    'PPG': ('Points', '#f1c40f'),
+    'RPG': ('Rebounds', '#3498db'),
+    'APG': ('Assists', '#2ecc71'),
+}
+
+# Season types -> (career stats result set, display title, line dash)
+CHART_SEASON_TYPES = {
+    'regular': ('SeasonTotalsRegularSeason', 'Regular Season', 'solid'),
+    'post': ('SeasonTotalsPostSeason', 'Post Season', 'dot'),
+}
+
+# Part of every chart version; bump it when the figure layout changes so cached charts and URLs are replaced
+CHART_FORMAT = 1
+
+# How long a built chart (for one version of a player's stats) stays in the cache
+CHART_CACHE_SECONDS = 60 * 60 * 24
+
+# plotly.js release matching the installed plotly package, loaded by the player page when the chart scrolls into view
+PLOTLY_JS_URL = 'https://cdn.plot.ly/plotly-2.35.2.min.js'
+
+
+def season_points(rows):
+    """
+    Return (season, row) pairs with per-game averages, one per season in season order. Traded players'
+    per-team rows are replaced by their combined TOT row, as on the leaderboards.
+    """
+    by_season = {}
+    for row in with_averages(rows):
+        season = row.get('SEASON_ID')
+        if season not in by_season or row.get('TEAM_ABBREVIATION') == 'TOT':
+            by_season[season] = row
+    return sorted(by_season.items())
+
+
+def build_chart(career_dict):
+    """
+    Build a player's career trajectory chart.
+
+    Args:
+        career_dict (dict): The normalized career stats dict.
+
+    Returns:
+        str: The Plotly figure as JSON (data and layout), ready for Plotly.newPlot.
+    """
+    import plotly.graph_objects as go
+
+    figure = go.Figure()
+    for result_set, title, dash in CHART_SEASON_TYPES.values():
+        points = season_points(career_dict.get(result_set, []))
+        if not points:
+            continue
+        seasons = [season for season, _ in points]
+        for stat, (name, color) in CHART_STATS.items():
+            figure.add_trace(go.Scatter(
+                x=seasons,
+                y=[row.get(stat) for _, row in points],
+                name=f'{name} ({title})',
+                legendgroup=stat,
+                mode='lines+markers',
+                line={'color': color, 'dash': dash},
+                hovertemplate=f'{stat}: %{{y:.1f}}<extra>{title}</extra>',
+            ))
+
+    figure.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0.3)',
+        font={'family': 'Helvetica, Arial, sans-serif', 'color': '#fff'},
+        margin={'l': 50, 'r': 20, 't': 20, 'b': 50},
+        hovermode='x unified',
+        legend={'orientation': 'h', 'y': -0.2},
+        xaxis={'type': 'category', 'categoryorder': 'category ascending', 'gridcolor': '#444'},
+        yaxis={'title': 'Per Game', 'gridcolor': '#444', 'rangemode': 'tozero'},
+    )
+    if not figure.data:
+        figure.add_annotation(text="No season stats available.", showarrow=False, font={'size': 16})
+    return figure.to_json()
+
+
+def chart_version(player_id, stats_version):
+    """
+    Return the version of a player's chart, derived from the fetch time of their locally stored career
+    stats (see conditional.fresh_stats_version), or None if those stats are not fresh.
+    """
+    if stats_version is None:
+        return None
+    return make_etag('chart', CHART_FORMAT, player_id, stats_version).strip('"')
+
+
+def get_chart(player_id, version):
+    """
+    Return a player's chart JSON for the given chart_version(), from the cache when it has already been
+    built. With no version the chart is built from whatever stats are available and not cached.
+    """
+    def load_chart():
+        try:
+            career_dict = get_career_stats(player_id)
+        except UpstreamError as e:
+            logger.warning("Career stats for player %s unavailable: %r", player_id, e)
+            career_dict = {}
+        return build_chart(career_dict)
+
+    if version is None:
+        return load_chart()
+    return caches['default'].get_or_set(f'nba_stats:chart:{player_id}:{version}', load_chart, CHART_CACHE_SECONDS)
+
+
+def prebuild_chart(player_id):
+    """Build and cache a player's chart ahead of time, if their stored career stats are fresh."""
+    version = chart_version(player_id, fresh_stats_version(player_id))
+    if version is not None:
+        get_chart(player_id, version)
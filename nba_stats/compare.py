@@ -0,0 +1,282 @@
+"""
+File: compare.py
+Description: Side-by-side comparison of several players (compare_players and api_compare in views.py).
+Every player's career stats are loaded in one batch (a single cache lookup plus one store query, with the
+players that are missing fetched from the NBA API concurrently), and the career and season-by-season
+tables for all of them are computed in one vectorized pass and aligned by season or by year of career.
+"""
+
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .api import parse_ids
+from .cache import (
+    fetch_career_stats, get_stale_entries, is_fresh, is_offline, is_servable_stale, revalidate_career_stats,
+    store_career_stats
+)
+from .leaderboards import LEADERBOARD_STATS
+from .models import PlayerHeadShot
+from .revalidate import player_revalidator
+from .search import find_player
+from .stats import compute_averages
+from .timing import phase, record_cache
+from .upstream import UpstreamError
+from .utils import PLACEHOLDER_IMAGE_URL, needs_refresh, refresh_player_name_and_image
+
+logger = logging.getLogger(__name__)
+
+# Fewest and most players one comparison may include
+COMPARE_MIN = 2
+COMPARE_LIMIT = 8
+
+# Most NBA API calls made at once for players missing from the cache
+COMPARE_FETCH_WORKERS = 4
+
+# Season type slugs -> (career totals result set, season totals result set, display title)
+COMPARE_SEASON_TYPES = {
+    'regular': ('CareerTotalsRegularSeason', 'SeasonTotalsRegularSeason', 'Regular Season'),
+    'post': ('CareerTotalsPostSeason', 'SeasonTotalsPostSeason', 'Post Season'),
+}
+
+# Season tables can line players up by season ('2003-04') or by year of their career (1, 2, ...)
+ALIGNMENTS = ['season', 'year']
+
+# Stats shown in the career comparison, in order, with their display names
+COMPARE_STATS = {
+    'GP': 'Games Played',
+    **{stat: name for stat, name in LEADERBOARD_STATS.items() if stat != 'PTS'},
+    'TOVPG': 'Turnovers Per Game',
+    'PTS': 'Total Points',
+}
+
+# Stats where the lowest value is the best one
+LOWER_IS_BETTER = {'TOVPG'}
+
+
+def load_career_dicts(player_ids):
+    """
+    Load several players' career stats in one batch.
+
+    Fresh and recently expired data comes from a single cache lookup (plus one store query for players
+    the cache does not hold); expired entries are refreshed in the background. The remaining players
+    are fetched from the NBA API concurrently and stored. A player whose fetch fails gets any older
+    stored data, or an empty dict.
+
+    Returns:
+        (dict, list): player_id -> normalized career stats dict, and the players whose stats are unavailable.
+    """
+    entries = get_stale_entries(player_ids)
+    offline = is_offline()
+    career_dicts, to_fetch, unavailable = {}, [], []
+
+    for player_id in player_ids:
+        entry = entries.get(player_id)
+        if entry is not None and (offline or is_fresh(entry, player_id)):
+            record_cache('career', 'hit')
+            career_dicts[player_id] = entry['data']
+        elif is_servable_stale(entry, player_id):
+            record_cache('career', 'stale')
+            career_dicts[player_id] = entry['data']
+            revalidate_career_stats(player_id)
+        elif offline:
+            record_cache('career', 'miss')
+            career_dicts[player_id] = {}
+            unavailable.append(player_id)
+        else:
+            record_cache('career', 'miss')
+            to_fetch.append(player_id)
+
+    if not to_fetch:
+        return career_dicts, unavailable
+
+    # Fetch concurrently, then store from this thread so database writes stay on the request's connection
+    with ThreadPoolExecutor(max_workers=min(len(to_fetch), COMPARE_FETCH_WORKERS)) as pool:
+        futures = {
+            player_id: pool.submit(contextvars.copy_context().run, fetch_career_stats, player_id)
+            for player_id in to_fetch
+        }
+    for player_id, future in futures.items():
+        try:
+            career_dicts[player_id] = future.result()
+        except UpstreamError as e:
+            logger.warning("Career stats for player %s unavailable: %r", player_id, e)
+            entry = entries.get(player_id)
+            career_dicts[player_id] = entry['data'] if entry is not None else {}
+            if entry is None:
+                unavailable.append(player_id)
+            continue
+        store_career_stats(player_id, career_dicts[player_id])
+    return career_dicts, unavailable
+
+
+def load_names_and_images(player_ids):
+    """
+    Resolve every player's display name and headshot URL with one PlayerHeadShot query, without waiting on
+    nba.com. Players with a missing or outdated row get their static name (or stored row) now and are
+    refreshed in the background.
+
+    Returns:
+        dict: player_id -> (name, headshot URL, is_placeholder).
+    """
+    headshots = {headshot.player_id: headshot for headshot in PlayerHeadShot.objects.filter(player_id__in=player_ids)}
+    resolved = {}
+    for player_id in player_ids:
+        headshot = headshots.get(player_id)
+        if needs_refresh(headshot) and not is_offline():
+            player_revalidator.schedule(('headshot', player_id), refresh_player_name_and_image, player_id)
+        if headshot is not None:
+            resolved[player_id] = (headshot.player_name, headshot.player_image_url, headshot.is_placeholder)
+        else:
+            player = find_player(player_id)
+            resolved[player_id] = (player['full_name'] if player else "Unknown Player", PLACEHOLDER_IMAGE_URL, True)
+    return resolved
+
+
+def to_python(value):
+    """Convert a numpy scalar or missing value from a DataFrame into a JSON-friendly Python value."""
+    if value is None or value != value:  # NaN
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def best_index(values, stat):
+    """Return the position of the best non-missing value in a row, or None if fewer than two players have one."""
+    present = [(index, value) for index, value in enumerate(values) if value is not None]
+    if len(present) < 2:
+        return None
+    choose = min if stat in LOWER_IS_BETTER else max
+    return choose(present, key=lambda item: item[1])[0]
+
+
+def compare_tables(player_ids, career_dicts, season_type='regular', align='season', stats=('PPG',)):
+    """
+    Build aligned comparison tables for several players.
+
+    Every player's career totals row and season rows are put in one DataFrame and their derived per-game,
+    per-36 and shooting columns computed in a single pass. Season rows are then pivoted so each player is
+    a column, aligned by season or by year of career. Traded players' per-team rows are replaced by their
+    combined TOT row, as on the leaderboards.
+
+    Args:
+        player_ids (list): Players to compare, in column order.
+        career_dicts (dict): player_id -> normalized career stats dict.
+        season_type (str): 'regular' or 'post' (see COMPARE_SEASON_TYPES).
+        align (str): 'season' or 'year' (see ALIGNMENTS).
+        stats (iterable): Stats to build season-by-season tables for.
+
+    Returns:
+        dict: 'career' is a list of {'stat', 'name', 'values', 'best'} rows (one value per player, best the
+              position of the leading player); 'seasons' maps each stat to a list of {'label', 'values'} rows.
+    """
+    import pandas as pd
+
+    career_set, season_set, _ = COMPARE_SEASON_TYPES[season_type]
+    records, owners, tables = [], [], []
+    for player_id in player_ids:
+        career_dict = career_dicts.get(player_id, {})
+        for table, rows in (('career', career_dict.get(career_set, [])[:1]), ('seasons', career_dict.get(season_set, []))):
+            for row in rows:
+                records.append(row)
+                owners.append(player_id)
+                tables.append(table)
+
+    empty = [None] * len(player_ids)
+    if not records:
+        return {
+            'career': [{'stat': stat, 'name': name, 'values': empty, 'best': None} for stat, name in COMPARE_STATS.items()],
+            'seasons': {stat: [] for stat in stats},
+        }
+
+    frame = pd.DataFrame.from_records(records)
+    derived = compute_averages(frame)
+    frame = pd.concat([frame.drop(columns=derived.columns, errors='ignore'), derived], axis=1)
+    frame['_player'] = owners
+    frame['_table'] = tables
+    for stat in list(COMPARE_STATS) + list(stats):
+        if stat not in frame:
+            frame[stat] = None
+
+    career = frame[frame['_table'] == 'career'].set_index('_player').reindex(player_ids)
+    career_rows = []
+    for stat, name in COMPARE_STATS.items():
+        values = [to_python(value) for value in career[stat].tolist()]
+        career_rows.append({'stat': stat, 'name': name, 'values': values, 'best': best_index(values, stat)})
+
+    seasons = frame[frame['_table'] == 'seasons']
+    if 'TEAM_ABBREVIATION' in seasons and 'SEASON_ID' in seasons:
+        is_total = seasons['TEAM_ABBREVIATION'] == 'TOT'
+        traded = set(zip(seasons.loc[is_total, '_player'], seasons.loc[is_total, 'SEASON_ID']))
+        keep = [
+            total or (player_id, season_id) not in traded
+            for player_id, season_id, total in zip(seasons['_player'], seasons['SEASON_ID'], is_total)
+        ]
+        seasons = seasons[keep].drop_duplicates(['_player', 'SEASON_ID']).sort_values(['_player', 'SEASON_ID'])
+        seasons = seasons.assign(_year=seasons.groupby('_player').cumcount() + 1)
+        key = 'SEASON_ID' if align == 'season' else '_year'
+        season_tables = {}
+        for stat in stats:
+            pivot = seasons.pivot(index=key, columns='_player', values=stat).reindex(columns=player_ids).sort_index()
+            season_tables[stat] = [
+                {'label': to_python(label), 'values': [to_python(value) for value in values]}
+                for label, values in zip(pivot.index, pivot.itertuples(index=False, name=None))
+            ]
+    else:
+        season_tables = {stat: [] for stat in stats}
+
+    return {'career': career_rows, 'seasons': season_tables}
+
+
+def compare_players(player_ids, season_type='regular', align='season', stats=('PPG',)):
+    """
+    Load and compare several players (see load_career_dicts, load_names_and_images and compare_tables).
+
+    Returns:
+        dict: 'players' (one {'id', 'name', 'image_url', 'is_placeholder', 'available'} dict per player),
+              plus the 'career' and 'seasons' tables from compare_tables.
+    """
+    with phase('career'):
+        career_dicts, unavailable = load_career_dicts(player_ids)
+    with phase('headshot'):
+        names = load_names_and_images(player_ids)
+    with phase('compare'):
+        tables = compare_tables(player_ids, career_dicts, season_type, align, stats)
+
+    players = [
+        {
+            'id': player_id,
+            'name': names[player_id][0],
+            'image_url': names[player_id][1],
+            'is_placeholder': names[player_id][2],
+            'available': player_id not in unavailable,
+        }
+        for player_id in player_ids
+    ]
+    return {'players': players, **tables}
+
+
+def stat_decimals(stat):
+    """Return how many decimals a stat is shown with: 3 for percentages, none for counts, 2 for averages."""
+    return 3 if stat.endswith('_PCT') else 0 if stat in ('GP', 'PTS') else 2
+
+
+def parse_options(params):
+    """
+    Parse the player IDs and table options of a comparison request (?ids=2544,201939&season_type=regular&align=season).
+
+    Returns:
+        dict: 'player_ids', 'season_type' and 'align'.
+
+    Raises:
+        ValueError: Fewer than COMPARE_MIN or more than COMPARE_LIMIT players, or an unknown option.
+    """
+    player_ids = parse_ids(params.get('ids'), COMPARE_LIMIT)
+    if len(player_ids) < COMPARE_MIN:
+        raise ValueError(f"Compare at least {COMPARE_MIN} players.")
+    season_type = params.get('season_type') or 'regular'
+    if season_type not in COMPARE_SEASON_TYPES:
+        raise ValueError(f"season_type must be one of: {', '.join(COMPARE_SEASON_TYPES)}.")
+    align = params.get('align') or 'season'
+    if align not in ALIGNMENTS:
+        raise ValueError(f"align must be one of: {', '.join(ALIGNMENTS)}.")
+    return {'player_ids': player_ids, 'season_type': season_type, 'align': align}
@@ -0,0 +1,150 @@
+"""
+File: conditional.py
+Description: Conditional GET support for player and roster pages. ETag and Last-Modified values are derived
+from the version of the data a page is rendered from (career stats fetch time, headshot fetch time, roster
+mutation time), so repeat visits can be answered with a 304 before any template is rendered. Also sets the
+Cache-Control policy for each page type.
+"""
+
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .cache import get_backend, get_ttl, is_fresh, is_offline
+from .images import source_version
+from .models import Player, PlayerHeadShot, Roster, UserProfile
+from .search import find_player
+
+# Longest time a browser or proxy may reuse a player page without revalidating, in seconds
+ACTIVE_PLAYER_MAX_AGE = 60 * 5
+RETIRED_PLAYER_MAX_AGE = 60 * 60 * 24
+
+
+def make_etag(*parts):
+    """Return a quoted strong ETag built from the given version parts."""
+    version = '|'.join(str(part) for part in (getattr(settings, 'NBA_STATS_PAGE_VERSION', ''),) + parts)
+    return '"%s"' % hashlib.sha1(version.encode()).hexdigest()[:20]
+
+
+def to_datetime(timestamp):
+    """Convert a UNIX timestamp to an aware UTC datetime (None stays None)."""
+    return datetime.fromtimestamp(timestamp, dt_timezone.utc) if timestamp is not None else None
+
+
+def viewer_key(request):
+    """Identify who a page was rendered for, since the navbar and buttons depend on the login state."""
+    return request.user.pk if request.user.is_authenticated else 'anonymous'
+
+
+def fresh_stats_version(player_id):
+    """
+    Return the fetch time (UNIX timestamp) of a player's locally stored career stats, or None if
+    they are not fresh (or, when offline, not stored at all).
+    """
+    entry = get_backend().get(player_id)
+    if is_fresh(entry, player_id):
+        return entry['fetched_at']
+    fetched_at = Player.objects.filter(player_id=player_id).values_list('fetched_at', flat=True).first()
+    entry = {'fetched_at': fetched_at.timestamp()} if fetched_at else None
+    if entry is not None and (is_offline() or is_fresh(entry, player_id)):
+        return entry['fetched_at']
+    return None
+
+
+def player_max_age(player_id, stats_version):
+    """Return how long pages built from a player's stats may be reused: until the stats expire, capped per player type."""
+    player = find_player(player_id)
+    cap = RETIRED_PLAYER_MAX_AGE if player and not player['is_active'] else ACTIVE_PLAYER_MAX_AGE
+    remaining = get_ttl(player_id) - (time.time() - stats_version)
+    return max(0, min(cap, int(remaining)))
+
+
+def player_page_validators(request, player_id):
+    """
+    Work out the ETag and Last-Modified of a player page without loading the stats themselves.
+
+    Returns:
+        (str, datetime, int) or None: The ETag, Last-Modified and max-age for the page, or None if the
+                                      locally stored career stats are not fresh (the view will refresh
+                                      them, so the page cannot be validated against the stored version).
+    """
+    stats_version = fresh_stats_version(player_id)
+    if stats_version is None:
+        return None
+
+    headshot = PlayerHeadShot.objects.filter(player_id=player_id).values(
+        'player_name', 'player_image_url', 'is_placeholder', 'fetched_at'
+    ).first() or {}
+    headshot_time = headshot['fetched_at'].timestamp() if headshot.get('fetched_at') else None
+
+    etag = make_etag(
+        'player', player_id, stats_version, headshot.get('player_name'),
+        source_version(headshot.get('player_image_url'), headshot.get('is_placeholder')), viewer_key(request)
+    )
+    last_modified = to_datetime(max(filter(None, (stats_version, headshot_time))))
+    return etag, last_modified, player_max_age(player_id, stats_version)
+
+
+def roster_page_validators(request):
+    """
+    Work out the ETag and Last-Modified of the current user's roster page.
+
+    The version covers roster additions/removals plus the latest name/headshot and career stats
+    refresh among the rostered players.
+
+    Returns:
+        (str, datetime): The ETag and Last-Modified for the page.
+    """
+    roster_modified = UserProfile.objects.filter(user=request.user).values_list('roster_modified', flat=True).first()
+    player_ids = Roster.objects.filter(user__user=request.user).values('player_id')
+    headshots = PlayerHeadShot.objects.filter(player_id__in=player_ids).aggregate(latest=Max('fetched_at'))['latest']
+    stats = Player.objects.filter(player_id__in=player_ids).aggregate(latest=Max('fetched_at'))['latest']
+
+    moments = (roster_modified, headshots, stats)
+    etag = make_etag('roster', request.user.pk, *(moment.timestamp() if moment else None for moment in moments))
+    known = [moment for moment in moments if moment is not None]
+    return etag, max(known) if known else None
+
+
+def not_modified(request, etag, last_modified):
+    """Return a 304 response if the request's validators match, otherwise None."""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified):
+    """Add ETag and Last-Modified headers to a response."""
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def player_page_cache_control(response, max_age):
+    """
+    Cache-Control for player pages: the browser may reuse the page for max_age seconds (longer for
+    retired players). Pages embed a per-visitor CSRF token, so shared caches must not keep them.
+    """
+    patch_cache_control(response, private=True, max_age=max_age)
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+def fragment_cache_control(response, max_age):
+    """Cache-Control for per-player fragments that hold no user data: any cache may keep them for max_age seconds."""
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def roster_cache_control(response):
+    """Cache-Control for roster pages: private to the user and revalidated on every visit."""
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Cookie'])
+    return response
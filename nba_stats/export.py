@@ -0,0 +1,173 @@
+"""
+File: export.py
+Description: Bulk export of the local stats store. Season-by-season or career rows are read with a chunked
+database iterator and written out as they arrive, either as CSV text (streamed by the export_stats view or
+written by the export_stats command) or as a Parquet file built one record batch at a time, so memory use
+stays constant however many rows are exported. Parquet needs pyarrow, which is optional and not in
+requirements.txt; it is only offered where pyarrow is installed.
+"""
+
+import csv
+import importlib.util
+import os
+import tempfile
+
+from .models import CareerTotals, SeasonStats, SEASON_TYPES
+from .store import CAREER_COLUMNS, SEASON_COLUMNS
+
+# Exportable tables: name -> (model, API columns)
+EXPORT_TABLES = {
+    'seasons': (SeasonStats, SEASON_COLUMNS),
+    'career': (CareerTotals, CAREER_COLUMNS),
+}
+
+# Rows fetched from the database per round trip
+CHUNK_SIZE = 2000
+
+# Rows per Parquet record batch (and row group)
+PARQUET_BATCH_SIZE = 50000
+
+
+def export_header(table):
+    """Return the column names of an export, in output order."""
+    _, columns = EXPORT_TABLES[table]
+    return ['PLAYER_ID', 'PLAYER_NAME', 'SEASON_TYPE'] + columns
+
+
+def iter_rows(table, player_ids=None, season_type=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield the rows of an export as tuples in export_header order, without loading them all at once.
+
+    Args:
+        table (str): 'seasons' or 'career'.
+        player_ids (list): Only export these players (default: everyone in the store).
+        season_type (str): 'RegularSeason' or 'PostSeason' (default: both).
+        chunk_size (int): Rows fetched from the database per round trip.
+    """
+    model, columns = EXPORT_TABLES[table]
+    rows = model.objects.all()
+    if player_ids:
+        rows = rows.filter(player_id__in=player_ids)
+    if season_type:
+        rows = rows.filter(season_type=season_type)
+    ordering = ['player_id', 'season_type'] + (['row_number'] if table == 'seasons' else [])
+    fields = ['player_id', 'player__full_name', 'season_type'] + [column.lower() for column in columns]
+    yield from rows.order_by(*ordering).values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+class Echo:
+    """A file-like object whose write() returns the value written, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(table, **filters):
+    """Yield an export as CSV lines, header first. Takes the same filters as iter_rows."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(export_header(table))
+    for row in iter_rows(table, **filters):
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+def parquet_available():
+    """Return True if pyarrow is installed, without importing it."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def export_formats():
+    """Return the export formats this installation supports: CSV always, Parquet when pyarrow is installed."""
+    return ['csv', 'parquet'] if parquet_available() else ['csv']
+
+
+def import_pyarrow():
+    """
+    Import pyarrow, which is only needed for Parquet exports.
+
+    Raises:
+        ImportError: pyarrow is not installed, with instructions for installing it.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow. Install it with `pip install pyarrow`, "
+                          "or export CSV instead.") from e
+    return pyarrow
+
+
+def parquet_schema(pa, table):
+    """Build the Arrow schema of an export."""
+    model, columns = EXPORT_TABLES[table]
+    types = {'PLAYER_ID': pa.int64(), 'PLAYER_NAME': pa.string(), 'SEASON_TYPE': pa.string()}
+    for column in columns:
+        field = model._meta.get_field(column.lower())
+        if field.get_internal_type() in ('FloatField', 'DecimalField'):
+            types[column] = pa.float64()
+        elif field.get_internal_type() in ('CharField', 'TextField'):
+            types[column] = pa.string()
+        else:
+            types[column] = pa.int64()
+    return pa.schema([(name, types[name]) for name in export_header(table)])
+
+
+def record_batch(pa, schema, rows):
+    """Convert a list of row tuples into an Arrow record batch, column by column."""
+    columns = zip(*rows)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for field, values in zip(schema, columns)], schema=schema
+    )
+
+
+def write_parquet(path, table, batch_size=PARQUET_BATCH_SIZE, **filters):
+    """
+    Write an export to a Parquet file one record batch at a time.
+
+    Takes the same filters as iter_rows.
+
+    Returns:
+        int: Number of rows written.
+
+    Raises:
+        ImportError: pyarrow is not installed.
+    """
+    pa = import_pyarrow()
+    schema = parquet_schema(pa, table)
+    written = 0
+
+    with pa.parquet.ParquetWriter(path, schema, compression='zstd') as writer:
+        batch = []
+        for row in iter_rows(table, **filters):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_batch(record_batch(pa, schema, batch))
+                written += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(record_batch(pa, schema, batch))
+            written += len(batch)
+    return written
+
+
+def parquet_file(table, **filters):
+    """
+    Write an export to an anonymous temporary Parquet file and return it open for reading, positioned
+    at the start. The file is deleted from disk as soon as it is closed.
+
+    Takes the same filters as iter_rows.
+
+    Raises:
+        ImportError: pyarrow is not installed.
+    """
+    fd, path = tempfile.mkstemp(suffix='.parquet')
+    os.close(fd)
+    try:
+        write_parquet(path, table, **filters)
+        return open(path, 'rb')
+    finally:
+        os.remove(path)
+
+
+def valid_season_type(season_type):
+    """Return True if season_type is empty or one of the stored season types."""
+    return not season_type or season_type in dict(SEASON_TYPES)
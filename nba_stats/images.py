@@ -0,0 +1,164 @@
+"""
+File: images.py
+Description: Local headshot image pipeline. Each player's nba.com headshot is downloaded once, resized
+into a few fixed variants (roster thumbnail, player page) and saved as WebP and JPEG files on disk, keyed
+by player_id and a digest of the source URL. Pages link to these local copies, which are served with
+immutable cache headers, and players without a headshot get a locally generated placeholder.
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+
+from django.conf import settings
+from django.urls import reverse
+
+from . import upstream
+from .singleflight import headshot_image_flight
+from .utils import PLACEHOLDER_IMAGE_URL
+
+# Variant name -> (width, height) in pixels; twice the CSS display size for high-DPI screens
+SIZES = {
+    'thumb': (300, 219),
+    'page': (600, 438),
+}
+
+# File extension -> (Pillow format, content type, save options)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 6}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Version used in URLs for players with no real headshot
+PLACEHOLDER_VERSION = 'placeholder'
+
+# Background and silhouette colours of the generated placeholder
+PLACEHOLDER_BACKGROUND = (45, 45, 45)
+PLACEHOLDER_FOREGROUND = (110, 110, 110)
+
+
+def get_image_dir():
+    """Return the directory headshot variants are stored in."""
+    return getattr(settings, 'NBA_STATS_HEADSHOT_DIR', os.path.join(settings.BASE_DIR, 'cache', 'headshots'))
+
+
+def source_version(image_url, is_placeholder=False):
+    """Return the version string used in a headshot's URLs and file names: a digest of its source URL."""
+    if is_placeholder or not image_url or image_url == PLACEHOLDER_IMAGE_URL:
+        return PLACEHOLDER_VERSION
+    return hashlib.sha1(image_url.encode()).hexdigest()[:12]
+
+
+def variant_path(player_id, version, size, ext):
+    """Return the file path of one stored variant. Placeholders are shared by every player."""
+    if version == PLACEHOLDER_VERSION:
+        return os.path.join(get_image_dir(), PLACEHOLDER_VERSION, f'{size}.{ext}')
+    return os.path.join(get_image_dir(), str(player_id), version, f'{size}.{ext}')
+
+
+def headshot_urls(player_id, image_url, size, is_placeholder=False):
+    """
+    Build the local URLs of a headshot variant for templates.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+        image_url (str): The stored nba.com headshot URL (or the placeholder URL).
+        size (str): A key of SIZES, e.g. 'thumb' or 'page'.
+        is_placeholder (bool): True if the player has no real headshot.
+
+    Returns:
+        dict: {'webp': url, 'jpg': url}
+    """
+    version = source_version(image_url, is_placeholder)
+    return {
+        ext: reverse('nba_stats:headshot_image', kwargs={
+            'player_id': player_id, 'version': version, 'size': size, 'ext': ext,
+        })
+        for ext in FORMATS
+    }
+
+
+def save_atomic(path, data):
+    """Write bytes to a file so readers never see a partially written image."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def encode(image, ext):
+    """Encode a Pillow image in one of FORMATS, flattening transparency onto the placeholder background."""
+    from PIL import Image
+
+    image_format, _, options = FORMATS[ext]
+    if image.mode != 'RGB':
+        background = Image.new('RGB', image.size, PLACEHOLDER_BACKGROUND)
+        background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def write_variants(image, player_id, version):
+    """Resize a source image to every size in SIZES and save each one in every format."""
+    from PIL import Image, ImageOps
+
+    for size, dimensions in SIZES.items():
+        resized = ImageOps.fit(image, dimensions, Image.LANCZOS, centering=(0.5, 0.0))
+        for ext in FORMATS:
+            save_atomic(variant_path(player_id, version, size, ext), encode(resized, ext))
+
+
+def draw_placeholder(dimensions):
+    """Draw a generic head-and-shoulders silhouette."""
+    from PIL import Image, ImageDraw
+
+    width, height = dimensions
+    image = Image.new('RGB', dimensions, PLACEHOLDER_BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    head = height * 0.22
+    cx = width / 2
+    draw.ellipse([cx - head, height * 0.18, cx + head, height * 0.18 + 2 * head], fill=PLACEHOLDER_FOREGROUND)
+    draw.ellipse([cx - width * 0.3, height * 0.68, cx + width * 0.3, height * 1.3], fill=PLACEHOLDER_FOREGROUND)
+    return image
+
+
+def ensure_placeholder(size, ext):
+    """Generate the placeholder variant on disk if needed and return its path."""
+    path = variant_path(None, PLACEHOLDER_VERSION, size, ext)
+    if not os.path.exists(path):
+        save_atomic(path, encode(draw_placeholder(SIZES[size]), ext))
+    return path
+
+
+def _download_variants(player_id, image_url, version):
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(upstream.get_image(image_url)))
+    image.load()
+    if image.mode != 'RGB':
+        image = image.convert('RGBA')
+    write_variants(image, player_id, version)
+
+
+def ensure_variant(player_id, image_url, size, ext):
+    """
+    Return the path of a player's headshot variant, downloading and resizing the source image
+    the first time any of its variants is requested. Concurrent requests share one download.
+
+    Raises:
+        upstream.UpstreamError: The source image could not be downloaded.
+        PIL.UnidentifiedImageError: The downloaded file is not an image.
+    """
+    version = source_version(image_url)
+    if version == PLACEHOLDER_VERSION:
+        return ensure_placeholder(size, ext)
+
+    path = variant_path(player_id, version, size, ext)
+    if not os.path.exists(path):
+        headshot_image_flight.do((player_id, version), _download_variants, player_id, image_url, version)
+    return path
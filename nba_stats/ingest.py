@@ -0,0 +1,136 @@
+"""
+File: ingest.py
+Description: Helpers for bulk-loading career stats into the local stats store: a thread-safe rate limiter,
+a resumable JSON checkpoint, and a runner that fetches players with bounded concurrency while a single
+thread writes the results to the database.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class RateLimiter:
+    """Spaces calls to acquire() at least 1 / rate seconds apart across all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_time = time.monotonic()
+
+    def acquire(self):
+        """Block until the caller is allowed to make its next request."""
+        with self.lock:
+            now = time.monotonic()
+            wait_for = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+
+class Checkpoint:
+    """
+    Records which player_ids an ingest run has finished (or failed) in a JSON file,
+    so an interrupted run can be resumed without re-fetching finished players.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self.failed = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.done = set(data.get('done', []))
+            self.failed = {int(player_id): error for player_id, error in data.get('failed', {}).items()}
+
+    def mark_done(self, player_id):
+        self.done.add(player_id)
+        self.failed.pop(player_id, None)
+
+    def mark_failed(self, player_id, error):
+        self.failed[player_id] = error
+
+    def save(self):
+        """Atomically write the checkpoint file."""
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'done': sorted(self.done), 'failed': self.failed}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.done = set()
+        self.failed = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def run_ingest(player_ids, fetch, save, workers=4, rate=1.0, checkpoint=None, save_every=25, on_progress=None):
+    """
+    Fetch data for many players concurrently and save each result as it arrives.
+
+    Fetches run in a pool of `workers` threads, throttled to `rate` requests per second overall, and
+    at most 2 * workers fetches are queued at a time so memory stays bounded. `save` is only ever
+    called from the calling thread, which keeps database writes on a single connection.
+
+    Args:
+        player_ids (iterable): Player IDs to ingest.
+        fetch (callable): fetch(player_id) -> data; runs in a worker thread.
+        save (callable): save(player_id, data); runs in the calling thread.
+        workers (int): Number of concurrent fetches.
+        rate (float): Maximum fetches started per second (0 for unlimited).
+        checkpoint (Checkpoint): Optional checkpoint updated as players finish.
+        save_every (int): Write the checkpoint after this many finished players.
+        on_progress (callable): Optional on_progress(player_id, error) called after each player.
+
+    Returns:
+        (int, int): Number of players saved and number that failed.
+    """
+    limiter = RateLimiter(rate)
+
+    def throttled_fetch(player_id):
+        limiter.acquire()
+        return fetch(player_id)
+
+    saved = failed = 0
+    pending = {}
+    ids = iter(player_ids)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            # Keep a bounded number of fetches queued
+            for player_id in ids:
+                pending[executor.submit(throttled_fetch, player_id)] = player_id
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                player_id = pending.pop(future)
+                error = None
+                try:
+                    save(player_id, future.result())
+                    saved += 1
+                    if checkpoint:
+                        checkpoint.mark_done(player_id)
+                except Exception as e:
+                    error = repr(e)
+                    failed += 1
+                    if checkpoint:
+                        checkpoint.mark_failed(player_id, error)
+                if checkpoint and (saved + failed) % save_every == 0:
+                    checkpoint.save()
+                if on_progress:
+                    on_progress(player_id, error)
+
+    if checkpoint:
+        checkpoint.save()
+    return saved, failed
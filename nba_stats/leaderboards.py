@@ -0,0 +1,233 @@
+"""
+File: leaderboards.py
+Description: Materialized league leaderboards built from the local stats store. Each board (career or a
+single season, regular or post season) is ranked for every supported stat in one vectorized pass and
+stored as LeaderboardEntry rows. When a player's stored rows change, only the boards they appear on are
+marked dirty and rebuilt.
+"""
+
+from django.db import transaction
+
+from .models import CareerTotals, SeasonStats, LeaderboardEntry, DirtyLeaderboard
+from .stats import compute_averages
+from .store import STAT_COLUMNS
+
+# Stats that can be ranked, with their display names
+LEADERBOARD_STATS = {
+    'PPG': 'Points Per Game',
+    'RPG': 'Rebounds Per Game',
+    'APG': 'Assists Per Game',
+    'STLPG': 'Steals Per Game',
+    'BLKPG': 'Blocks Per Game',
+    'MPG': 'Minutes Per Game',
+    'FG_PCT': 'Field Goal %',
+    'FG3_PCT': '3 Point %',
+    'FT_PCT': 'Free Throw %',
+    'TS_PCT': 'True Shooting %',
+    'PTS': 'Total Points',
+}
+
+# Minimum games and attempts needed to qualify, per (scope, season_type)
+THRESHOLDS = {
+    ('career', 'RegularSeason'): {'GP': 400, 'FGA': 2000, 'FG3A': 250, 'FTA': 1200},
+    ('career', 'PostSeason'): {'GP': 25, 'FGA': 150, 'FG3A': 35, 'FTA': 100},
+    ('season', 'RegularSeason'): {'GP': 58, 'FGA': 300, 'FG3A': 82, 'FTA': 125},
+    ('season', 'PostSeason'): {'GP': 8, 'FGA': 40, 'FG3A': 15, 'FTA': 20},
+}
+
+# Percentage stats also need a minimum number of attempts
+ATTEMPT_COLUMNS = {
+    'FG_PCT': 'FGA',
+    'FG3_PCT': 'FG3A',
+    'FT_PCT': 'FTA',
+    'TS_PCT': 'FGA',
+}
+
+# Number of ranked rows kept per board and stat
+LEADERBOARD_SIZE = 250
+
+
+def load_board_frame(scope, season_type, season_id=''):
+    """
+    Load the stat rows a board is ranked from as a DataFrame with API-style column names.
+
+    Season boards use a traded player's combined TOT row instead of their per-team rows.
+    """
+    import pandas as pd
+
+    fields = [column.lower() for column in STAT_COLUMNS]
+    if scope == 'career':
+        rows = CareerTotals.objects.filter(season_type=season_type).values('player_id', 'player__full_name', *fields)
+    else:
+        rows = SeasonStats.objects.filter(season_type=season_type, season_id=season_id).values(
+            'player_id', 'player__full_name', 'team_abbreviation', *fields
+        )
+
+    frame = pd.DataFrame.from_records(list(rows))
+    if frame.empty:
+        return frame
+    frame = frame.rename(columns={field: field.upper() for field in fields})
+    frame = frame.rename(columns={'player__full_name': 'player_name'})
+
+    if 'team_abbreviation' in frame:
+        traded = set(frame.loc[frame['team_abbreviation'] == 'TOT', 'player_id'])
+        frame = frame[~frame['player_id'].isin(traded) | (frame['team_abbreviation'] == 'TOT')]
+    else:
+        frame['team_abbreviation'] = ''
+    return frame.reset_index(drop=True)
+
+
+def rank_board(frame, scope, season_type):
+    """
+    Rank every leaderboard stat for one board.
+
+    Args:
+        frame (pandas.DataFrame): Rows from load_board_frame.
+        scope (str): 'career' or 'season'.
+        season_type (str): 'RegularSeason' or 'PostSeason'.
+
+    Returns:
+        dict: Maps each stat to a DataFrame of its top LEADERBOARD_SIZE qualifying rows, best first.
+    """
+    if frame.empty:
+        return {stat: frame for stat in LEADERBOARD_STATS}
+    import pandas as pd
+
+    totals = frame[STAT_COLUMNS].apply(pd.to_numeric, errors='coerce').fillna(0)
+    derived = compute_averages(frame)
+    table = pd.concat([frame[['player_id', 'player_name', 'team_abbreviation']], totals.drop(columns=derived.columns, errors='ignore'), derived], axis=1)
+
+    thresholds = THRESHOLDS[(scope, season_type)]
+    qualified_games = table['GP'] >= thresholds['GP']
+
+    ranked = {}
+    for stat in LEADERBOARD_STATS:
+        qualified = qualified_games
+        if stat in ATTEMPT_COLUMNS:
+            attempts = ATTEMPT_COLUMNS[stat]
+            qualified = qualified & (table[attempts] >= thresholds[attempts])
+        elif stat == 'PTS':
+            qualified = table['GP'] > 0
+        ranked[stat] = (
+            table[qualified]
+            .sort_values([stat, 'GP', 'player_name'], ascending=[False, False, True])
+            .head(LEADERBOARD_SIZE)
+        )
+    return ranked
+
+
+def rebuild_board(scope, season_type, season_id=''):
+    """
+    Recompute and store every stat's rankings for one board.
+
+    Returns:
+        int: Number of LeaderboardEntry rows written.
+    """
+    season_id = season_id if scope == 'season' else ''
+    ranked = rank_board(load_board_frame(scope, season_type, season_id), scope, season_type)
+
+    entries = []
+    for stat, rows in ranked.items():
+        for rank, row in enumerate(rows.itertuples(index=False), start=1):
+            entries.append(LeaderboardEntry(
+                scope=scope,
+                season_type=season_type,
+                season_id=season_id,
+                stat=stat,
+                rank=rank,
+                player_id=row.player_id,
+                player_name=row.player_name,
+                team_abbreviation=row.team_abbreviation or '',
+                games=int(row.GP),
+                value=float(getattr(row, stat)),
+            ))
+
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(scope=scope, season_type=season_type, season_id=season_id).delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
+
+
+def mark_dirty(boards):
+    """
+    Record boards that need rebuilding.
+
+    Args:
+        boards (iterable): (scope, season_type, season_id) tuples.
+    """
+    DirtyLeaderboard.objects.bulk_create(
+        [DirtyLeaderboard(scope=scope, season_type=season_type, season_id=season_id)
+         for scope, season_type, season_id in set(boards)],
+        ignore_conflicts=True,
+    )
+
+
+def rebuild_dirty():
+    """
+    Rebuild every board marked dirty since the last rebuild.
+
+    Each board's dirty mark is claimed (deleted) before the board is rebuilt, so a mark made while the
+    rebuild runs is kept for the next one instead of being dropped. A board whose rebuild fails is marked
+    dirty again.
+
+    Returns:
+        int: Number of boards rebuilt.
+    """
+    rebuilt = 0
+    for board in DirtyLeaderboard.objects.all():
+        claimed, _ = DirtyLeaderboard.objects.filter(pk=board.pk).delete()
+        if not claimed:
+            # Another process is already rebuilding this board
+            continue
+        try:
+            rebuild_board(board.scope, board.season_type, board.season_id)
+        except Exception:
+            mark_dirty([(board.scope, board.season_type, board.season_id)])
+            raise
+        rebuilt += 1
+    return rebuilt
+
+
+def rebuild_all():
+    """
+    Rebuild every career and season board from scratch.
+
+    Returns:
+        int: Number of boards rebuilt.
+    """
+    boards = {('career', season_type, '') for season_type in ('RegularSeason', 'PostSeason')}
+    boards |= {
+        ('season', season_type, season_id)
+        for season_type, season_id in SeasonStats.objects.values_list('season_type', 'season_id').distinct()
+    }
+    for board in boards:
+        rebuild_board(*board)
+    DirtyLeaderboard.objects.all().delete()
+    return len(boards)
+
+
+def available_seasons(season_type):
+    """Return the season IDs that have a leaderboard, most recent first."""
+    return list(
+        LeaderboardEntry.objects.filter(scope='season', season_type=season_type)
+        .order_by('-season_id').values_list('season_id', flat=True).distinct()
+    )
+
+
+def get_page(scope, season_type, season_id, stat, page, per_page):
+    """
+    Return one page of a leaderboard as an indexed range scan over rank.
+
+    Returns:
+        (list, bool): The page's LeaderboardEntry rows and whether a next page exists.
+    """
+    start = (page - 1) * per_page
+    entries = list(LeaderboardEntry.objects.filter(
+        scope=scope,
+        season_type=season_type,
+        season_id=season_id if scope == 'season' else '',
+        stat=stat,
+        rank__gt=start,
+        rank__lte=start + per_page + 1,
+    ))
+    return entries[:per_page], len(entries) > per_page
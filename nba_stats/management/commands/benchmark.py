@@ -0,0 +1,142 @@
+"""
+File: benchmark.py
+Description: Management command that benchmarks the main pages against a local fake upstream instead of
+stats.nba.com and nba.com, so performance changes can be measured repeatably. Runs in a throwaway test
+database with temporary cache directories, and reports p50/p95/p99 latency, throughput and upstream calls
+per scenario.
+
+Usage:
+    python manage.py benchmark                                  # test client and HTTP, 200 requests per scenario
+    python manage.py benchmark --mode http --concurrency 16     # concurrent HTTP load only
+    python manage.py benchmark --latency 0.3 --jitter 0.2       # slower upstream
+    python manage.py benchmark --error-rate 0.2                 # 20% of upstream requests fail with a 503
+    python manage.py benchmark --scenario player_details --prewarm
+"""
+
+import json
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from nba_stats import cache, upstream
+from nba_stats.bench.fake_upstream import FakeUpstream
+from nba_stats.bench.load import ClientDriver, HTTPDriver, SCENARIO_NAMES, create_users, pick_players, run_scenarios
+
+
+class Command(BaseCommand):
+    help = "Benchmark the main pages against a local fake upstream and report latency, throughput and upstream calls."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['client', 'http', 'both'], default='both',
+                            help="Django test client, concurrent HTTP, or both (default).")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Concurrent HTTP clients.")
+        parser.add_argument('--players', type=int, default=50, help="Distinct players requests cycle through.")
+        parser.add_argument('--users', type=int, default=4, help="Logged-in users for the roster scenarios.")
+        parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every upstream response.")
+        parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many extra seconds per response.")
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help="Fraction of upstream requests answered with a 503.")
+        parser.add_argument('--scenario', action='append', choices=SCENARIO_NAMES,
+                            help="Only run this scenario (repeatable).")
+        parser.add_argument('--prewarm', action='store_true',
+                            help="Load every player once before measuring, so only warm requests are timed.")
+        parser.add_argument('--json', action='store_true', help="Print the reports as JSON.")
+
+    def handle(self, *args, **options):
+        players = pick_players(options['players'])
+        fake = FakeUpstream(
+            latency=options['latency'], jitter=options['jitter'], error_rate=options['error_rate'],
+            names={player['id']: player['full_name'] for player in players},
+        ).start()
+        workdir = tempfile.mkdtemp(prefix='nba_stats_bench_')
+
+        overrides = {
+            'NBA_STATS_UPSTREAM': {
+                **getattr(settings, 'NBA_STATS_UPSTREAM', {}),
+                'STATS_BASE_URL': f'{fake.base_url}/stats',
+                'WEB_BASE_URL': fake.base_url,
+                'BACKOFF': 0.05,
+            },
+            'NBA_STATS_CAREER_CACHE': {
+                **getattr(settings, 'NBA_STATS_CAREER_CACHE', {}),
+                'FILE_DIR': f'{workdir}/career_stats',
+            },
+            'NBA_STATS_HEADSHOT_DIR': f'{workdir}/headshots',
+            'NBA_STATS_OFFLINE': False,
+            # No request sampling: its JSON log lines would be mixed into the report, and it adds overhead
+            'NBA_STATS_TIMING': {**getattr(settings, 'NBA_STATS_TIMING', {}), 'SAMPLE_RATE': 0},
+            # A private cache, so clearing it between runs never touches the shared default cache
+            'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'}},
+            'ALLOWED_HOSTS': ['127.0.0.1', 'localhost', 'testserver'],
+        }
+
+        setup_test_environment()
+        if connection.vendor == 'sqlite':
+            # A file database, so the HTTP server's threads share it
+            connection.settings_dict['TEST']['NAME'] = f'{workdir}/bench.sqlite3'
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(**overrides):
+                self.reset_clients()
+                reports = self.run_benchmark(fake, players, options)
+        finally:
+            self.reset_clients()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            fake.stop()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(reports, indent=2))
+        else:
+            self.print_reports(reports)
+
+    def reset_clients(self):
+        """Drop the process-wide upstream client and cache backend so they pick up the current settings."""
+        upstream._client = None
+        cache._backend = None
+        for alias in settings.CACHES:
+            caches[alias].clear()
+
+    def run_benchmark(self, fake, players, options):
+        users = create_users(options['users'])
+        modes = ['client', 'http'] if options['mode'] == 'both' else [options['mode']]
+        reports = []
+
+        for mode in modes:
+            if mode == 'http':
+                driver = HTTPDriver(users)
+            else:
+                driver = ClientDriver(users)
+            try:
+                if options['prewarm']:
+                    run_scenarios(driver, fake, players, len(players), options['concurrency'],
+                                  scenarios=['player_details'])
+                reports += run_scenarios(driver, fake, players, options['requests'], options['concurrency'],
+                                         scenarios=options['scenario'])
+            finally:
+                if mode == 'http':
+                    driver.close()
+        return reports
+
+    def print_reports(self, reports):
+        self.stdout.write(
+            f"{'scenario':<16}{'mode':<8}{'reqs':>6}{'errs':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'req/s':>9}{'upstream':>10}{'coalesced':>11}"
+        )
+        for report in reports:
+            self.stdout.write(
+                f"{report['scenario']:<16}{report['mode']:<8}{report['requests']:>6}{report['errors']:>6}"
+                f"{report['p50_ms']:>9.1f}{report['p95_ms']:>9.1f}{report['p99_ms']:>9.1f}"
+                f"{report['throughput']:>9.1f}{report['upstream_calls']:>10}{report['coalesced']:>11}"
+            )
+            if report['upstream'] or report['upstream_errors']:
+                calls = ', '.join(f'{endpoint} {count}' for endpoint, count in sorted(report['upstream'].items()))
+                self.stdout.write(f"    upstream: {calls}; injected errors {report['upstream_errors']}; "
+                                  f"background refreshes {report['revalidations']}")
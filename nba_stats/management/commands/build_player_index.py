@@ -0,0 +1,41 @@
+"""
+File: build_player_index.py
+Description: Management command that builds the player search index from nba_api's static player list and
+saves it as a prebuilt artifact (settings.NBA_STATS_PLAYER_INDEX), so worker processes load the index in one
+read at start-up instead of building it. Run at build time, after installing requirements.
+
+Usage:
+    python manage.py build_player_index                       # write to settings.NBA_STATS_PLAYER_INDEX
+    python manage.py build_player_index --output index.bin    # write somewhere else
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from nba_stats.search import build_index, get_index_path, load_index, save_index
+
+
+class Command(BaseCommand):
+    help = "Build the player search index and save it as a prebuilt artifact for worker start-up."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="File to write (default: settings.NBA_STATS_PLAYER_INDEX).")
+
+    def handle(self, *args, **options):
+        path = options['output'] or get_index_path()
+
+        started = time.perf_counter()
+        index = build_index()
+        built = time.perf_counter() - started
+
+        size = save_index(index, path)
+
+        started = time.perf_counter()
+        load_index(path)
+        loaded = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(index.players)} players to {path} ({size / 1024:.0f} KB). "
+            f"Building took {built * 1000:.0f} ms; loading takes {loaded * 1000:.0f} ms."
+        ))
@@ -0,0 +1,47 @@
+"""
+File: export_stats.py
+Description: Management command that exports season-by-season or career rows from the local stats store
+to a CSV or Parquet file, streaming rows from the database so memory use stays constant.
+
+Usage:
+    python manage.py export_stats --output seasons.csv                        # every season row as CSV
+    python manage.py export_stats --format parquet --output seasons.parquet   # columnar (only if pyarrow is installed)
+    python manage.py export_stats --table career --season-type PostSeason --output playoffs.csv
+    python manage.py export_stats --ids 2544 201939 --output two_players.csv
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nba_stats.export import EXPORT_TABLES, export_formats, iter_csv, write_parquet
+from nba_stats.models import SEASON_TYPES
+
+
+class Command(BaseCommand):
+    help = "Export season or career stats from the local stats store to CSV or Parquet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', required=True, help="File to write.")
+        parser.add_argument('--format', choices=export_formats(), default='csv',
+                            help="Output format (default csv; parquet is offered when pyarrow is installed).")
+        parser.add_argument('--table', choices=list(EXPORT_TABLES), default='seasons',
+                            help="'seasons' for season-by-season rows (default) or 'career' for career totals.")
+        parser.add_argument('--season-type', choices=[season_type for season_type, _ in SEASON_TYPES],
+                            help="Only export one season type (default: both).")
+        parser.add_argument('--ids', nargs='+', type=int, help="Only export these player IDs.")
+
+    def handle(self, *args, **options):
+        filters = {'player_ids': options['ids'], 'season_type': options['season_type']}
+
+        if options['format'] == 'parquet':
+            try:
+                rows = write_parquet(options['output'], options['table'], **filters)
+            except ImportError as e:
+                raise CommandError(str(e))
+        else:
+            rows = -1  # header line
+            with open(options['output'], 'w', newline='') as f:
+                for line in iter_csv(options['table'], **filters):
+                    f.write(line)
+                    rows += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} rows to {options['output']}."))
@@ -0,0 +1,136 @@
+"""
+File: ingest_stats.py
+Description: Management command that bulk-ingests PlayerCareerStats for every player (or a filtered set)
+into the local stats store, so player pages can be served with no network access at request time.
+
+Usage:
+    python manage.py ingest_stats                     # every player in nba_api's static list
+    python manage.py ingest_stats --active-only       # only active players
+    python manage.py ingest_stats --ids 2544 201939   # specific players
+    python manage.py ingest_stats --restart           # ignore the checkpoint and start over
+    python manage.py ingest_stats --incremental       # nightly refresh: active, new or changed players only
+"""
+
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from nba_stats.cache import fetch_career_stats
+from nba_stats.ingest import Checkpoint, run_ingest
+from nba_stats.leaderboards import rebuild_dirty
+from nba_stats.models import Player
+from nba_stats.search import get_index
+from nba_stats.store import save_career_dict
+
+
+class Command(BaseCommand):
+    help = "Bulk-ingest career and season totals from the NBA API into the local stats store."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', nargs='+', type=int, help="Only ingest these player IDs.")
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--active-only', action='store_true', help="Only ingest active players.")
+        group.add_argument('--retired-only', action='store_true', help="Only ingest retired players.")
+        parser.add_argument('--limit', type=int, help="Stop after this many players.")
+        parser.add_argument('--workers', type=int, default=4, help="Concurrent API requests (default 4).")
+        parser.add_argument('--rate', type=float, default=1.0,
+                            help="Maximum API requests per second across all workers (default 1, 0 for no limit).")
+        parser.add_argument('--checkpoint', default=os.path.join(settings.BASE_DIR, 'ingest_checkpoint.json'),
+                            help="Checkpoint file used to resume interrupted runs.")
+        parser.add_argument('--restart', action='store_true', help="Discard the checkpoint and ingest every player again.")
+        parser.add_argument('--incremental', action='store_true',
+                            help="Only re-fetch active players, players never ingested, and players whose active "
+                                 "flag changed since they were last fetched. The checkpoint is not used.")
+        parser.add_argument('--max-age', type=float, default=20,
+                            help="With --incremental, skip active players fetched within this many hours (default 20).")
+
+    def select_players(self, options):
+        """Return the static player dicts matching the command line filters."""
+        selected = get_index().players
+        if options['ids']:
+            wanted = set(options['ids'])
+            selected = [player for player in selected if player['id'] in wanted]
+        if options['active_only']:
+            selected = [player for player in selected if player['is_active']]
+        if options['retired_only']:
+            selected = [player for player in selected if not player['is_active']]
+        return selected
+
+    def select_incremental(self, candidates, max_age_hours):
+        """
+        Return the IDs of players that need refreshing: never ingested, active and not fetched within
+        max_age_hours, or whose active flag in the static list differs from the stored one (e.g. they
+        retired since their last fetch). Retired players with a stored snapshot are skipped.
+        """
+        stored = {
+            row['player_id']: row
+            for row in Player.objects.filter(fetched_at__isnull=False).values('player_id', 'is_active', 'fetched_at')
+        }
+        cutoff = timezone.now() - timedelta(hours=max_age_hours)
+
+        player_ids = []
+        for player in candidates:
+            row = stored.get(player['id'])
+            if row is None or row['is_active'] != player['is_active']:
+                player_ids.append(player['id'])
+            elif player['is_active'] and row['fetched_at'] < cutoff:
+                player_ids.append(player['id'])
+        return player_ids
+
+    def handle(self, *args, **options):
+        candidates = self.select_players(options)
+
+        if options['incremental']:
+            checkpoint = None
+            player_ids = self.select_incremental(candidates, options['max_age'])
+            self.stdout.write(f"Incremental refresh of {len(player_ids)} of {len(candidates)} players.")
+        else:
+            checkpoint = Checkpoint(options['checkpoint'])
+            if options['restart']:
+                checkpoint.clear()
+            player_ids = [player['id'] for player in candidates if player['id'] not in checkpoint.done]
+            self.stdout.write(f"Ingesting {len(player_ids)} players "
+                              f"({len(checkpoint.done)} already done according to the checkpoint).")
+
+        if options['limit']:
+            player_ids = player_ids[:options['limit']]
+
+        # Tally how many players and stat rows actually changed
+        totals = {'players_changed': 0, 'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+        def save(player_id, career_dict):
+            _, changes = save_career_dict(player_id, career_dict)
+            if changes['created'] or changes['updated'] or changes['deleted']:
+                totals['players_changed'] += 1
+            for name, count in changes.items():
+                totals[name] += count
+
+        def on_progress(player_id, error):
+            if error:
+                self.stderr.write(f"  {player_id}: failed ({error})")
+            elif options['verbosity'] > 1:
+                self.stdout.write(f"  {player_id}: saved")
+
+        saved, failed = run_ingest(
+            player_ids,
+            fetch=fetch_career_stats,
+            save=save,
+            workers=options['workers'],
+            rate=options['rate'],
+            checkpoint=checkpoint,
+            on_progress=on_progress,
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Saved {saved} players, {failed} failed."))
+        self.stdout.write(
+            f"{totals['players_changed']} players changed: {totals['created']} rows created, "
+            f"{totals['updated']} updated, {totals['deleted']} deleted, {totals['unchanged']} unchanged."
+        )
+        if failed:
+            self.stdout.write("Re-run the command to retry failed players.")
+
+        # Re-rank only the leaderboards touched by changed rows
+        self.stdout.write(f"Rebuilt {rebuild_dirty()} leaderboards.")
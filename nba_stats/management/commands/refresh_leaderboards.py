@@ -0,0 +1,23 @@
+"""
+File: refresh_leaderboards.py
+Description: Management command that rebuilds the materialized leaderboards from the local stats store.
+
+Usage:
+    python manage.py refresh_leaderboards          # only boards whose stats changed
+    python manage.py refresh_leaderboards --all    # every career and season board
+"""
+
+from django.core.management.base import BaseCommand
+
+from nba_stats.leaderboards import rebuild_all, rebuild_dirty
+
+
+class Command(BaseCommand):
+    help = "Rebuild leaderboards whose underlying stats changed (or all of them with --all)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Rebuild every board, not just dirty ones.")
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_all() if options['all'] else rebuild_dirty()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} leaderboards."))
@@ -0,0 +1,54 @@
+"""
+File: warm_cache.py
+Description: Management command that pre-fetches career stats and headshots for rostered and frequently
+viewed players, so their pages are served from local data. Meant to be run on a schedule (e.g. Heroku
+Scheduler every hour).
+
+Usage:
+    python manage.py warm_cache                  # top 100 viewed players plus every rostered player
+    python manage.py warm_cache --top 500        # keep more of the most viewed players warm
+    python manage.py warm_cache --no-rosters     # only the most viewed players
+    python manage.py warm_cache --dry-run        # report hit rates without fetching anything
+"""
+
+from django.core.management.base import BaseCommand
+
+from nba_stats.warm import get_setting, hit_rates, select_targets, warm
+
+
+class Command(BaseCommand):
+    help = "Pre-fetch career stats and headshots for rostered and frequently viewed players."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=get_setting('TOP_VIEWED'),
+                            help="Number of most viewed players to warm.")
+        parser.add_argument('--no-rosters', action='store_true', help="Skip players that are only on rosters.")
+        parser.add_argument('--workers', type=int, default=get_setting('WORKERS'),
+                            help="Concurrent upstream requests.")
+        parser.add_argument('--rate', type=float, default=get_setting('RATE'),
+                            help="Maximum upstream requests per second across all workers (0 for no limit).")
+        parser.add_argument('--dry-run', action='store_true', help="Only report current hit rates.")
+
+    def format_rates(self, rates):
+        return (f"page {rates['page']:.0%} (view-weighted {rates['weighted']:.0%}), "
+                f"career stats {rates['career']:.0%}, headshots {rates['headshot']:.0%}")
+
+    def handle(self, *args, **options):
+        player_ids = select_targets(options['top'], include_rosters=not options['no_rosters'])
+        self.stdout.write(f"{len(player_ids)} players selected.")
+
+        if options['dry_run']:
+            self.stdout.write(f"Hit rates: {self.format_rates(hit_rates(player_ids))}")
+            return
+
+        def on_progress(player_id, error):
+            if error:
+                self.stderr.write(f"  {player_id}: failed ({error})")
+            elif options['verbosity'] > 1:
+                self.stdout.write(f"  {player_id}: warmed")
+
+        report = warm(player_ids, workers=options['workers'], rate=options['rate'], on_progress=on_progress)
+
+        self.stdout.write(self.style.SUCCESS(f"Warmed {report['fetched']} players, {report['failed']} failed."))
+        self.stdout.write(f"Before: {self.format_rates(report['before'])}")
+        self.stdout.write(f"After:  {self.format_rates(report['after'])}")
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nba_stats', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedCareerStats',
+            fields=[
+                ('player_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('data', models.JSONField()),
+                ('fetched_at', models.FloatField()),
+            ],
+        ),
+    ]
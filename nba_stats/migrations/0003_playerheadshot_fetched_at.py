@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nba_stats', '0002_cachedcareerstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerheadshot',
+            name='fetched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='playerheadshot',
+            name='is_placeholder',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nba_stats', '0003_playerheadshot_fetched_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Player',
+            fields=[
+                ('player_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('full_name', models.CharField(max_length=100)),
+                ('is_active', models.BooleanField(db_index=True, default=False)),
+                ('fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('content_hash', models.CharField(blank=True, default='', max_length=64)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CareerTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gp', models.IntegerField(blank=True, null=True)),
+                ('gs', models.IntegerField(blank=True, null=True)),
+                ('min', models.FloatField(blank=True, null=True)),
+                ('fgm', models.IntegerField(blank=True, null=True)),
+                ('fga', models.IntegerField(blank=True, null=True)),
+                ('fg_pct', models.FloatField(blank=True, null=True)),
+                ('fg3m', models.IntegerField(blank=True, null=True)),
+                ('fg3a', models.IntegerField(blank=True, null=True)),
+                ('fg3_pct', models.FloatField(blank=True, null=True)),
+                ('ftm', models.IntegerField(blank=True, null=True)),
+                ('fta', models.IntegerField(blank=True, null=True)),
+                ('ft_pct', models.FloatField(blank=True, null=True)),
+                ('oreb', models.IntegerField(blank=True, null=True)),
+                ('dreb', models.IntegerField(blank=True, null=True)),
+                ('reb', models.IntegerField(blank=True, null=True)),
+                ('ast', models.IntegerField(blank=True, null=True)),
+                ('stl', models.IntegerField(blank=True, null=True)),
+                ('blk', models.IntegerField(blank=True, null=True)),
+                ('tov', models.IntegerField(blank=True, null=True)),
+                ('pf', models.IntegerField(blank=True, null=True)),
+                ('pts', models.IntegerField(blank=True, null=True)),
+                ('season_type', models.CharField(choices=[('RegularSeason', 'Regular Season'), ('PostSeason', 'Post Season')], max_length=20)),
+                ('league_id', models.CharField(blank=True, default='', max_length=2)),
+                ('team_id', models.IntegerField(blank=True, null=True)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='career_totals', to='nba_stats.player')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('player', 'season_type'), name='unique_career_totals')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SeasonStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gp', models.IntegerField(blank=True, null=True)),
+                ('gs', models.IntegerField(blank=True, null=True)),
+                ('min', models.FloatField(blank=True, null=True)),
+                ('fgm', models.IntegerField(blank=True, null=True)),
+                ('fga', models.IntegerField(blank=True, null=True)),
+                ('fg_pct', models.FloatField(blank=True, null=True)),
+                ('fg3m', models.IntegerField(blank=True, null=True)),
+                ('fg3a', models.IntegerField(blank=True, null=True)),
+                ('fg3_pct', models.FloatField(blank=True, null=True)),
+                ('ftm', models.IntegerField(blank=True, null=True)),
+                ('fta', models.IntegerField(blank=True, null=True)),
+                ('ft_pct', models.FloatField(blank=True, null=True)),
+                ('oreb', models.IntegerField(blank=True, null=True)),
+                ('dreb', models.IntegerField(blank=True, null=True)),
+                ('reb', models.IntegerField(blank=True, null=True)),
+                ('ast', models.IntegerField(blank=True, null=True)),
+                ('stl', models.IntegerField(blank=True, null=True)),
+                ('blk', models.IntegerField(blank=True, null=True)),
+                ('tov', models.IntegerField(blank=True, null=True)),
+                ('pf', models.IntegerField(blank=True, null=True)),
+                ('pts', models.IntegerField(blank=True, null=True)),
+                ('season_type', models.CharField(choices=[('RegularSeason', 'Regular Season'), ('PostSeason', 'Post Season')], max_length=20)),
+                ('row_number', models.IntegerField()),
+                ('season_id', models.CharField(max_length=10)),
+                ('league_id', models.CharField(blank=True, default='', max_length=2)),
+                ('team_id', models.IntegerField(blank=True, null=True)),
+                ('team_abbreviation', models.CharField(blank=True, default='', max_length=5)),
+                ('player_age', models.FloatField(blank=True, null=True)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seasons', to='nba_stats.player')),
+            ],
+            options={
+                'ordering': ['player', 'season_type', 'row_number'],
+                'indexes': [models.Index(fields=['season_type', 'season_id'], name='nba_stats_s_season__3e7574_idx')],
+                'constraints': [models.UniqueConstraint(fields=('player', 'season_type', 'row_number'), name='unique_season_row')],
+            },
+        ),
+    ]
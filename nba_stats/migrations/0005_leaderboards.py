@@ -0,0 +1,45 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nba_stats', '0004_local_stats_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirtyLeaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('career', 'Career'), ('season', 'Season')], max_length=10)),
+                ('season_type', models.CharField(choices=[('RegularSeason', 'Regular Season'), ('PostSeason', 'Post Season')], max_length=20)),
+                ('season_id', models.CharField(blank=True, default='', max_length=10)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'season_type', 'season_id'), name='unique_dirty_leaderboard')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('career', 'Career'), ('season', 'Season')], max_length=10)),
+                ('season_type', models.CharField(choices=[('RegularSeason', 'Regular Season'), ('PostSeason', 'Post Season')], max_length=20)),
+                ('season_id', models.CharField(blank=True, default='', max_length=10)),
+                ('stat', models.CharField(max_length=20)),
+                ('rank', models.IntegerField()),
+                ('player_id', models.IntegerField()),
+                ('player_name', models.CharField(max_length=100)),
+                ('team_abbreviation', models.CharField(blank=True, default='', max_length=5)),
+                ('games', models.IntegerField()),
+                ('value', models.FloatField()),
+            ],
+            options={
+                'ordering': ['scope', 'season_type', 'season_id', 'stat', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'season_type', 'season_id', 'stat', 'rank'), name='unique_leaderboard_rank')],
+            },
+        ),
+    ]
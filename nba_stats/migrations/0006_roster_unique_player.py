@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+def remove_duplicate_roster_rows(apps, schema_editor):
+    """Keep only the oldest row for each (user, player_id) so the unique constraint can be added."""
+    Roster = apps.get_model('nba_stats', 'Roster')
+    seen = set()
+    duplicates = []
+    for row in Roster.objects.order_by('id').values('id', 'user_id', 'player_id'):
+        key = (row['user_id'], row['player_id'])
+        if key in seen:
+            duplicates.append(row['id'])
+        seen.add(key)
+    Roster.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nba_stats', '0005_leaderboards'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_roster_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='roster',
+            constraint=models.UniqueConstraint(fields=('user', 'player_id'), name='unique_roster_player'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nba_stats', '0006_roster_unique_player'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerViewCount',
+            fields=[
+                ('player_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('views', models.PositiveIntegerField(db_index=True, default=0)),
+                ('last_viewed', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
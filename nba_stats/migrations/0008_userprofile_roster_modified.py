@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nba_stats', '0007_playerviewcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='roster_modified',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
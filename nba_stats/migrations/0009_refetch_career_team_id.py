@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def reset_hashes_of_rows_missing_team_id(apps, schema_editor):
+    """
+    Career totals were saved without their team ID (the API calls that column 'Team_ID'). Clear the content
+    hash of the affected players so their next fetch rewrites those rows even though the response is unchanged.
+    """
+    Player = apps.get_model('nba_stats', 'Player')
+    CareerTotals = apps.get_model('nba_stats', 'CareerTotals')
+    affected = CareerTotals.objects.filter(team_id__isnull=True).values('player_id')
+    Player.objects.filter(player_id__in=affected).update(content_hash='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nba_stats', '0008_userprofile_roster_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(reset_hashes_of_rows_missing_team_id, migrations.RunPython.noop),
+    ]
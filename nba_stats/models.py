@@ -10,6 +10,7 @@ from django.contrib.auth.models import AbstractUser, User
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     favorite_team = models.CharField(max_length=100, blank=True, null=True)  # Optional favorite NBA team
+    roster_modified = models.DateTimeField(blank=True, null=True)  # Last roster add/remove, used for ETags
 
     def __str__(self):
         return self.user.username
@@ -21,6 +22,12 @@ class Roster(models.Model):
     player_name = models.CharField(max_length=100)
     player_image_url = models.URLField()  # URL for the player's headshot
 
+    class Meta:
+        # One row per (user, player); the unique index also serves add/remove lookups
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'player_id'], name='unique_roster_player'),
+        ]
+
     def __str__(self):
         return f"{self.player_name} (Added by {self.user.user.username})"
 
@@ -36,6 +43,171 @@ class PlayerHeadShot(models.Model):
     player_image_url = models.URLField(default="https://via.placeholder.com/150")  # URL to player's headshot
     background_colour = models.CharField(max_length=7, blank=True, null=True, default="#FFFFFF") 
     # This could be used for styling player pages based on a team color or aesthetic
+    fetched_at = models.DateTimeField(blank=True, null=True)  # When the name/headshot were last scraped
+    is_placeholder = models.BooleanField(default=False)  # True if no headshot was found (negative cache entry)
 
     def __str__(self):
         return f"{self.player_name} Head Shot"
+
+
+class CachedCareerStats(models.Model):
+    """
+    Stores a player's raw PlayerCareerStats response for the database cache backend,
+    so repeat page views can be served without calling the NBA API.
+    """
+    player_id = models.IntegerField(primary_key=True)
+    data = models.JSONField()  # Normalized PlayerCareerStats dict
+    fetched_at = models.FloatField()  # UNIX timestamp of the API call that produced data
+
+    def __str__(self):
+        return f"Career stats for player {self.player_id}"
+
+
+class Player(models.Model):
+    """
+    A player in the local stats store. Rows are created by the ingest_stats command (or when a
+    player's career stats are fetched live) so player pages can be served without the NBA API.
+    """
+    player_id = models.IntegerField(primary_key=True)
+    full_name = models.CharField(max_length=100)
+    is_active = models.BooleanField(default=False, db_index=True)
+    fetched_at = models.DateTimeField(blank=True, null=True)  # When career stats were last fetched
+    content_hash = models.CharField(max_length=64, blank=True, default="")  # Hash of the last fetched stats
+
+    def __str__(self):
+        return self.full_name
+
+
+class StatLine(models.Model):
+    """Box score totals shared by season rows and career totals. Field names mirror the API's columns."""
+    gp = models.IntegerField(blank=True, null=True)
+    gs = models.IntegerField(blank=True, null=True)
+    min = models.FloatField(blank=True, null=True)
+    fgm = models.IntegerField(blank=True, null=True)
+    fga = models.IntegerField(blank=True, null=True)
+    fg_pct = models.FloatField(blank=True, null=True)
+    fg3m = models.IntegerField(blank=True, null=True)
+    fg3a = models.IntegerField(blank=True, null=True)
+    fg3_pct = models.FloatField(blank=True, null=True)
+    ftm = models.IntegerField(blank=True, null=True)
+    fta = models.IntegerField(blank=True, null=True)
+    ft_pct = models.FloatField(blank=True, null=True)
+    oreb = models.IntegerField(blank=True, null=True)
+    dreb = models.IntegerField(blank=True, null=True)
+    reb = models.IntegerField(blank=True, null=True)
+    ast = models.IntegerField(blank=True, null=True)
+    stl = models.IntegerField(blank=True, null=True)
+    blk = models.IntegerField(blank=True, null=True)
+    tov = models.IntegerField(blank=True, null=True)
+    pf = models.IntegerField(blank=True, null=True)
+    pts = models.IntegerField(blank=True, null=True)
+
+    class Meta:
+        abstract = True
+
+
+# Season types stored locally, matching the API's RegularSeason/PostSeason result sets
+SEASON_TYPES = (
+    ('RegularSeason', 'Regular Season'),
+    ('PostSeason', 'Post Season'),
+)
+
+
+class SeasonStats(StatLine):
+    """One row of a player's SeasonTotalsRegularSeason or SeasonTotalsPostSeason table."""
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="seasons")
+    season_type = models.CharField(max_length=20, choices=SEASON_TYPES)
+    row_number = models.IntegerField()  # Position in the API's table (a season can have one row per team)
+    season_id = models.CharField(max_length=10)
+    league_id = models.CharField(max_length=2, blank=True, default="")
+    team_id = models.IntegerField(blank=True, null=True)
+    team_abbreviation = models.CharField(max_length=5, blank=True, default="")
+    player_age = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['player', 'season_type', 'row_number']
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'season_type', 'row_number'], name='unique_season_row'),
+        ]
+        indexes = [
+            models.Index(fields=['season_type', 'season_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} {self.season_id} {self.team_abbreviation} ({self.season_type})"
+
+
+class CareerTotals(StatLine):
+    """A player's CareerTotalsRegularSeason or CareerTotalsPostSeason row."""
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="career_totals")
+    season_type = models.CharField(max_length=20, choices=SEASON_TYPES)
+    league_id = models.CharField(max_length=2, blank=True, default="")
+    team_id = models.IntegerField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'season_type'], name='unique_career_totals'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} career totals ({self.season_type})"
+
+
+# Leaderboard scopes: career totals, or a single season
+LEADERBOARD_SCOPES = (
+    ('career', 'Career'),
+    ('season', 'Season'),
+)
+
+
+class LeaderboardEntry(models.Model):
+    """
+    One ranked row of a materialized leaderboard. A board is identified by (scope, season_type,
+    season_id, stat); season_id is blank for career boards. Rows are rebuilt by nba_stats.leaderboards
+    when the underlying stats change, so serving a page is a range scan over rank.
+    """
+    scope = models.CharField(max_length=10, choices=LEADERBOARD_SCOPES)
+    season_type = models.CharField(max_length=20, choices=SEASON_TYPES)
+    season_id = models.CharField(max_length=10, blank=True, default="")
+    stat = models.CharField(max_length=20)
+    rank = models.IntegerField()
+    player_id = models.IntegerField()
+    player_name = models.CharField(max_length=100)
+    team_abbreviation = models.CharField(max_length=5, blank=True, default="")
+    games = models.IntegerField()
+    value = models.FloatField()
+
+    class Meta:
+        ordering = ['scope', 'season_type', 'season_id', 'stat', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'season_type', 'season_id', 'stat', 'rank'],
+                                    name='unique_leaderboard_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.stat} #{self.rank}: {self.player_name}"
+
+
+class DirtyLeaderboard(models.Model):
+    """A leaderboard whose underlying stat rows changed and which needs to be rebuilt."""
+    scope = models.CharField(max_length=10, choices=LEADERBOARD_SCOPES)
+    season_type = models.CharField(max_length=20, choices=SEASON_TYPES)
+    season_id = models.CharField(max_length=10, blank=True, default="")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'season_type', 'season_id'], name='unique_dirty_leaderboard'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.season_type} {self.season_id}".strip()
+
+
+class PlayerViewCount(models.Model):
+    """A running tally of player page views, used to pick which players the warm_cache command pre-fetches."""
+    player_id = models.IntegerField(primary_key=True)
+    views = models.PositiveIntegerField(default=0, db_index=True)
+    last_viewed = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Player {self.player_id}: {self.views} views"
@@ -0,0 +1,82 @@
+"""
+File: revalidate.py
+Description: Background refreshes for stale-while-revalidate serving. Views return expired data right away
+and hand the upstream refresh to a small shared thread pool, so no request thread waits on stats.nba.com
+for data it already has. Each key is queued at most once at a time.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class Revalidator:
+    """
+    A bounded pool of background workers running keyed refresh jobs.
+
+    Attributes:
+        name (str): Label used in logs and when reporting counters.
+        scheduled (int): Refreshes queued by schedule().
+        skipped (int): schedule() calls ignored because the key was already queued or running.
+        failed (int): Refreshes that raised an exception.
+    """
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.executor = None
+        self.scheduled = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def schedule(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) in the background unless a refresh for `key` is already pending.
+
+        Returns:
+            bool: True if a refresh was queued.
+        """
+        with self.lock:
+            if key in self.pending:
+                self.skipped += 1
+                return False
+            self.pending.add(key)
+            self.scheduled += 1
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f'revalidate-{self.name}')
+        self.executor.submit(self._run, key, func, args, kwargs)
+        return True
+
+    def _run(self, key, func, args, kwargs):
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            with self.lock:
+                self.failed += 1
+            logger.warning("Background %s refresh for %s failed: %r", self.name, key, e)
+        finally:
+            with self.lock:
+                self.pending.discard(key)
+            # Worker threads open their own database connections; don't leave them dangling
+            connections.close_all()
+
+    def stats(self):
+        """Return this pool's counters as a dict."""
+        with self.lock:
+            return {
+                'scheduled': self.scheduled,
+                'skipped': self.skipped,
+                'failed': self.failed,
+                'pending': len(self.pending),
+            }
+
+
+# One pool for all player page refreshes (career stats and name/headshot)
+player_revalidator = Revalidator('player', getattr(settings, 'NBA_STATS_REVALIDATE_WORKERS', 4))
@@ -0,0 +1,391 @@
+"""
+File: search.py
+Description: In-memory player name search engine built once from nba_api's static player list.
+Names are normalized (lowercased, accents folded to ASCII, punctuation removed) and indexed in a
+prefix table for as-you-type matching and a trigram index for typo tolerance. Common nicknames are
+indexed as extra names. Results are ranked by match quality with active players boosted. The built
+index can be saved as a prebuilt artifact that worker processes load in one read.
+"""
+
+import gc
+import logging
+import marshal
+import os
+import re
+import sys
+import tempfile
+import threading
+import unicodedata
+from collections import Counter
+from importlib.metadata import version
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Well-known nicknames, indexed as additional names for the player they refer to
+NICKNAMES = {
+    'King James': 'LeBron James',
+    'Bron': 'LeBron James',
+    'MJ': 'Michael Jordan',
+    'Air Jordan': 'Michael Jordan',
+    'Black Mamba': 'Kobe Bryant',
+    'Mamba': 'Kobe Bryant',
+    'Shaq': "Shaquille O'Neal",
+    'Diesel': "Shaquille O'Neal",
+    'Greek Freak': 'Giannis Antetokounmpo',
+    'Joker': 'Nikola Jokic',
+    'Steph': 'Stephen Curry',
+    'Chef Curry': 'Stephen Curry',
+    'KD': 'Kevin Durant',
+    'Slim Reaper': 'Kevin Durant',
+    'The Beard': 'James Harden',
+    'The Answer': 'Allen Iverson',
+    'AI': 'Allen Iverson',
+    'The Dream': 'Hakeem Olajuwon',
+    'Big O': 'Oscar Robertson',
+    'Dr J': 'Julius Erving',
+    'The Mailman': 'Karl Malone',
+    'The Admiral': 'David Robinson',
+    'Big Fundamental': 'Tim Duncan',
+    'Dame': 'Damian Lillard',
+    'CP3': 'Chris Paul',
+    'AD': 'Anthony Davis',
+    'The Brow': 'Anthony Davis',
+    'Wemby': 'Victor Wembanyama',
+    'SGA': 'Shai Gilgeous-Alexander',
+    'Luka': 'Luka Doncic',
+    'Dirk': 'Dirk Nowitzki',
+    'Ant': 'Anthony Edwards',
+    'Ant-Man': 'Anthony Edwards',
+    'Pistol Pete': 'Pete Maravich',
+    'Penny': 'Anfernee Hardaway',
+    'The Glove': 'Gary Payton',
+    'The Worm': 'Dennis Rodman',
+    'Klay': 'Klay Thompson',
+    'Melo': 'Carmelo Anthony',
+    'D-Wade': 'Dwyane Wade',
+    'Flash': 'Dwyane Wade',
+    'Zo': 'Alonzo Mourning',
+    'T-Mac': 'Tracy McGrady',
+    'Vinsanity': 'Vince Carter',
+    'Russ': 'Russell Westbrook',
+}
+
+# Score components used for ranking
+EXACT_SCORE = 100
+PREFIX_SCORE = 50
+FUZZY_SCORE = 30
+
+# Added to prefix matches of active players; kept below the prefix tier's coverage range (10) so it can
+# reorder prefix matches but never lift one above an exact match. Exact and fuzzy matches are ranked by
+# score, with active status only breaking ties, so an active player never beats a closer typo match.
+ACTIVE_BOOST = 5
+
+# Minimum share of the query's trigrams a name must contain to count as a fuzzy match
+FUZZY_THRESHOLD = 0.5
+
+
+def normalize(text):
+    """
+    Normalize a name for indexing and querying.
+
+    Accents are folded to ASCII ("Jokić" -> "jokic"), apostrophes and periods are dropped
+    ("O'Neal" -> "oneal", "J.J." -> "jj"), any other punctuation becomes a space, and the
+    result is lowercased with whitespace collapsed.
+    """
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    text = re.sub(r"['.`]", '', text)
+    text = re.sub(r'[^a-z0-9]+', ' ', text)
+    return text.strip()
+
+
+def trigrams(tokens):
+    """Return the set of trigrams of each token, padded so short tokens and word edges still count."""
+    grams = set()
+    for token in tokens:
+        padded = f'  {token} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# Number of precomputed autocomplete suggestions kept for each prefix
+COMPLETION_SIZE = 10
+
+# Bumped whenever the index layout changes, so older prebuilt artifacts are rebuilt instead of loaded
+INDEX_FORMAT = 1
+
+
+class PlayerSearchIndex:
+    """
+    Search index over a list of player dicts (as returned by nba_api's players.get_players()).
+
+    Every prefix of every name token maps to the players having it and the best ranked of them
+    for autocomplete, in one flat dict. All lookups are tuples of player positions, so the whole
+    index is plain data that can be saved to and loaded from a prebuilt artifact (see to_data).
+
+    Attributes:
+        players (list): The indexed player dicts, addressed by position.
+        by_id (dict): Maps player_id to its player dict.
+    """
+
+    def __init__(self, player_list, nicknames=NICKNAMES):
+        self.players = list(player_list)
+        self.by_id = {player['id']: player for player in self.players}
+        self.full_names = [normalize(player['full_name']) or player['full_name'] for player in self.players]
+        names = [set() for _ in self.players]  # normalized names (full name + nicknames)
+        exact = {}  # normalized name -> player positions
+        prefixes = {}  # name token prefix -> player positions
+
+        for i, player in enumerate(self.players):
+            self.add_name(i, player['full_name'], names, exact, prefixes)
+
+        # Index nicknames against the player they refer to (preferring active players on name clashes)
+        for nickname, full_name in nicknames.items():
+            for i in sorted(exact.get(normalize(full_name), ()), key=lambda i: not self.players[i]['is_active'])[:1]:
+                self.add_name(i, nickname, names, exact, prefixes)
+
+        trigram_index = {}  # trigram -> player positions
+        for i, player_names in enumerate(names):
+            player_trigrams = set()
+            for name in player_names:
+                player_trigrams |= trigrams(name.split())
+            for gram in player_trigrams:
+                trigram_index.setdefault(gram, set()).add(i)
+
+        # Completion order: active players first, then alphabetical
+        order = sorted(range(len(self.players)), key=lambda i: (not self.players[i]['is_active'], self.full_names[i]))
+        self.completion_rank = [0] * len(self.players)
+        for rank, i in enumerate(order):
+            self.completion_rank[i] = rank
+
+        self.exact = {name: tuple(ids) for name, ids in exact.items()}
+        self.trigram_index = {gram: tuple(ids) for gram, ids in trigram_index.items()}
+        self.prefixes = {
+            prefix: (tuple(ids), tuple(sorted(ids, key=self.completion_rank.__getitem__)[:COMPLETION_SIZE]))
+            for prefix, ids in prefixes.items()
+        }
+
+    @staticmethod
+    def add_name(i, name, names, exact, prefixes):
+        """Index `name` (a full name or nickname) for the player at position i."""
+        normalized = normalize(name)
+        if not normalized:
+            return
+        names[i].add(normalized)
+        exact.setdefault(normalized, set()).add(i)
+
+        # Index every prefix of every token, plus of the whole name with spaces removed ("lebronjames")
+        tokens = normalized.split()
+        for token in tokens + [''.join(tokens)]:
+            for end in range(1, len(token) + 1):
+                prefixes.setdefault(token[:end], set()).add(i)
+
+    def to_data(self):
+        """Return the index as plain data (tuples, dicts, strings and ints) for saving with marshal."""
+        return {
+            'format': INDEX_FORMAT,
+            'players': [
+                (player['id'], player['full_name'], player['first_name'], player['last_name'], player['is_active'])
+                for player in self.players
+            ],
+            'full_names': self.full_names,
+            'completion_rank': self.completion_rank,
+            'exact': self.exact,
+            'trigram_index': self.trigram_index,
+            'prefixes': self.prefixes,
+        }
+
+    @classmethod
+    def from_data(cls, data):
+        """Rebuild an index saved with to_data, without re-indexing any names."""
+        index = cls.__new__(cls)
+        index.players = [
+            {'id': player_id, 'full_name': full_name, 'first_name': first_name, 'last_name': last_name,
+             'is_active': is_active}
+            for player_id, full_name, first_name, last_name, is_active in data['players']
+        ]
+        index.by_id = {player['id']: player for player in index.players}
+        index.full_names = data['full_names']
+        index.completion_rank = data['completion_rank']
+        index.exact = data['exact']
+        index.trigram_index = data['trigram_index']
+        index.prefixes = data['prefixes']
+        return index
+
+    def prefix_matches(self, token):
+        """Return the positions of players with a name token starting with `token`."""
+        return self.prefixes.get(token, ((), ()))[0]
+
+    def complete(self, query, limit=COMPLETION_SIZE):
+        """
+        Return up to `limit` players whose name tokens start with the words typed so far,
+        active players first. Single-word queries are answered from the precomputed prefix lists.
+        """
+        tokens = normalize(query).split()
+        if not tokens:
+            return []
+
+        if len(tokens) == 1 and limit <= COMPLETION_SIZE:
+            ranked = self.prefixes.get(tokens[0], ((), ()))[1]
+        else:
+            candidates = set(self.prefix_matches(tokens[0]))
+            for token in tokens[1:]:
+                candidates.intersection_update(self.prefix_matches(token))
+            ranked = sorted(candidates, key=self.completion_rank.__getitem__)
+        return [self.players[i] for i in ranked[:limit]]
+
+    def fuzzy_matches(self, tokens):
+        """Return {index: similarity} for players sharing enough trigrams with the query tokens."""
+        query_grams = trigrams(tokens)
+        if not query_grams:
+            return {}
+        counts = Counter()
+        for gram in query_grams:
+            counts.update(self.trigram_index.get(gram, ()))
+        needed = FUZZY_THRESHOLD * len(query_grams)
+        return {i: count / len(query_grams) for i, count in counts.items() if count >= needed}
+
+    def search(self, query, limit=10):
+        """
+        Search for players matching `query`.
+
+        Args:
+            query (str): A full or partial player name, nickname, or misspelling.
+            limit (int): Maximum number of results to return.
+
+        Returns:
+            list: Matching player dicts (id, full_name, first_name, last_name, is_active), best match first.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        tokens = normalized.split()
+        scores = {}
+
+        # Exact matches on a full name or nickname
+        for i in self.exact.get(normalized, ()):
+            scores[i] = EXACT_SCORE
+
+        # Every query token must prefix one of the player's name tokens
+        candidates = None
+        for token in tokens:
+            matches = self.prefix_matches(token)
+            candidates = set(matches) if candidates is None else candidates.intersection(matches)
+            if not candidates:
+                break
+        if not candidates:
+            # Also try the query without spaces ("le bron" -> "lebron")
+            candidates = self.prefix_matches(''.join(tokens))
+        for i in candidates or ():
+            # Prefer names where the query covers more of the full name
+            coverage = min(len(normalized) / len(self.full_names[i]), 1)
+            boost = ACTIVE_BOOST if self.players[i]['is_active'] else 0
+            scores.setdefault(i, PREFIX_SCORE + 10 * coverage + boost)
+
+        # Fall back to trigram similarity to tolerate typos
+        if not scores:
+            for i, similarity in self.fuzzy_matches(tokens).items():
+                scores[i] = FUZZY_SCORE * similarity
+
+        ranked = sorted(
+            scores,
+            key=lambda i: (-scores[i], not self.players[i]['is_active'], self.players[i]['full_name'])
+        )
+        return [self.players[i] for i in ranked[:limit]]
+
+
+def get_index_path():
+    """Return the path of the prebuilt index artifact (settings.NBA_STATS_PLAYER_INDEX)."""
+    return getattr(settings, 'NBA_STATS_PLAYER_INDEX', os.path.join(settings.BASE_DIR, 'cache', 'player_index.bin'))
+
+
+def artifact_key():
+    """
+    Identify what an artifact was built from: the index format, the nba_api release (which ships the static
+    player list) and the Python version (marshal's format may change between versions).
+    """
+    return [INDEX_FORMAT, version('nba_api'), list(sys.version_info[:2])]
+
+
+def build_index():
+    """Build a search index from nba_api's static player list."""
+    from nba_api.stats.static import players
+    return PlayerSearchIndex(players.get_players())
+
+
+def save_index(index, path):
+    """Write an index artifact to `path`, atomically so running workers never read a partial file."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    data = marshal.dumps({'key': artifact_key(), 'index': index.to_data()})
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def load_index(path):
+    """
+    Load an index artifact written by save_index.
+
+    Returns:
+        PlayerSearchIndex or None: None if the file is missing, unreadable or was built for a different
+                                   index format, nba_api release or Python version.
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+
+    # Loading allocates ~100k tuples at once; the cyclic garbage collector has nothing to find in them
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        data = marshal.loads(raw)
+    except (EOFError, ValueError, TypeError) as e:
+        logger.warning("Ignoring unreadable player index %s: %r", path, e)
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    if not isinstance(data, dict) or data.get('key') != artifact_key():
+        logger.warning("Ignoring player index %s built for %s; run `manage.py build_player_index`.",
+                       path, data.get('key') if isinstance(data, dict) else None)
+        return None
+    return PlayerSearchIndex.from_data(data['index'])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Return the process-wide search index. It is loaded from the prebuilt artifact when there is a
+    current one (see `manage.py build_player_index`), and built from the static player list otherwise.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_index(get_index_path()) or build_index()
+    return _index
+
+
+def search_players(query, limit=10):
+    """Search the process-wide index for players matching `query` (see PlayerSearchIndex.search)."""
+    return get_index().search(query, limit=limit)
+
+
+def complete_players(query, limit=COMPLETION_SIZE):
+    """Return autocomplete suggestions from the process-wide index (see PlayerSearchIndex.complete)."""
+    return get_index().complete(query, limit=limit)
+
+
+def find_player(player_id):
+    """Return the static player dict for `player_id`, or None if the player is unknown."""
+    return get_index().by_id.get(player_id)
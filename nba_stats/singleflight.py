@@ -0,0 +1,95 @@
+"""
+File: singleflight.py
+Description: In-process request coalescing ("single-flight") for upstream lookups. When several threads
+ask for the same key at the same time, only the first one calls the upstream; the others wait for and
+share its result. Counters on each group record how many calls were coalesced.
+"""
+
+import threading
+
+
+class _Call:
+    """An in-flight call whose result (or exception) is shared with every waiting caller."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    A group of keyed calls where at most one call per key is in flight at any time.
+
+    Attributes:
+        name (str): Label used when reporting counters.
+        requests (int): Total calls made through do().
+        executions (int): Calls that actually ran the function.
+        coalesced (int): Calls that shared another caller's in-flight result.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Call func(*args, **kwargs) unless a call for `key` is already running, in which case
+        wait for that call and return its result (or raise its exception).
+        """
+        with self.lock:
+            self.requests += 1
+            call = self.in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self.in_flight[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the call before waking followers so later callers start a fresh fetch
+            with self.lock:
+                del self.in_flight[key]
+            call.done.set()
+
+    def stats(self):
+        """Return this group's counters as a dict."""
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self.in_flight),
+            }
+
+
+# Groups for each kind of upstream lookup, shared by all threads in the process
+career_stats_flight = SingleFlight('career_stats')
+player_info_flight = SingleFlight('player_info')
+headshot_flight = SingleFlight('headshot')
+headshot_image_flight = SingleFlight('headshot_image')
+
+GROUPS = [career_stats_flight, player_info_flight, headshot_flight, headshot_image_flight]
+
+
+def get_stats():
+    """Return the counters of every single-flight group, keyed by group name."""
+    return {group.name: group.stats() for group in GROUPS}
@@ -0,0 +1,108 @@
+"""
+File: stats.py
+Description: Vectorized stat calculations shared by the career and season tables. Per-game, per-36 minute
+and shooting percentage columns are computed for a whole table of rows (one player's seasons, or many
+players' career totals) in a single pandas pass, with missing values treated as zero. pandas and numpy
+are imported on first use, so most management commands never load them.
+"""
+
+# Derived per-game columns and the totals they are computed from
+PER_GAME_COLUMNS = {
+    'PPG': 'PTS',
+    'RPG': 'REB',
+    'APG': 'AST',
+    'STLPG': 'STL',
+    'BLKPG': 'BLK',
+    'TOVPG': 'TOV',
+    'MPG': 'MIN',
+}
+
+# Derived per-36 minute columns and the totals they are computed from
+PER_36_COLUMNS = {
+    'PTS_PER36': 'PTS',
+    'REB_PER36': 'REB',
+    'AST_PER36': 'AST',
+    'STL_PER36': 'STL',
+    'BLK_PER36': 'BLK',
+}
+
+# Shooting percentages and their (made, attempted) columns
+SHOOTING_COLUMNS = {
+    'FG_PCT': ('FGM', 'FGA'),
+    'FG3_PCT': ('FG3M', 'FG3A'),
+    'FT_PCT': ('FTM', 'FTA'),
+}
+
+# Every total column the calculations read
+TOTAL_COLUMNS = sorted(
+    {'GP'} | set(PER_GAME_COLUMNS.values()) | set(PER_36_COLUMNS.values())
+    | {column for pair in SHOOTING_COLUMNS.values() for column in pair}
+)
+
+
+def safe_divide(numerator, denominator):
+    """Divide two arrays element-wise, giving 0 wherever the denominator is 0 or missing."""
+    import numpy as np
+
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = numerator / denominator
+    return np.where(np.isfinite(result), result, 0.0)
+
+
+def compute_averages(frame):
+    """
+    Compute derived stat columns for every row of a stats table.
+
+    Args:
+        frame (pandas.DataFrame): Rows of API-style totals (GP, MIN, PTS, REB, ..., FG3_PCT, ...).
+                                  Missing columns and null values are treated as 0.
+
+    Returns:
+        pandas.DataFrame: Same index as `frame`, with per-game columns (PPG, RPG, ...) rounded to 2
+                          decimals, per-36 columns (PTS_PER36, ...) rounded to 1, TS_PCT and the three
+                          shooting percentages (API values kept, missing ones computed) rounded to 3.
+    """
+    import numpy as np
+    import pandas as pd
+
+    totals = frame.reindex(columns=TOTAL_COLUMNS).apply(pd.to_numeric, errors='coerce').fillna(0)
+    gp = totals['GP'].to_numpy(dtype=float)
+    minutes = totals['MIN'].to_numpy(dtype=float)
+
+    derived = {}
+    for column, total in PER_GAME_COLUMNS.items():
+        derived[column] = np.round(safe_divide(totals[total], gp), 2)
+    for column, total in PER_36_COLUMNS.items():
+        derived[column] = np.round(safe_divide(totals[total] * 36, minutes), 1)
+
+    for column, (made, attempted) in SHOOTING_COLUMNS.items():
+        computed = pd.Series(safe_divide(totals[made], totals[attempted]), index=frame.index)
+        reported = pd.to_numeric(frame[column], errors='coerce') if column in frame else computed
+        derived[column] = reported.fillna(computed).round(3).to_numpy()
+
+    derived['TS_PCT'] = np.round(safe_divide(totals['PTS'], 2 * (totals['FGA'] + 0.44 * totals['FTA'])), 3)
+
+    return pd.DataFrame(derived, index=frame.index)
+
+
+def with_averages(rows):
+    """
+    Return copies of API stat rows with derived per-game, per-36 and shooting columns added.
+
+    The input dicts are not modified, and their original total columns are kept as-is so integers
+    still render as integers.
+
+    Args:
+        rows (list): API-style stat dicts (e.g. a SeasonTotalsRegularSeason table).
+
+    Returns:
+        list: New dicts, one per input row, in the same order.
+    """
+    if not rows:
+        return []
+    import pandas as pd
+
+    derived = compute_averages(pd.DataFrame.from_records(rows))
+    return [{**row, **values} for row, values in zip(rows, derived.to_dict('records'))]
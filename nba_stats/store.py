@@ -0,0 +1,218 @@
+"""
+File: store.py
+Description: Local stats store. Converts between the NBA API's normalized PlayerCareerStats dict and the
+Player/SeasonStats/CareerTotals models, so career and season totals can be served from the database
+without calling stats.nba.com.
+"""
+
+import hashlib
+import json
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Player, SeasonStats, CareerTotals, SEASON_TYPES
+from .search import find_player
+
+# Box score columns shared by season and career rows (model fields are the lowercase names)
+STAT_COLUMNS = [
+    'GP', 'GS', 'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT',
+    'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS',
+]
+SEASON_COLUMNS = ['SEASON_ID', 'LEAGUE_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'PLAYER_AGE'] + STAT_COLUMNS
+# Career total rows spell the team column 'Team_ID' (stored in the same team_id field)
+CAREER_COLUMNS = ['LEAGUE_ID', 'Team_ID'] + STAT_COLUMNS
+
+# The API result sets kept in the local store
+STORED_RESULT_SETS = [
+    f'{table}{season_type}' for season_type, _ in SEASON_TYPES for table in ('SeasonTotals', 'CareerTotals')
+]
+
+
+def content_hash(career_dict):
+    """Return a stable hash of the stored result sets of a career stats dict."""
+    stored = {name: career_dict.get(name, []) for name in STORED_RESULT_SETS}
+    return hashlib.sha256(json.dumps(stored, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def season_row(player_id, season_type, row_number, row):
+    """Build an unsaved SeasonStats instance from one API season row."""
+    fields = {column.lower(): row.get(column) for column in SEASON_COLUMNS}
+    fields['league_id'] = fields['league_id'] or ''
+    fields['team_abbreviation'] = fields['team_abbreviation'] or ''
+    return SeasonStats(player_id=player_id, season_type=season_type, row_number=row_number, **fields)
+
+
+def career_row(player_id, season_type, row):
+    """Build an unsaved CareerTotals instance from an API career totals row."""
+    fields = {column.lower(): row.get(column) for column in CAREER_COLUMNS}
+    fields['league_id'] = fields['league_id'] or ''
+    return CareerTotals(player_id=player_id, season_type=season_type, **fields)
+
+
+def row_values(row, columns):
+    """Return a stored row's values for the given API columns, in column order."""
+    return [getattr(row, column.lower()) for column in columns]
+
+
+def sync_rows(existing, fetched, columns, key):
+    """
+    Bring stored rows in line with freshly built ones, writing only rows whose values differ.
+
+    Args:
+        existing (list): Saved model instances.
+        fetched (list): Unsaved model instances built from the API response.
+        columns (list): API columns compared to decide whether a row changed.
+        key (callable): Returns the identity of a row, e.g. (season_type, row_number).
+
+    Returns:
+        (dict, list): Counts of 'created', 'updated', 'deleted' and 'unchanged' rows, and the rows
+                      that were written or deleted.
+    """
+    model = type(fetched[0]) if fetched else type(existing[0]) if existing else None
+    existing_by_key = {key(row): row for row in existing}
+    to_create, to_update = [], []
+    unchanged = 0
+
+    for row in fetched:
+        old = existing_by_key.pop(key(row), None)
+        if old is None:
+            to_create.append(row)
+        elif row_values(old, columns) != row_values(row, columns):
+            row.pk = old.pk
+            to_update.append(row)
+        else:
+            unchanged += 1
+
+    if to_create:
+        model.objects.bulk_create(to_create)
+    if to_update:
+        model.objects.bulk_update(to_update, [column.lower() for column in columns])
+    if existing_by_key:
+        model.objects.filter(pk__in=[row.pk for row in existing_by_key.values()]).delete()
+
+    counts = {'created': len(to_create), 'updated': len(to_update), 'deleted': len(existing_by_key), 'unchanged': unchanged}
+    return counts, to_create + to_update + list(existing_by_key.values())
+
+
+def save_career_dict(player_id, career_dict):
+    """
+    Save a fetched career stats dict to the local stats store.
+
+    If the response hashes the same as the last one stored for this player, only the fetch time is
+    updated. Otherwise stored rows are compared with the new ones and only rows whose values differ
+    are inserted, updated or deleted, and the leaderboards those rows appear on are marked dirty.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+        career_dict (dict): The normalized PlayerCareerStats dict.
+
+    Returns:
+        (Player, dict): The saved Player row and counts of 'created', 'updated', 'deleted' and
+                        'unchanged' stat rows (all zero when the content hash matched).
+    """
+    from .leaderboards import mark_dirty
+
+    static_player = find_player(player_id) or {}
+    new_hash = content_hash(career_dict)
+    changes = {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    with transaction.atomic():
+        player, created = Player.objects.get_or_create(
+            player_id=player_id,
+            defaults={
+                'full_name': static_player.get('full_name', f'Player {player_id}'),
+                'is_active': static_player.get('is_active', False),
+            },
+        )
+        player.fetched_at = timezone.now()
+        player.is_active = static_player.get('is_active', player.is_active)
+
+        if not created and player.content_hash == new_hash:
+            player.save(update_fields=['fetched_at', 'is_active'])
+            return player, changes
+
+        player.content_hash = new_hash
+        player.save()
+
+        seasons = []
+        careers = []
+        for season_type, _ in SEASON_TYPES:
+            for row_number, row in enumerate(career_dict.get(f'SeasonTotals{season_type}', [])):
+                seasons.append(season_row(player_id, season_type, row_number, row))
+            for row in career_dict.get(f'CareerTotals{season_type}', [])[:1]:
+                careers.append(career_row(player_id, season_type, row))
+
+        changed_rows = []
+        for existing, fetched, columns, key in (
+            (list(player.seasons.all()), seasons, SEASON_COLUMNS, lambda row: (row.season_type, row.row_number)),
+            (list(player.career_totals.all()), careers, CAREER_COLUMNS, lambda row: row.season_type),
+        ):
+            counts, rows = sync_rows(existing, fetched, columns, key)
+            changed_rows += rows
+            for name, count in counts.items():
+                changes[name] += count
+
+        # Rankings that include any changed row need rebuilding
+        mark_dirty(
+            ('season', row.season_type, row.season_id) if isinstance(row, SeasonStats)
+            else ('career', row.season_type, '')
+            for row in changed_rows
+        )
+
+    return player, changes
+
+
+def row_to_dict(row, columns, player_id):
+    """Convert a stored SeasonStats/CareerTotals row back into the API's dict format."""
+    data = {'PLAYER_ID': player_id}
+    data.update({column: getattr(row, column.lower()) for column in columns})
+    return data
+
+
+def player_to_entry(player):
+    """Convert a Player with prefetched seasons and career totals into a cache-style entry."""
+    data = {}
+    for season_type, _ in SEASON_TYPES:
+        data[f'SeasonTotals{season_type}'] = [
+            row_to_dict(row, SEASON_COLUMNS, player.player_id)
+            for row in player.seasons.all() if row.season_type == season_type
+        ]
+        data[f'CareerTotals{season_type}'] = [
+            row_to_dict(row, CAREER_COLUMNS, player.player_id)
+            for row in player.career_totals.all() if row.season_type == season_type
+        ]
+    return {'data': data, 'fetched_at': player.fetched_at.timestamp()}
+
+
+def load_career_dict(player_id):
+    """
+    Load a player's stored career stats in the same format as the NBA API's normalized dict.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+
+    Returns:
+        dict or None: A cache-style entry {'data': career_dict, 'fetched_at': UNIX timestamp},
+                      or None if the player has never been ingested.
+    """
+    player = (
+        Player.objects.filter(player_id=player_id, fetched_at__isnull=False)
+        .prefetch_related('seasons', 'career_totals')
+        .first()
+    )
+    return player_to_entry(player) if player is not None else None
+
+
+def load_career_dicts(player_ids):
+    """
+    Batch version of load_career_dict: loads many players' stored career stats in three queries.
+
+    Returns:
+        dict: Maps player_id to a cache-style entry, for the players that have been ingested.
+    """
+    players = (
+        Player.objects.filter(player_id__in=player_ids, fetched_at__isnull=False)
+        .prefetch_related('seasons', 'career_totals')
+    )
+    return {player.player_id: player_to_entry(player) for player in players}
@@ -0,0 +1,30 @@
+"""
+File: data.py
+Description: Sample NBA API data shared by the tests: a two-season PlayerCareerStats normalized dict.
+"""
+
+import copy
+
+CAREER = {
+ 'SeasonTotalsRegularSeason': [
+   {'PLAYER_ID': 2544, 'SEASON_ID': '2003-04', 'LEAGUE_ID': '00', 'TEAM_ID': 1, 'TEAM_ABBREVIATION': 'CLE', 'PLAYER_AGE': 19.0, 'GP': 79, 'GS': 79, 'MIN': 3122.0, 'FGM': 622, 'FGA': 1492, 'FG_PCT': 0.417, 'FG3M': 63, 'FG3A': 217, 'FG3_PCT': 0.29, 'FTM': 347, 'FTA': 460, 'FT_PCT': 0.754, 'OREB': 99, 'DREB': 333, 'REB': 432, 'AST': 465, 'STL': 130, 'BLK': 58, 'TOV': 273, 'PF': 149, 'PTS': 1654},
+   {'PLAYER_ID': 2544, 'SEASON_ID': '2004-05', 'LEAGUE_ID': '00', 'TEAM_ID': 1, 'TEAM_ABBREVIATION': 'CLE', 'PLAYER_AGE': 20.0, 'GP': 80, 'GS': 80, 'MIN': 3388.0, 'FGM': 795, 'FGA': 1684, 'FG_PCT': 0.472, 'FG3M': 108, 'FG3A': 308, 'FG3_PCT': None, 'FTM': 477, 'FTA': 636, 'FT_PCT': 0.75, 'OREB': 111, 'DREB': 477, 'REB': 588, 'AST': 577, 'STL': 177, 'BLK': 52, 'TOV': 262, 'PF': 146, 'PTS': 2175}],
+ 'CareerTotalsRegularSeason': [{'PLAYER_ID': 2544, 'LEAGUE_ID': '00', 'Team_ID': 0, 'GP': 159, 'GS': 159, 'MIN': 6510.0, 'FGM': 1417, 'FGA': 3176, 'FG_PCT': 0.446, 'FG3M': 171, 'FG3A': 525, 'FG3_PCT': 0.326, 'FTM': 824, 'FTA': 1096, 'FT_PCT': 0.752, 'OREB': 210, 'DREB': 810, 'REB': 1020, 'AST': 1042, 'STL': 307, 'BLK': 110, 'TOV': 535, 'PF': 295, 'PTS': 3829}],
+ 'SeasonTotalsPostSeason': [
+   {'PLAYER_ID': 2544, 'SEASON_ID': '2005-06', 'LEAGUE_ID': '00', 'TEAM_ID': 1, 'TEAM_ABBREVIATION': 'CLE', 'PLAYER_AGE': 21.0, 'GP': 13, 'GS': 13, 'MIN': 604.0, 'FGM': 149, 'FGA': 313, 'FG_PCT': 0.476, 'FG3M': 20, 'FG3A': 60, 'FG3_PCT': 0.333, 'FTM': 93, 'FTA': 126, 'FT_PCT': 0.738, 'OREB': 19, 'DREB': 87, 'REB': 106, 'AST': 76, 'STL': 18, 'BLK': 9, 'TOV': 43, 'PF': 27, 'PTS': 411}],
+ 'CareerTotalsPostSeason': [{'PLAYER_ID': 2544, 'LEAGUE_ID': '00', 'Team_ID': 0, 'GP': 13, 'GS': 13, 'MIN': 604.0, 'FGM': 149, 'FGA': 313, 'FG_PCT': 0.476, 'FG3M': 20, 'FG3A': 60, 'FG3_PCT': 0.333, 'FTM': 93, 'FTA': 126, 'FT_PCT': 0.738, 'OREB': 19, 'DREB': 87, 'REB': 106, 'AST': 76, 'STL': 18, 'BLK': 9, 'TOV': 43, 'PF': 27, 'PTS': 411}],
+ 'SeasonTotalsAllStarSeason': [], 'CareerTotalsAllStarSeason': [],
+ 'SeasonTotalsCollegeSeason': [], 'CareerTotalsCollegeSeason': [],
+ 'SeasonTotalsShowcaseSeason': [], 'CareerTotalsShowcaseSeason': [],
+ 'SeasonRankingsRegularSeason': [], 'SeasonRankingsPostSeason': [],
+}
+
+
+def career_dict(player_id=2544, **result_sets):
+    """Return a copy of CAREER for another player, with any result sets replaced by the given rows."""
+    data = copy.deepcopy(CAREER)
+    data.update(copy.deepcopy(result_sets))
+    for rows in data.values():
+        for row in rows:
+            row['PLAYER_ID'] = player_id
+    return data
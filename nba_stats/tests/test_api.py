@@ -0,0 +1,79 @@
+"""
+File: test_api.py
+Description: Tests for the read-only JSON stats API (nba_stats.api and the api_player, api_players and
+api_compare views). Players are served from locally stored stats, so no upstream calls are made.
+"""
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from nba_stats.api import API_BATCH_LIMIT, DEFAULT_FIELDS
+from nba_stats.cache import store_career_stats
+from nba_stats.models import PlayerHeadShot
+from nba_stats.tests.data import career_dict
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-api'}}
+
+STORED = [2544, 201939, 203999, 1629029]
+
+
+@override_settings(CACHES=LOCMEM)
+class StatsApiTests(TestCase):
+
+    def setUp(self):
+        for player_id in STORED:
+            store_career_stats(player_id, career_dict(player_id))
+            PlayerHeadShot.objects.create(player_id=player_id, player_name=f'Player {player_id}',
+                                          fetched_at=timezone.now())
+
+    def get(self, name, kwargs=None, **params):
+        return self.client.get(reverse(f'nba_stats:{name}', kwargs=kwargs), params)
+
+    def test_player_default_fields(self):
+        response = self.get('api_player', {'player_id': 2544})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(list(data), DEFAULT_FIELDS)
+        self.assertEqual(data['name'], 'LeBron James')
+        self.assertEqual(data['career']['PPG'], 24.08)
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+    def test_fields_and_stats_projection(self):
+        data = self.get('api_player', {'player_id': 2544}, fields='id,seasons', stats='pts,ppg').json()
+        self.assertEqual(list(data), ['id', 'seasons'])
+        self.assertEqual(data['seasons'][0], {'SEASON_ID': '2003-04', 'TEAM_ABBREVIATION': 'CLE', 'PTS': 1654, 'PPG': 20.94})
+
+    def test_unknown_player_is_404(self):
+        self.assertEqual(self.get('api_player', {'player_id': 1}).status_code, 404)
+
+    def test_bad_parameters_are_400(self):
+        for params in ({'ids': ''}, {'ids': '2544,abc'}, {'ids': '2544', 'fields': 'id,salary'},
+                       {'ids': '2544', 'stats': 'PTS,VORP'},
+                       {'ids': ','.join(str(i) for i in range(1, API_BATCH_LIMIT + 2))}):
+            response = self.get('api_players', **params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+
+    def test_batch_lists_missing_players(self):
+        data = self.get('api_players', ids='2544,1,201939,2544', fields='id').json()
+        self.assertEqual(data, {'players': [{'id': 2544}, {'id': 201939}], 'missing': [1]})
+
+    def test_batch_query_count_does_not_grow_with_batch_size(self):
+        counts = []
+        for ids in (STORED[:1], STORED):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.get('api_players', ids=','.join(map(str, ids)), fields='id,career,seasons')
+            self.assertEqual(len(response.json()['players']), len(ids))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertLessEqual(counts[1], 1)
+
+    def test_compare(self):
+        data = self.get('api_compare', ids='2544,201939', stats='ppg').json()
+        self.assertEqual([player['id'] for player in data['players']], [2544, 201939])
+        self.assertEqual(list(data['seasons']), ['PPG'])
+        self.assertEqual(self.get('api_compare', ids='2544').status_code, 400)
+        self.assertEqual(self.get('api_compare', ids='2544,201939', align='age').status_code, 400)
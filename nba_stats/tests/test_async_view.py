@@ -0,0 +1,92 @@
+"""
+File: test_async_view.py
+Description: Tests for player_details_async: it renders the same page as player_details while fetching
+whatever is missing concurrently, and degrades to stored or static data when a fetch fails. Upstream calls
+are mocked.
+"""
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from nba_stats import cache, upstream
+from nba_stats.models import CachedCareerStats, Player, PlayerHeadShot
+from nba_stats.tests.data import career_dict
+from nba_stats.upstream import UpstreamError
+from nba_stats.utils import PLACEHOLDER_IMAGE_URL
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-async'}}
+
+IMAGE_URL = 'https://cdn.nba.com/headshots/nba/latest/1040x760/2544.png'
+
+PLAYER_PAGE = (
+    '<div class="PlayerSummary_mainInnerTeam____nFZ">'
+    f'<img class="PlayerImage_image__wH_YX PlayerSummary_playerImage__sysif" src="{IMAGE_URL}"></div>'
+)
+
+PLAYER_INFO = {'resultSets': [{'rowSet': [[2544, 'LeBron', 'James', 'LeBron James']]}]}
+
+# Context values that depend only on the player's data
+COMPARED = ['player_id', 'player_name', 'headshot', 'career_stats', 'pts_pg', 'reb_pg', 'ast_pg', 'stl_pg',
+            'blk_pg', 'chosen_stats', 'chosen_title']
+
+
+@override_settings(CACHES=LOCMEM, NBA_STATS_CAREER_CACHE={'BACKEND': 'database'})
+class PlayerDetailsAsyncTests(TestCase):
+
+    def setUp(self):
+        cache._backend = None
+        self.addCleanup(setattr, cache, '_backend', None)
+
+    def render(self, name, career=None, info=None, page=None):
+        """Render a player page with nothing stored locally, returning the response and its upstream mocks."""
+        CachedCareerStats.objects.all().delete()
+        Player.objects.all().delete()
+        PlayerHeadShot.objects.all().delete()
+        career = career or {'return_value': career_dict(2544)}
+        with mock.patch.object(upstream, 'get_career_stats', **career) as stats, \
+                mock.patch.object(upstream, 'get_common_player_info', **(info or {'return_value': PLAYER_INFO})), \
+                mock.patch.object(upstream, 'get_player_page', **(page or {'return_value': PLAYER_PAGE})):
+            response = self.client.get(reverse(f'nba_stats:{name}', kwargs={'player_id': 2544}))
+        self.assertEqual(response.status_code, 200)
+        return response, stats
+
+    def context(self, response):
+        return {key: response.context[key] for key in COMPARED}
+
+    def test_renders_the_same_page_as_player_details(self):
+        sync, _ = self.render('player_details')
+        concurrent, stats = self.render('player_details_async')
+        stats.assert_called_once_with(2544)
+
+        self.assertEqual(self.context(concurrent), self.context(sync))
+        self.assertEqual(concurrent.context['player_name'], 'LeBron James')
+        self.assertEqual(concurrent.context['career_stats']['PPG'], 24.08)
+        # Everything fetched was stored for the next request
+        self.assertEqual(PlayerHeadShot.objects.get(player_id=2544).player_image_url, IMAGE_URL)
+        self.assertTrue(Player.objects.filter(player_id=2544, fetched_at__isnull=False).exists())
+
+    def test_stored_data_needs_no_upstream_calls(self):
+        self.render('player_details_async')
+        with mock.patch.object(upstream, 'get_career_stats') as stats, \
+                mock.patch.object(upstream, 'get_common_player_info') as info:
+            response = self.client.get(reverse('nba_stats:player_details_async', kwargs={'player_id': 2544}))
+        stats.assert_not_called()
+        info.assert_not_called()
+        self.assertEqual(response.context['career_stats']['PPG'], 24.08)
+
+    def test_failed_headshot_falls_back_to_placeholder(self):
+        with self.assertLogs('nba_stats.views', 'WARNING'):
+            response, _ = self.render('player_details_async', page={'side_effect': UpstreamError('nba.com down')})
+        self.assertEqual(response.context['player_name'], 'LeBron James')
+        self.assertEqual(response.context['headshot_url'], PLACEHOLDER_IMAGE_URL)
+        self.assertEqual(response.context['career_stats']['PPG'], 24.08)
+        self.assertFalse(PlayerHeadShot.objects.exists())
+
+    def test_failed_career_stats_render_an_empty_page(self):
+        with self.assertLogs('nba_stats.views', 'WARNING'):
+            response, _ = self.render('player_details_async', career={'side_effect': UpstreamError('stats down')})
+        self.assertIsNone(response.context['career_stats'])
+        self.assertEqual(response.context['pts_pg'], 0)
+        self.assertEqual(response.context['player_name'], 'LeBron James')
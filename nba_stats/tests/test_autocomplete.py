@@ -0,0 +1,41 @@
+"""
+File: test_autocomplete.py
+Description: Tests for the player_autocomplete view, answered from the static player search index.
+"""
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from nba_stats.views import AUTOCOMPLETE_MAX_RESULTS
+
+
+class PlayerAutocompleteTests(SimpleTestCase):
+
+    def get(self, **params):
+        response = self.client.get(reverse('nba_stats:player_autocomplete'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_json_shape(self):
+        data = self.get(q='lebron').json()
+        self.assertEqual(data['query'], 'lebron')
+        self.assertEqual(data['results'][0], {'id': 2544, 'name': 'LeBron James', 'is_active': True})
+
+    def test_empty_query(self):
+        for query in ('', '   ', '.'):
+            self.assertEqual(self.get(q=query).json(), {'query': query, 'results': []})
+        self.assertEqual(self.get().json()['results'], [])
+
+    def test_limit(self):
+        self.assertEqual(len(self.get(q='j').json()['results']), 10)
+        self.assertEqual(len(self.get(q='j', limit=3).json()['results']), 3)
+        self.assertEqual(len(self.get(q='j', limit=500).json()['results']), AUTOCOMPLETE_MAX_RESULTS)
+        self.assertEqual(len(self.get(q='j', limit=0).json()['results']), 1)
+        self.assertEqual(len(self.get(q='j', limit='many').json()['results']), 10)
+
+    def test_cache_headers(self):
+        response = self.get(q='cur')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        response = self.client.post(reverse('nba_stats:player_autocomplete'), {'q': 'cur'})
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,87 @@
+"""
+File: test_cache.py
+Description: Tests for the read-through career stats cache and stale-while-revalidate serving
+(nba_stats.cache). The NBA API is mocked.
+"""
+
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from nba_stats import cache, upstream
+from nba_stats.models import Player
+from nba_stats.tests.data import career_dict
+
+CAREER_CACHE = {'BACKEND': 'database', 'ACTIVE_TTL': 100, 'STALE_WHILE_REVALIDATE': True, 'MAX_STALENESS': 100}
+
+
+@override_settings(NBA_STATS_CAREER_CACHE=CAREER_CACHE)
+class GetCareerStatsTests(TestCase):
+
+    def setUp(self):
+        cache._backend = None
+        self.addCleanup(setattr, cache, '_backend', None)
+        self.data = career_dict(2544)
+
+    def assertSameStats(self, data, expected):
+        """The stats store omits empty result sets, so compare only the ones with rows."""
+        self.assertEqual({name: rows for name, rows in data.items() if rows},
+                         {name: rows for name, rows in expected.items() if rows})
+
+    def store(self, age):
+        """Store self.data in the cache and the stats store as if it had been fetched `age` seconds ago."""
+        fetched_at = time.time() - age
+        with mock.patch.object(cache.time, 'time', return_value=fetched_at):
+            cache.store_career_stats(2544, self.data)
+        Player.objects.filter(player_id=2544).update(fetched_at=datetime.fromtimestamp(fetched_at, timezone.utc))
+
+    def test_miss_reads_cache_and_store_once_then_fetches(self):
+        backend = cache.get_backend()
+        with mock.patch.object(upstream, 'get_career_stats', return_value=self.data) as fetch, \
+                mock.patch.object(backend, 'get', wraps=backend.get) as cache_get, \
+                mock.patch.object(cache, 'load_career_dict', wraps=cache.load_career_dict) as store_get:
+            self.assertSameStats(cache.get_career_stats(2544), self.data)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(cache_get.call_count, 1)
+        self.assertEqual(store_get.call_count, 1)
+
+        # Now fresh in the cache: no store read and no API call
+        with mock.patch.object(upstream, 'get_career_stats') as fetch, \
+                mock.patch.object(cache, 'load_career_dict') as store_get:
+            self.assertSameStats(cache.get_career_stats(2544), self.data)
+        fetch.assert_not_called()
+        store_get.assert_not_called()
+
+    def test_recently_expired_entry_is_served_and_revalidated(self):
+        self.store(age=150)
+        with mock.patch.object(upstream, 'get_career_stats') as fetch, \
+                mock.patch.object(cache, 'revalidate_career_stats') as revalidate:
+            self.assertSameStats(cache.get_career_stats(2544), self.data)
+        fetch.assert_not_called()
+        revalidate.assert_called_once_with(2544)
+
+    def test_long_expired_entry_is_refreshed_synchronously(self):
+        self.store(age=500)
+        fresh = career_dict(2544, SeasonTotalsPostSeason=[])
+        with mock.patch.object(upstream, 'get_career_stats', return_value=fresh):
+            self.assertSameStats(cache.get_career_stats(2544), fresh)
+
+    def test_upstream_failure_serves_expired_entry(self):
+        self.store(age=500)
+        with mock.patch.object(upstream, 'get_career_stats', side_effect=upstream.UpstreamError("down")):
+            self.assertSameStats(cache.get_career_stats(2544), self.data)
+
+    def test_upstream_failure_without_local_data_raises(self):
+        with mock.patch.object(upstream, 'get_career_stats', side_effect=upstream.UpstreamError("down")):
+            with self.assertRaises(upstream.UpstreamError):
+                cache.get_career_stats(2544)
+
+    @override_settings(NBA_STATS_OFFLINE=True)
+    def test_offline_never_calls_the_api(self):
+        with mock.patch.object(upstream, 'get_career_stats') as fetch:
+            self.assertEqual(cache.get_career_stats(2544), {})
+            self.store(age=10 ** 6)
+            self.assertSameStats(cache.get_career_stats(2544), self.data)
+        fetch.assert_not_called()
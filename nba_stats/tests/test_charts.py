@@ -0,0 +1,58 @@
+"""
+File: test_charts.py
+Description: Tests for the career trajectory charts (nba_stats.charts and the career_chart view).
+"""
+
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from nba_stats import charts
+from nba_stats.cache import store_career_stats
+from nba_stats.tests.data import career_dict
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-charts'}}
+
+
+@override_settings(CACHES=LOCMEM)
+class CareerChartTests(TestCase):
+
+    def setUp(self):
+        store_career_stats(2544, career_dict(2544))
+
+    def test_latest_redirects_to_the_current_version(self):
+        response = self.client.get(reverse('nba_stats:career_chart', kwargs={'player_id': 2544, 'version': 'latest'}))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('max-age=', response['Cache-Control'])
+
+        chart = self.client.get(response['Location'])
+        self.assertEqual(chart.status_code, 200)
+        self.assertIn('immutable', chart['Cache-Control'])
+        names = [trace['name'] for trace in json.loads(chart.content)['data']]
+        self.assertIn('Points (Regular Season)', names)
+        self.assertIn('Points (Post Season)', names)
+
+    def test_chart_is_built_once_per_stats_version(self):
+        url = reverse('nba_stats:career_chart', kwargs={'player_id': 2544, 'version': 'latest'})
+        with mock.patch.object(charts, 'build_chart', wraps=charts.build_chart) as build:
+            first = self.client.get(self.client.get(url)['Location'])
+            second = self.client.get(self.client.get(url)['Location'])
+            self.assertEqual(build.call_count, 1)
+            self.assertEqual(first.content, second.content)
+
+            # New stats get a new version (and URL), and the chart is rebuilt
+            old_location = self.client.get(url)['Location']
+            with mock.patch('nba_stats.cache.time.time', return_value=2e9):
+                store_career_stats(2544, career_dict(2544))
+            self.assertNotEqual(self.client.get(url)['Location'], old_location)
+
+    def test_traded_season_uses_total_row(self):
+        rows = [
+            {'SEASON_ID': '2019-20', 'TEAM_ABBREVIATION': 'AAA', 'GP': 10, 'PTS': 100, 'REB': 10, 'AST': 10},
+            {'SEASON_ID': '2019-20', 'TEAM_ABBREVIATION': 'BBB', 'GP': 10, 'PTS': 300, 'REB': 10, 'AST': 10},
+            {'SEASON_ID': '2019-20', 'TEAM_ABBREVIATION': 'TOT', 'GP': 20, 'PTS': 400, 'REB': 20, 'AST': 20},
+        ]
+        points = charts.season_points(rows)
+        self.assertEqual([(season, row['PPG']) for season, row in points], [('2019-20', 20.0)])
@@ -0,0 +1,73 @@
+"""
+File: test_compare.py
+Description: Tests for the player comparison tables (nba_stats.compare).
+"""
+
+from django.test import SimpleTestCase
+
+from nba_stats.compare import best_index, compare_tables, parse_options
+from nba_stats.tests.data import career_dict
+
+# A traded season (per-team rows plus the combined TOT row) followed by a single-team season
+TRADED = [
+    {'SEASON_ID': '2004-05', 'TEAM_ABBREVIATION': 'AAA', 'GP': 10, 'PTS': 100},
+    {'SEASON_ID': '2004-05', 'TEAM_ABBREVIATION': 'BBB', 'GP': 10, 'PTS': 300},
+    {'SEASON_ID': '2004-05', 'TEAM_ABBREVIATION': 'TOT', 'GP': 20, 'PTS': 400},
+    {'SEASON_ID': '2005-06', 'TEAM_ABBREVIATION': 'BBB', 'GP': 50, 'PTS': 1000},
+]
+
+
+class CompareTablesTests(SimpleTestCase):
+
+    def setUp(self):
+        self.career_dicts = {
+            2544: career_dict(2544),
+            201939: career_dict(201939, SeasonTotalsRegularSeason=TRADED),
+        }
+
+    def seasons(self, align):
+        tables = compare_tables([2544, 201939], self.career_dicts, align=align)
+        return [(row['label'], row['values']) for row in tables['seasons']['PPG']]
+
+    def test_align_by_season(self):
+        self.assertEqual(self.seasons('season'), [
+            ('2003-04', [20.94, None]),
+            ('2004-05', [27.19, 20.0]),
+            ('2005-06', [None, 20.0]),
+        ])
+
+    def test_align_by_year_of_career(self):
+        self.assertEqual(self.seasons('year'), [(1, [20.94, 20.0]), (2, [27.19, 20.0])])
+
+    def test_missing_player_gets_empty_values(self):
+        tables = compare_tables([2544, 1], self.career_dicts)
+        ppg = next(row for row in tables['career'] if row['stat'] == 'PPG')
+        self.assertEqual(ppg['values'], [24.08, None])
+        self.assertIsNone(ppg['best'])
+        self.assertEqual(compare_tables([1, 2], {})['seasons'], {'PPG': []})
+
+
+class BestIndexTests(SimpleTestCase):
+
+    def test_best_value(self):
+        self.assertEqual(best_index([20.1, 27.5, None], 'PPG'), 1)
+        self.assertEqual(best_index([3.1, 2.4], 'TOVPG'), 1)
+
+    def test_ties_pick_the_first_player(self):
+        self.assertEqual(best_index([25.0, 25.0], 'PPG'), 0)
+
+    def test_needs_two_players(self):
+        self.assertIsNone(best_index([25.0, None], 'PPG'))
+
+
+class ParseOptionsTests(SimpleTestCase):
+
+    def test_defaults(self):
+        self.assertEqual(parse_options({'ids': '2544,201939'}),
+                         {'player_ids': [2544, 201939], 'season_type': 'regular', 'align': 'season'})
+
+    def test_invalid_options(self):
+        for params in ({'ids': '2544'}, {'ids': '2544,201939', 'align': 'age'},
+                       {'ids': '2544,201939', 'season_type': 'preseason'}):
+            with self.assertRaises(ValueError):
+                parse_options(params)
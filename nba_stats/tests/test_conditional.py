@@ -0,0 +1,96 @@
+"""
+File: test_conditional.py
+Description: Tests for conditional GETs of player and roster pages (nba_stats.conditional). Pages are rendered
+from locally stored data, so no upstream calls are made.
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from nba_stats import views
+from nba_stats.cache import store_career_stats
+from nba_stats.models import PlayerHeadShot, UserProfile
+from nba_stats.tests.data import career_dict
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-conditional'}}
+
+
+def store_player(player_id, name):
+    """Store fresh career stats and a headshot row, so the player page can be validated."""
+    store_career_stats(player_id, career_dict(player_id))
+    PlayerHeadShot.objects.update_or_create(
+        player_id=player_id,
+        defaults={'player_name': name, 'player_image_url': 'https://example.com/a.png', 'fetched_at': timezone.now()},
+    )
+
+
+@override_settings(CACHES=LOCMEM)
+class PlayerPageTests(TestCase):
+
+    def setUp(self):
+        store_player(2544, 'LeBron James')
+        self.url = reverse('nba_stats:player_details', kwargs={'player_id': 2544})
+
+    def test_repeat_visit_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        with mock.patch.object(views, 'render') as render:
+            again = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            since = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        render.assert_not_called()
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], etag)
+        self.assertEqual(since.status_code, 304)
+
+    def test_not_modified_visits_are_counted(self):
+        etag = self.client.get(self.url)['ETag']
+        with mock.patch.object(views, 'record_view') as record_view:
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        record_view.assert_called_once_with(2544)
+
+    def test_new_headshot_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        PlayerHeadShot.objects.filter(player_id=2544).update(player_name='King James')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_pages_differ_per_viewer(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(User.objects.create_user('fan', password='pw'))
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM)
+class RosterPageTests(TestCase):
+
+    def setUp(self):
+        store_player(2544, 'LeBron James')
+        store_player(201939, 'Stephen Curry')
+        user = User.objects.create_user('fan', password='pw')
+        UserProfile.objects.create(user=user)
+        self.client.force_login(user)
+        self.client.post(reverse('nba_stats:add_to_roster', kwargs={'player_id': 2544}))
+        self.url = reverse('nba_stats:roster')
+
+    def test_round_trip_until_the_roster_changes(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.post(reverse('nba_stats:add_to_roster', kwargs={'player_id': 201939}))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Stephen Curry')
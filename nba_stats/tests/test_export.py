@@ -0,0 +1,45 @@
+"""
+File: test_export.py
+Description: Tests for the stats store exports (nba_stats.export and the export_stats view).
+"""
+
+import io
+import unittest
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from nba_stats import export, views
+from nba_stats.store import save_career_dict
+from nba_stats.tests.data import career_dict
+
+
+class ExportViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        save_career_dict(2544, career_dict(2544))
+        save_career_dict(201939, career_dict(201939))
+
+    def test_csv_streams_every_season_row(self):
+        response = self.client.get(reverse('nba_stats:export_stats'), {'ids': '2544', 'season_type': 'RegularSeason'})
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:4], ['PLAYER_ID', 'PLAYER_NAME', 'SEASON_TYPE', 'SEASON_ID'])
+        self.assertEqual([line.split(',')[3] for line in lines[1:]], ['2003-04', '2004-05'])
+
+    def test_parquet_is_rejected_without_pyarrow(self):
+        with mock.patch.object(views, 'export_formats', return_value=['csv']):
+            response = self.client.get(reverse('nba_stats:export_stats'), {'format': 'parquet'})
+        self.assertEqual(response.status_code, 400)
+
+    @unittest.skipUnless(export.parquet_available(), "pyarrow is not installed")
+    def test_parquet_export(self):
+        import pyarrow.parquet as pq
+
+        response = self.client.get(reverse('nba_stats:export_stats'), {'format': 'parquet', 'table': 'career'})
+        self.assertEqual(response.status_code, 200)
+        table = pq.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.num_rows, 4)
+        self.assertEqual(sorted(set(table.column('PLAYER_ID').to_pylist())), [2544, 201939])
@@ -0,0 +1,95 @@
+"""
+File: test_images.py
+Description: Tests for the local headshot image proxy (nba_stats.images and the headshot_image view). Image
+downloads are mocked.
+"""
+
+import io
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from nba_stats import upstream
+from nba_stats.cache import store_career_stats
+from nba_stats.images import PLACEHOLDER_VERSION, headshot_urls, source_version
+from nba_stats.models import PlayerHeadShot
+from nba_stats.tests.data import career_dict
+from nba_stats.upstream import UpstreamError
+
+IMAGE_URL = 'https://cdn.nba.com/headshots/nba/latest/1040x760/2544.png'
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-images'}}
+
+
+def png_bytes():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGBA', (1040, 760), (200, 30, 30, 255)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def image_url(version, ext='webp', size='page', player_id=2544):
+    kwargs = {'player_id': player_id, 'version': version, 'size': size, 'ext': ext}
+    return reverse('nba_stats:headshot_image', kwargs=kwargs)
+
+
+class HeadshotImageTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(NBA_STATS_HEADSHOT_DIR=directory.name, CACHES=LOCMEM)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        PlayerHeadShot.objects.create(player_id=2544, player_name='LeBron James', player_image_url=IMAGE_URL,
+                                      fetched_at=timezone.now())
+        self.version = source_version(IMAGE_URL)
+
+    def test_formats_and_immutable_caching(self):
+        with mock.patch.object(upstream, 'get_image', return_value=png_bytes()) as get_image:
+            webp = self.client.get(image_url(self.version, 'webp'))
+            jpg = self.client.get(image_url(self.version, 'jpg', size='thumb'))
+        # Every variant is written from one download
+        get_image.assert_called_once_with(IMAGE_URL)
+
+        self.assertEqual(webp['Content-Type'], 'image/webp')
+        self.assertEqual(b''.join(webp.streaming_content)[8:12], b'WEBP')
+        self.assertEqual(jpg['Content-Type'], 'image/jpeg')
+        self.assertEqual(b''.join(jpg.streaming_content)[:2], b'\xff\xd8')
+        self.assertEqual(webp['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_outdated_version_redirects_to_current(self):
+        response = self.client.get(image_url('0123456789ab', 'jpg'))
+        self.assertRedirects(response, image_url(self.version, 'jpg'), fetch_redirect_response=False)
+
+        PlayerHeadShot.objects.filter(player_id=2544).update(is_placeholder=True)
+        response = self.client.get(image_url(self.version, 'jpg'))
+        self.assertRedirects(response, image_url(PLACEHOLDER_VERSION, 'jpg'), fetch_redirect_response=False)
+
+    def test_download_failure_serves_placeholder_briefly(self):
+        with mock.patch.object(upstream, 'get_image', side_effect=UpstreamError('cdn down')), \
+                self.assertLogs('nba_stats.views', 'WARNING'):
+            response = self.client.get(image_url(self.version, 'webp'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300')
+
+        placeholder = self.client.get(image_url(PLACEHOLDER_VERSION, 'webp'))
+        self.assertEqual(b''.join(response.streaming_content), b''.join(placeholder.streaming_content))
+        self.assertIn('immutable', placeholder['Cache-Control'])
+
+    def test_unknown_variant_is_404(self):
+        self.assertEqual(self.client.get(image_url(self.version, 'gif')).status_code, 404)
+        self.assertEqual(self.client.get(image_url(self.version, size='huge')).status_code, 404)
+
+    def test_pages_offer_webp_with_jpeg_fallback(self):
+        urls = headshot_urls(2544, IMAGE_URL, 'page')
+        self.assertEqual(urls, {'webp': image_url(self.version, 'webp'), 'jpg': image_url(self.version, 'jpg')})
+
+        store_career_stats(2544, career_dict(2544))
+        response = self.client.get(reverse('nba_stats:player_details', kwargs={'player_id': 2544}))
+        self.assertContains(response, f'<source srcset="{urls["webp"]}" type="image/webp">', count=1)
+        self.assertContains(response, f'<img src="{urls["jpg"]}"', count=1)
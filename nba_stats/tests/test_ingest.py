@@ -0,0 +1,102 @@
+"""
+File: test_ingest.py
+Description: Tests for resumable bulk ingest (nba_stats.ingest and the ingest_stats command). Upstream calls
+are mocked.
+"""
+
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from nba_stats.ingest import Checkpoint, run_ingest
+from nba_stats.management.commands import ingest_stats
+from nba_stats.models import SeasonStats
+from nba_stats.upstream import UpstreamError
+
+from .data import career_dict
+
+
+class CheckpointTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'checkpoint.json')
+
+    def test_round_trip(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.mark_failed(1, 'timeout')
+        checkpoint.mark_failed(2, 'timeout')
+        checkpoint.mark_done(2)
+        checkpoint.save()
+
+        loaded = Checkpoint(self.path)
+        self.assertEqual(loaded.done, {2})
+        self.assertEqual(loaded.failed, {1: 'timeout'})
+
+    def test_clear_removes_the_file(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.mark_done(1)
+        checkpoint.save()
+        checkpoint.clear()
+
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(Checkpoint(self.path).done, set())
+
+    def test_run_ingest_records_failures(self):
+        def fetch(player_id):
+            if player_id == 2:
+                raise UpstreamError('down')
+            return {'id': player_id}
+
+        saved_ids = []
+        checkpoint = Checkpoint(self.path)
+        saved, failed = run_ingest(
+            [1, 2, 3], fetch, lambda player_id, data: saved_ids.append(player_id),
+            workers=2, rate=0, checkpoint=checkpoint,
+        )
+
+        self.assertEqual((saved, failed), (2, 1))
+        self.assertEqual(sorted(saved_ids), [1, 3])
+        loaded = Checkpoint(self.path)
+        self.assertEqual(loaded.done, {1, 3})
+        self.assertEqual(list(loaded.failed), [2])
+
+
+class IngestCommandTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'checkpoint.json')
+
+    def ingest(self, fetch, *args):
+        with mock.patch.object(ingest_stats, 'fetch_career_stats', side_effect=fetch) as fetched:
+            call_command('ingest_stats', '--ids', '2544', '201939', '--rate', '0', '--checkpoint', self.path,
+                         *args, stdout=StringIO(), stderr=StringIO())
+        return sorted(call.args[0] for call in fetched.call_args_list)
+
+    def test_resume_retries_only_unfinished_players(self):
+        def flaky(player_id):
+            if player_id == 201939:
+                raise UpstreamError('down')
+            return career_dict(player_id)
+
+        self.assertEqual(self.ingest(flaky), [2544, 201939])
+        self.assertEqual(Checkpoint(self.path).done, {2544})
+        self.assertIn(201939, Checkpoint(self.path).failed)
+
+        self.assertEqual(self.ingest(career_dict), [201939])
+        checkpoint = Checkpoint(self.path)
+        self.assertEqual(checkpoint.done, {2544, 201939})
+        self.assertEqual(checkpoint.failed, {})
+        self.assertTrue(SeasonStats.objects.filter(player_id=201939).exists())
+
+    def test_restart_ignores_the_checkpoint(self):
+        self.ingest(career_dict)
+        self.assertEqual(self.ingest(career_dict), [])
+        self.assertEqual(self.ingest(career_dict, '--restart'), [2544, 201939])
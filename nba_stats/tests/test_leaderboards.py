@@ -0,0 +1,75 @@
+"""
+File: test_leaderboards.py
+Description: Tests for materialized leaderboards and dirty board tracking (nba_stats.leaderboards).
+"""
+
+from unittest import mock
+
+from django.test import TestCase
+
+from nba_stats import leaderboards
+from nba_stats.leaderboards import rebuild_dirty, get_page
+from nba_stats.models import DirtyLeaderboard, LeaderboardEntry
+from nba_stats.store import save_career_dict
+from nba_stats.tests.data import CAREER, career_dict
+
+
+def dirty_boards():
+    return set(DirtyLeaderboard.objects.values_list('scope', 'season_type', 'season_id'))
+
+
+class DirtyTrackingTests(TestCase):
+
+    def setUp(self):
+        save_career_dict(2544, career_dict(2544))
+
+    def test_new_player_marks_every_board_they_appear_on(self):
+        self.assertEqual(dirty_boards(), {
+            ('season', 'RegularSeason', '2003-04'),
+            ('season', 'RegularSeason', '2004-05'),
+            ('season', 'PostSeason', '2005-06'),
+            ('career', 'RegularSeason', ''),
+            ('career', 'PostSeason', ''),
+        })
+
+    def test_rebuild_clears_dirty_boards(self):
+        self.assertEqual(rebuild_dirty(), 5)
+        self.assertEqual(dirty_boards(), set())
+        entries, has_next = get_page('season', 'RegularSeason', '2004-05', 'PTS', 1, 10)
+        self.assertEqual([(entry.player_id, entry.value) for entry in entries], [(2544, 2175.0)])
+        self.assertFalse(has_next)
+        self.assertEqual(rebuild_dirty(), 0)
+
+    def test_only_changed_boards_are_marked(self):
+        rebuild_dirty()
+        save_career_dict(2544, career_dict(2544))
+        self.assertEqual(dirty_boards(), set())
+
+        seasons = [dict(row) for row in CAREER['SeasonTotalsRegularSeason']]
+        seasons[1]['PTS'] = 2200
+        save_career_dict(2544, career_dict(2544, SeasonTotalsRegularSeason=seasons))
+        self.assertEqual(dirty_boards(), {('season', 'RegularSeason', '2004-05')})
+
+        rebuild_dirty()
+        entry = LeaderboardEntry.objects.get(season_id='2004-05', stat='PTS')
+        self.assertEqual(entry.value, 2200.0)
+
+    def test_mark_made_during_a_rebuild_is_kept(self):
+        board = ('season', 'RegularSeason', '2004-05')
+        rebuild_board = leaderboards.rebuild_board
+
+        def rebuild_and_mark(*args):
+            # A save lands while the board is being rebuilt
+            if args == board:
+                leaderboards.mark_dirty([board])
+            return rebuild_board(*args)
+
+        with mock.patch.object(leaderboards, 'rebuild_board', side_effect=rebuild_and_mark):
+            self.assertEqual(rebuild_dirty(), 5)
+        self.assertEqual(dirty_boards(), {board})
+
+    def test_failed_rebuild_stays_dirty(self):
+        with mock.patch.object(leaderboards, 'rebuild_board', side_effect=RuntimeError('disk full')):
+            with self.assertRaises(RuntimeError):
+                rebuild_dirty()
+        self.assertEqual(len(dirty_boards()), 5)
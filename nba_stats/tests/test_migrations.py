@@ -0,0 +1,42 @@
+"""
+File: test_migrations.py
+Description: Tests for data migrations: 0006 removes duplicate roster rows before adding the unique constraint.
+"""
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class RosterDedupeMigrationTests(TransactionTestCase):
+    before = [('nba_stats', '0005_leaderboards')]
+    after = [('nba_stats', '0006_roster_unique_player')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        self.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicates_are_removed_keeping_the_oldest(self):
+        apps = self.migrate(self.before)
+        User = apps.get_model('auth', 'User')
+        UserProfile = apps.get_model('nba_stats', 'UserProfile')
+        Roster = apps.get_model('nba_stats', 'Roster')
+
+        fan = UserProfile.objects.create(user=User.objects.create(username='fan'))
+        other = UserProfile.objects.create(user=User.objects.create(username='other'))
+        first = Roster.objects.create(user=fan, player_id=2544, player_name='LeBron James', player_image_url='https://a')
+        Roster.objects.create(user=fan, player_id=2544, player_name='LeBron', player_image_url='https://b')
+        Roster.objects.create(user=fan, player_id=201939, player_name='Stephen Curry', player_image_url='https://c')
+        Roster.objects.create(user=other, player_id=2544, player_name='LeBron James', player_image_url='https://d')
+
+        apps = self.migrate(self.after)
+        Roster = apps.get_model('nba_stats', 'Roster')
+        rows = set(Roster.objects.values_list('user__user__username', 'player_id'))
+        self.assertEqual(rows, {('fan', 2544), ('fan', 201939), ('other', 2544)})
+        self.assertEqual(Roster.objects.get(user__user__username='fan', player_id=2544).pk, first.pk)
@@ -0,0 +1,46 @@
+"""
+File: test_revalidate.py
+Description: Tests for the background refresh pool used by stale-while-revalidate serving (nba_stats.revalidate).
+"""
+
+import threading
+
+from django.test import SimpleTestCase
+
+from nba_stats.revalidate import Revalidator
+
+
+class RevalidatorTests(SimpleTestCase):
+
+    def setUp(self):
+        self.revalidator = Revalidator('test', 2)
+        self.addCleanup(lambda: self.revalidator.executor and self.revalidator.executor.shutdown(wait=True))
+
+    def test_key_is_queued_once_while_pending(self):
+        release = threading.Event()
+        calls = []
+
+        def refresh(player_id):
+            release.wait(5)
+            calls.append(player_id)
+
+        self.assertTrue(self.revalidator.schedule(('career', 2544), refresh, 2544))
+        self.assertFalse(self.revalidator.schedule(('career', 2544), refresh, 2544))
+        self.assertTrue(self.revalidator.schedule(('career', 201939), refresh, 201939))
+        release.set()
+        self.revalidator.executor.shutdown(wait=True)
+
+        self.assertEqual(sorted(calls), [2544, 201939])
+        self.assertEqual(self.revalidator.stats(), {'scheduled': 2, 'skipped': 1, 'failed': 0, 'pending': 0})
+
+    def test_failed_refresh_frees_its_key(self):
+        def refresh():
+            raise RuntimeError('down')
+
+        with self.assertLogs('nba_stats.revalidate', 'WARNING'):
+            self.revalidator.schedule('key', refresh)
+            self.revalidator.executor.shutdown(wait=True)
+        self.assertEqual(self.revalidator.stats(), {'scheduled': 1, 'skipped': 0, 'failed': 1, 'pending': 0})
+
+        self.revalidator.executor = None
+        self.assertTrue(self.revalidator.schedule('key', lambda: None))
@@ -0,0 +1,91 @@
+"""
+File: test_search.py
+Description: Tests for the player search index (nba_stats.search): normalization, ranking, typo
+tolerance, autocomplete and the prebuilt artifact.
+"""
+
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from nba_stats.search import PlayerSearchIndex, load_index, normalize, save_index
+
+
+def player(player_id, first_name, last_name, is_active):
+    return {'id': player_id, 'full_name': f'{first_name} {last_name}', 'first_name': first_name,
+            'last_name': last_name, 'is_active': is_active}
+
+
+PLAYERS = [
+    player(2544, 'LeBron', 'James', True),
+    player(201939, 'Stephen', 'Curry', True),
+    player(203999, 'Nikola', 'Jokić', True),
+    player(406, "Shaquille", "O'Neal", False),
+    player(1, 'Mike', 'James', False),
+    player(2, 'Eddie', 'Curry', False),
+    player(3, 'Seth', 'Curry', True),
+    player(201142, 'Kevin', 'Durant', True),
+    player(893, 'Michael', 'Jordan', False),
+    player(1631109, 'Jordan', 'Miller', True),
+]
+
+
+class PlayerSearchIndexTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.index = PlayerSearchIndex(PLAYERS)
+
+    def ids(self, players):
+        return [player['id'] for player in players]
+
+    def test_normalize_folds_accents_and_punctuation(self):
+        self.assertEqual(normalize("  Nikola JOKIĆ "), 'nikola jokic')
+        self.assertEqual(normalize("Shaquille O'Neal"), 'shaquille oneal')
+        self.assertEqual(normalize('Shai Gilgeous-Alexander'), 'shai gilgeous alexander')
+
+    def test_exact_name_ranks_first(self):
+        self.assertEqual(self.ids(self.index.search('lebron james'))[0], 2544)
+        self.assertEqual(self.ids(self.index.search('Jokic')), [203999])
+
+    def test_prefix_matches_rank_active_players_first(self):
+        results = self.ids(self.index.search('curry'))
+        self.assertEqual(set(results), {201939, 2, 3})
+        self.assertEqual(results[-1], 2)
+
+    def test_nicknames_and_typos(self):
+        self.assertEqual(self.ids(self.index.search('Shaq')), [406])
+        self.assertEqual(self.ids(self.index.search('King James'))[0], 2544)
+        self.assertEqual(self.ids(self.index.search('lebrn jmaes'))[0], 2544)
+        self.assertEqual(self.ids(self.index.search('le bron')), [2544])
+        self.assertEqual(self.index.search('zzzzqqq'), [])
+
+    def test_closer_typo_match_beats_active_players(self):
+        self.assertEqual(self.ids(self.index.search('stephan curry'))[0], 201939)
+        self.assertEqual(self.ids(self.index.search('kevn durant'))[0], 201142)
+        self.assertEqual(self.ids(self.index.search('micheal jordan'))[0], 893)
+
+    def test_autocomplete_orders_active_then_alphabetical(self):
+        self.assertEqual(self.ids(self.index.complete('cur')), [3, 201939, 2])
+        self.assertEqual(self.ids(self.index.complete('st cur')), [201939])
+        self.assertEqual(self.ids(self.index.complete('cur', limit=1)), [3])
+
+    def test_artifact_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.bin')
+            save_index(self.index, path)
+            loaded = load_index(path)
+        for query in ('curry', 'Shaq', 'lebrn jmaes', 'jok'):
+            self.assertEqual(loaded.search(query), self.index.search(query))
+        self.assertEqual(loaded.complete('cur'), self.index.complete('cur'))
+
+    def test_unreadable_artifact_is_ignored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.bin')
+            with open(path, 'wb') as f:
+                f.write(b'not an index')
+            with self.assertLogs('nba_stats.search', 'WARNING'):
+                self.assertIsNone(load_index(path))
+            self.assertIsNone(load_index(os.path.join(directory, 'missing.bin')))
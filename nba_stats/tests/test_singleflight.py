@@ -0,0 +1,65 @@
+"""
+File: test_singleflight.py
+Description: Tests for request coalescing (nba_stats.singleflight).
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from nba_stats.singleflight import SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+
+    def run_concurrently(self, group, key, func, callers=5):
+        """Call group.do(key, func) from several threads while func is blocked, then release it."""
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocked():
+            started.set()
+            release.wait(5)
+            return func()
+
+        with ThreadPoolExecutor(max_workers=callers) as pool:
+            leader = pool.submit(group.do, key, blocked)
+            started.wait(5)
+            followers = [pool.submit(group.do, key, blocked) for _ in range(callers - 1)]
+            # Wait until every follower has joined the in-flight call before letting it finish
+            while group.stats()['coalesced'] < callers - 1:
+                time.sleep(0.001)
+            release.set()
+        return [leader] + followers
+
+    def test_concurrent_calls_share_one_execution(self):
+        group = SingleFlight('test')
+        calls = []
+        futures = self.run_concurrently(group, 2544, lambda: calls.append(1) or 'stats')
+
+        self.assertEqual([future.result() for future in futures], ['stats'] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(group.stats(), {'requests': 5, 'executions': 1, 'coalesced': 4, 'in_flight': 0})
+
+    def test_errors_are_shared_and_not_cached(self):
+        group = SingleFlight('test')
+
+        def fail():
+            raise ValueError("upstream down")
+
+        futures = self.run_concurrently(group, 2544, fail, callers=3)
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result()
+
+        # The failed call is forgotten, so the next caller runs the function again
+        self.assertEqual(group.do(2544, lambda: 'stats'), 'stats')
+        self.assertEqual(group.stats()['executions'], 2)
+
+    def test_different_keys_do_not_coalesce(self):
+        group = SingleFlight('test')
+        self.assertEqual(group.do(1, lambda: 'a'), 'a')
+        self.assertEqual(group.do(2, lambda: 'b'), 'b')
+        self.assertEqual(group.stats()['coalesced'], 0)
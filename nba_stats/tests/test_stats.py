@@ -0,0 +1,81 @@
+"""
+File: test_stats.py
+Description: Tests for the vectorized stat calculations (nba_stats.stats), checked against the per-row
+calculations player_details used to do by hand.
+"""
+
+from django.test import SimpleTestCase
+
+from nba_stats.stats import with_averages
+from nba_stats.tests.data import CAREER
+
+
+def row_by_row(season):
+    """The per-season averages player_details computed before nba_stats.stats existed."""
+    season = dict(season)
+    gp_s = season.get('GP', 0) or 0
+    pts = season.get('PTS', 0) or 0
+    reb = season.get('REB', 0) or 0
+    ast = season.get('AST', 0) or 0
+    stl = season.get('STL', 0) or 0
+    blk = season.get('BLK', 0) or 0
+
+    if gp_s > 0:
+        season['PPG'] = round(pts / gp_s, 2)
+        season['RPG'] = round(reb / gp_s, 2)
+        season['APG'] = round(ast / gp_s, 2)
+        season['STLPG'] = round(stl / gp_s, 2)
+        season['BLKPG'] = round(blk / gp_s, 2)
+    else:
+        season['PPG'] = season['RPG'] = season['APG'] = season['STLPG'] = season['BLKPG'] = 0
+
+    if season['FG3_PCT'] is None:
+        season['FG3_PCT'] = 0
+    return season
+
+
+PER_GAME = ['PPG', 'RPG', 'APG', 'STLPG', 'BLKPG']
+
+SEASON = CAREER['SeasonTotalsRegularSeason'][0]
+
+
+class WithAveragesTests(SimpleTestCase):
+
+    def assertMatchesRowByRow(self, rows, columns):
+        for new, old in zip(with_averages(rows), map(row_by_row, rows)):
+            self.assertEqual({column: new[column] for column in columns}, {column: old[column] for column in columns})
+
+    def test_per_game_matches_row_by_row(self):
+        self.assertMatchesRowByRow(CAREER['SeasonTotalsRegularSeason'] + CAREER['SeasonTotalsPostSeason'], PER_GAME)
+
+    def test_zero_and_null_games(self):
+        rows = [dict(SEASON, GP=0), dict(SEASON, GP=None), {'GP': 5, 'PTS': None, 'REB': 10, 'FG3_PCT': None}]
+        self.assertMatchesRowByRow(rows, PER_GAME)
+        self.assertEqual(with_averages(rows)[2]['PPG'], 0)
+        self.assertEqual(with_averages(rows)[0]['MPG'], 0)
+
+    def test_per_36_and_true_shooting(self):
+        row = with_averages([SEASON])[0]
+        self.assertEqual(row['MPG'], round(3122 / 79, 2))
+        self.assertEqual(row['PTS_PER36'], round(1654 * 36 / 3122, 1))
+        self.assertEqual(row['AST_PER36'], round(465 * 36 / 3122, 1))
+        self.assertEqual(row['TS_PCT'], round(1654 / (2 * (1492 + 0.44 * 460)), 3))
+        self.assertEqual(with_averages([dict(SEASON, MIN=0, FGA=0, FTA=0)])[0]['PTS_PER36'], 0)
+        self.assertEqual(with_averages([dict(SEASON, MIN=0, FGA=0, FTA=0)])[0]['TS_PCT'], 0)
+
+    def test_percentage_fill(self):
+        # Reported percentages are kept, as before
+        self.assertMatchesRowByRow([SEASON], ['FG3_PCT'])
+        self.assertEqual(with_averages([SEASON])[0]['FG_PCT'], 0.417)
+        # A null percentage with no attempts is 0, as before
+        self.assertMatchesRowByRow([dict(SEASON, FG3M=0, FG3A=0, FG3_PCT=None)], ['FG3_PCT'])
+        # A null percentage with attempts is now computed from makes and attempts instead of shown as 0
+        row = CAREER['SeasonTotalsRegularSeason'][1]
+        self.assertEqual(row_by_row(row)['FG3_PCT'], 0)
+        self.assertEqual(with_averages([row])[0]['FG3_PCT'], round(108 / 308, 3))
+
+    def test_rows_are_not_modified(self):
+        rows = [dict(SEASON, FG3_PCT=None)]
+        with_averages(rows)
+        self.assertEqual(rows, [dict(SEASON, FG3_PCT=None)])
+        self.assertEqual(with_averages([]), [])
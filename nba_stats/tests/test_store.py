@@ -0,0 +1,62 @@
+"""
+File: test_store.py
+Description: Tests for incremental saves to the local stats store (nba_stats.store).
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase
+
+from nba_stats.models import Player, SeasonStats, CareerTotals
+from nba_stats.store import save_career_dict, load_career_dict
+from nba_stats.tests.data import CAREER, career_dict
+
+
+class SaveCareerDictTests(TestCase):
+
+    def setUp(self):
+        _, self.changes = save_career_dict(2544, career_dict(2544))
+
+    def test_first_save_creates_every_row(self):
+        self.assertEqual(self.changes, {'created': 5, 'updated': 0, 'deleted': 0, 'unchanged': 0})
+        self.assertEqual(SeasonStats.objects.filter(player_id=2544).count(), 3)
+        self.assertEqual(CareerTotals.objects.filter(player_id=2544).count(), 2)
+        self.assertEqual(load_career_dict(2544)['data']['SeasonTotalsRegularSeason'][1]['PTS'], 2175)
+
+    def test_career_team_id_round_trips(self):
+        self.assertEqual(CareerTotals.objects.filter(player_id=2544, team_id=0).count(), 2)
+        career = load_career_dict(2544)['data']['CareerTotalsRegularSeason'][0]
+        self.assertEqual(career, CAREER['CareerTotalsRegularSeason'][0])
+
+    def test_same_content_only_touches_fetched_at(self):
+        Player.objects.filter(player_id=2544).update(fetched_at=Player.objects.get().fetched_at - timedelta(days=1))
+        before = Player.objects.get().fetched_at
+
+        with self.assertNumQueries(4):
+            _, changes = save_career_dict(2544, career_dict(2544))
+        self.assertEqual(changes, {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0})
+        self.assertGreater(Player.objects.get().fetched_at, before)
+
+    def test_only_changed_rows_are_written(self):
+        seasons = [dict(row) for row in CAREER['SeasonTotalsRegularSeason']]
+        seasons[1]['PTS'] = 2200
+        ids = dict(SeasonStats.objects.values_list('season_id', 'pk'))
+
+        _, changes = save_career_dict(2544, career_dict(2544, SeasonTotalsRegularSeason=seasons))
+        self.assertEqual(changes, {'created': 0, 'updated': 1, 'deleted': 0, 'unchanged': 4})
+        self.assertEqual(SeasonStats.objects.get(season_id='2004-05').pts, 2200)
+        self.assertEqual(dict(SeasonStats.objects.values_list('season_id', 'pk')), ids)
+
+    def test_added_and_removed_rows(self):
+        seasons = [dict(row) for row in CAREER['SeasonTotalsRegularSeason']]
+        added = dict(seasons[1], SEASON_ID='2005-06', PTS=2478)
+
+        _, changes = save_career_dict(2544, career_dict(2544, SeasonTotalsRegularSeason=seasons[:1] + [added]))
+        self.assertEqual(changes, {'created': 0, 'updated': 1, 'deleted': 0, 'unchanged': 4})
+
+        _, changes = save_career_dict(2544, career_dict(2544, SeasonTotalsRegularSeason=seasons[:1]))
+        self.assertEqual(changes, {'created': 0, 'updated': 0, 'deleted': 1, 'unchanged': 4})
+        self.assertEqual(SeasonStats.objects.filter(season_type='RegularSeason').count(), 1)
+
+        _, changes = save_career_dict(2544, career_dict(2544, SeasonTotalsRegularSeason=seasons[:1] + [added]))
+        self.assertEqual(changes, {'created': 1, 'updated': 0, 'deleted': 0, 'unchanged': 4})
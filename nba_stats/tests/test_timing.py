@@ -0,0 +1,95 @@
+"""
+File: test_timing.py
+Description: Tests for request instrumentation (nba_stats.timing) and the metrics view.
+"""
+
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from nba_stats import timing
+from nba_stats.timing import Metrics, RequestTimings, server_timing
+
+SAMPLED = {'SAMPLE_RATE': 1, 'SERVER_TIMING': True, 'LOG': False, 'METRICS_TOKEN': 'secret'}
+
+
+class ServerTimingTests(TestCase):
+
+    def test_header_value(self):
+        timings = RequestTimings()
+        timings.add_phase('career_api', 0.25)
+        timings.add_phase('scrape', 0.1)
+        timings.add_phase('scrape', 0.05)
+        timings.add_query(0.002)
+        timings.cache['career'] = 'miss'
+        self.assertEqual(server_timing(timings, 0.5), (
+            'career_api;dur=250.0, scrape;dur=150.0;desc="2 calls", db;dur=2.0;desc="1 queries", '
+            'cache-career;desc=miss, total;dur=500.0'
+        ))
+
+    def test_phases_are_ignored_outside_sampled_requests(self):
+        with timing.phase('career'):
+            timing.record_cache('career', 'hit')
+
+
+@override_settings(NBA_STATS_TIMING=SAMPLED)
+class TimingMiddlewareTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(timing, 'metrics', Metrics())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse('nba_stats:player_autocomplete')
+
+    def test_sampled_request_gets_header_and_metrics(self):
+        response = self.client.get(self.url, {'q': 'lebron'})
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$')
+
+        text = timing.prometheus_metrics()
+        self.assertIn('nba_stats_sampled_requests_total{view="nba_stats:player_autocomplete",status="200"} 1', text)
+        self.assertIn('nba_stats_request_duration_seconds_count{view="nba_stats:player_autocomplete"} 1', text)
+        self.assertIn('# TYPE nba_stats_revalidate_pending gauge', text)
+
+    def test_log_line(self):
+        with override_settings(NBA_STATS_TIMING={**SAMPLED, 'LOG': True}), \
+                self.assertLogs('nba_stats.timing', 'INFO') as logs:
+            self.client.get(self.url, {'q': 'lebron'})
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['event'], line['view'], line['status']),
+                         ('request_timing', 'nba_stats:player_autocomplete', 200))
+
+    def test_unsampled_request_is_untouched(self):
+        with override_settings(NBA_STATS_TIMING={**SAMPLED, 'SAMPLE_RATE': 0}):
+            response = self.client.get(self.url, {'q': 'lebron'})
+        self.assertNotIn('Server-Timing', response)
+        self.assertNotIn('player_autocomplete', timing.prometheus_metrics())
+
+
+@override_settings(NBA_STATS_TIMING=SAMPLED)
+class MetricsViewTests(TestCase):
+
+    def setUp(self):
+        self.url = reverse('nba_stats:metrics')
+
+    def test_anonymous_and_wrong_token_are_forbidden(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.client.force_login(User.objects.create_user('fan'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_token_is_accepted(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertEqual(response['Cache-Control'], 'no-store')
+
+    def test_staff_can_read(self):
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_empty_token_is_not_accepted(self):
+        with override_settings(NBA_STATS_TIMING={**SAMPLED, 'METRICS_TOKEN': ''}):
+            self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer ').status_code, 403)
@@ -0,0 +1,86 @@
+"""
+File: test_upstream.py
+Description: Tests for the upstream client's circuit breaker (nba_stats.upstream). HTTP calls are made
+against a mocked requests session.
+"""
+
+import time
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from nba_stats.upstream import CircuitBreaker, UpstreamClient, UpstreamError, UpstreamUnavailable
+
+
+def make_response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b'{}'
+    response.url = 'https://www.nba.com/player/1'
+    return response
+
+
+@override_settings(NBA_STATS_UPSTREAM={'RETRIES': 0, 'BACKOFF': 0, 'BREAKER_THRESHOLD': 3, 'BREAKER_RESET': 60})
+class UpstreamClientBreakerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.client = UpstreamClient()
+        self.breaker = self.client.breakers['web']
+
+    def get_with(self, result):
+        side_effect = result if isinstance(result, Exception) else None
+        return_value = None if side_effect else make_response(result)
+        with mock.patch.object(self.client.session, 'get', side_effect=side_effect, return_value=return_value):
+            return self.client.get('web', 'https://www.nba.com/player/1')
+
+    def test_not_found_responses_do_not_open_the_circuit(self):
+        for _ in range(10):
+            with self.assertRaises(UpstreamError):
+                self.get_with(404)
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertEqual(self.get_with(200).status_code, 200)
+
+    def test_server_errors_and_timeouts_open_the_circuit(self):
+        for error in (503, requests.ConnectionError(), requests.ReadTimeout()):
+            with self.assertRaises(UpstreamError):
+                self.get_with(error)
+        self.assertEqual(self.breaker.state, 'open')
+        with self.assertRaises(UpstreamUnavailable):
+            self.get_with(200)
+
+    def test_client_error_resets_consecutive_failures(self):
+        for status in (503, 503, 404, 503, 503):
+            with self.assertRaises(UpstreamError):
+                self.get_with(status)
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_unexpected_error_in_trial_call_frees_the_trial_slot(self):
+        for _ in range(3):
+            with self.assertRaises(UpstreamError):
+                self.get_with(503)
+        self.breaker.opened_at = time.monotonic() - 61
+        self.assertEqual(self.breaker.state, 'half-open')
+
+        with self.assertRaises(KeyError):
+            self.get_with(KeyError('boom'))
+        self.assertFalse(self.breaker.trial_in_flight)
+
+        # The next call is let through as a new trial and closes the circuit
+        self.assertEqual(self.get_with(200).status_code, 200)
+        self.assertEqual(self.breaker.state, 'closed')
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def test_half_open_allows_a_single_trial(self):
+        breaker = CircuitBreaker('test', threshold=1, reset=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.before_call())
+        with self.assertRaises(UpstreamUnavailable):
+            breaker.before_call()
+        breaker.record_failure()
+        self.assertTrue(breaker.before_call())
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+        self.assertFalse(breaker.before_call())
@@ -0,0 +1,54 @@
+"""
+File: test_utils.py
+Description: Tests for the PlayerHeadShot read-through store (nba_stats.utils). Upstream calls are mocked.
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from nba_stats import upstream, utils
+from nba_stats.models import PlayerHeadShot
+
+EMPTY_PLAYER_INFO = {'resultSets': [{'name': 'CommonPlayerInfo', 'headers': [], 'rowSet': []}]}
+
+
+class PlayerNameAndImageTests(TestCase):
+
+    def test_unknown_player_is_stored_as_placeholder(self):
+        with mock.patch.object(upstream, 'get_common_player_info', return_value=EMPTY_PLAYER_INFO) as info, \
+                mock.patch.object(upstream, 'get_player_page') as page:
+            name, image_url = utils.get_player_name_and_image(999999999)
+            self.assertEqual((name, image_url), ("Unknown Player", utils.PLACEHOLDER_IMAGE_URL))
+
+            # The placeholder row answers the next view without going upstream
+            self.assertEqual(utils.get_player_name_and_image(999999999), (name, image_url))
+
+        self.assertEqual(info.call_count, 1)
+        page.assert_not_called()
+        self.assertTrue(PlayerHeadShot.objects.get(player_id=999999999).is_placeholder)
+
+    def test_upstream_failure_falls_back_to_static_name(self):
+        error = upstream.UpstreamError("down")
+        with mock.patch.object(upstream, 'get_common_player_info', side_effect=error):
+            self.assertEqual(utils.get_player_name_and_image(2544), ("LeBron James", utils.PLACEHOLDER_IMAGE_URL))
+        self.assertFalse(PlayerHeadShot.objects.filter(player_id=2544).exists())
+
+
+class NeedsRefreshTests(TestCase):
+
+    def headshot(self, age_days, is_placeholder=False):
+        return PlayerHeadShot(player_id=2544, is_placeholder=is_placeholder,
+                              fetched_at=timezone.now() - timedelta(days=age_days))
+
+    def test_refresh_windows(self):
+        self.assertTrue(utils.needs_refresh(None))
+        self.assertFalse(utils.needs_refresh(self.headshot(2)))
+        self.assertTrue(utils.needs_refresh(self.headshot(2, is_placeholder=True)))
+
+    def test_windows_are_read_from_settings_at_call_time(self):
+        with override_settings(NBA_STATS_HEADSHOT_REFRESH_DAYS=1, NBA_STATS_PLACEHOLDER_REFRESH_DAYS=3):
+            self.assertTrue(utils.needs_refresh(self.headshot(2)))
+            self.assertFalse(utils.needs_refresh(self.headshot(2, is_placeholder=True)))
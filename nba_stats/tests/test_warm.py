@@ -0,0 +1,94 @@
+"""
+File: test_warm.py
+Description: Tests for page view counting and cache warming (nba_stats.warm). Upstream calls are mocked.
+"""
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from nba_stats import warm
+from nba_stats.cache import get_backend
+from nba_stats.models import Player, PlayerHeadShot, PlayerViewCount
+from nba_stats.tests.data import career_dict
+from nba_stats.upstream import UpstreamError
+
+
+class ViewCountTests(TestCase):
+
+    def setUp(self):
+        warm.view_buffer.take()
+
+    def test_record_view_does_not_write(self):
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                warm.record_view(2544)
+
+    def test_flush_adds_buffered_views(self):
+        PlayerViewCount.objects.create(player_id=2544, views=10)
+        for player_id in (2544, 2544, 201939):
+            warm.record_view(player_id)
+
+        self.assertEqual(warm.flush_views(), 2)
+        self.assertEqual(PlayerViewCount.objects.get(player_id=2544).views, 12)
+        self.assertEqual(PlayerViewCount.objects.get(player_id=201939).views, 1)
+        self.assertEqual(warm.flush_views(), 0)
+
+    @override_settings(NBA_STATS_WARM={'VIEW_FLUSH_INTERVAL': 0})
+    def test_due_buffer_schedules_a_background_flush(self):
+        with mock.patch.object(warm.player_revalidator, 'schedule') as schedule:
+            warm.record_view(2544)
+        schedule.assert_called_once_with(('views',), warm.flush_views)
+
+
+class WarmRateTests(TestCase):
+
+    def test_every_upstream_call_takes_a_token(self):
+        acquired = []
+        limiter = mock.Mock(acquire=lambda: acquired.append(1))
+        with mock.patch.object(warm, 'RateLimiter', return_value=limiter), \
+                mock.patch.object(warm, 'fetch_career_stats', return_value={}), \
+                mock.patch.object(warm, 'fetch_player_name', return_value='LeBron James'), \
+                mock.patch.object(warm, 'fetch_player_headshot_url', return_value=None), \
+                mock.patch.object(warm, 'store_career_stats'), \
+                mock.patch.object(warm, 'prebuild_chart'):
+            report = warm.warm([2544, 201939], workers=1, rate=1)
+
+        self.assertEqual(report['fetched'], 2)
+        self.assertEqual(len(acquired), 6)
+
+
+class WarmFetchTests(TestCase):
+
+    def warm(self, **fetchers):
+        fetchers = {'fetch_career_stats': career_dict, 'fetch_player_name': lambda player_id: 'LeBron James',
+                    'fetch_player_headshot_url': lambda player_id: None, **fetchers}
+        with mock.patch.object(warm, 'prebuild_chart'), \
+                mock.patch.multiple(warm, **{name: mock.Mock(side_effect=func) for name, func in fetchers.items()}):
+            return warm.warm([2544], workers=1, rate=0)
+
+    def test_headshot_failure_keeps_career_stats(self):
+        with self.assertLogs('nba_stats.warm', 'WARNING'):
+            report = self.warm(fetch_player_headshot_url=mock.Mock(side_effect=UpstreamError('nba.com down')))
+        self.assertEqual((report['fetched'], report['failed']), (1, 0))
+        self.assertTrue(Player.objects.filter(player_id=2544, fetched_at__isnull=False).exists())
+        self.assertFalse(PlayerHeadShot.objects.filter(player_id=2544).exists())
+
+    def test_career_failure_keeps_headshot(self):
+        with self.assertLogs('nba_stats.warm', 'WARNING'):
+            report = self.warm(fetch_career_stats=mock.Mock(side_effect=UpstreamError('stats down')))
+        self.assertEqual((report['fetched'], report['failed']), (1, 0))
+        self.assertEqual(PlayerHeadShot.objects.get(player_id=2544).player_name, 'LeBron James')
+
+    def test_player_fails_when_nothing_is_fetched(self):
+        down = mock.Mock(side_effect=UpstreamError('down'))
+        report = self.warm(fetch_career_stats=down, fetch_player_name=down)
+        self.assertEqual((report['fetched'], report['failed']), (0, 1))
+
+    def test_cold_players_are_found_with_one_cache_lookup(self):
+        backend = get_backend()
+        with mock.patch.object(backend, 'get', wraps=backend.get) as get, \
+                mock.patch.object(backend, 'get_many', wraps=backend.get_many) as get_many:
+            warm.hit_rates([2544, 201939, 203999])
+        get.assert_not_called()
+        get_many.assert_called_once()
@@ -0,0 +1,257 @@
+"""
+File: timing.py
+Description: Request instrumentation. TimingMiddleware times a sample of requests phase by phase (upstream
+calls, HTML scraping and parsing, database queries, template rendering) and records career stats and headshot
+cache hits and misses. Each sampled request gets a Server-Timing header and one structured log line, and
+is added to process-wide counters served in Prometheus text format by the metrics view, together with the
+single-flight, background refresh and circuit breaker counters.
+
+Code on the hot path marks phases with `with phase('name'):` and cache lookups with record_cache(); both
+do nothing for requests that were not sampled and in background threads.
+"""
+
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from .revalidate import player_revalidator
+from .singleflight import get_stats as get_flight_stats
+from .upstream import get_breaker_states
+
+logger = logging.getLogger(__name__)
+
+# Default instrumentation configuration, overridable through settings.NBA_STATS_TIMING
+DEFAULTS = {
+    'SAMPLE_RATE': 0.1,        # fraction of requests timed in detail (0 disables timing, 1 times every request)
+    'SERVER_TIMING': True,     # add a Server-Timing header to sampled responses
+    'LOG': True,               # log one JSON line per sampled request
+    'METRICS_TOKEN': '',       # bearer token for the metrics view (staff users can always read it)
+}
+
+# Request duration histogram buckets, in seconds
+DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+
+def get_setting(name):
+    """Return an instrumentation setting, falling back to DEFAULTS."""
+    return getattr(settings, 'NBA_STATS_TIMING', {}).get(name, DEFAULTS[name])
+
+
+class RequestTimings:
+    """
+    The timings of one sampled request. Phases may be recorded from several threads at once (the async
+    player page fetches concurrently), so updates take a lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phases = {}          # name -> [seconds, calls]
+        self.cache = {}           # cache name -> 'hit', 'stale' or 'miss' (the last lookup wins)
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    def add_phase(self, name, seconds):
+        with self.lock:
+            totals = self.phases.setdefault(name, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += 1
+
+    def add_query(self, seconds):
+        with self.lock:
+            self.queries += 1
+            self.query_seconds += seconds
+
+
+_current = contextvars.ContextVar('nba_stats_timings', default=None)
+
+
+@contextmanager
+def phase(name):
+    """Time the enclosed block as phase `name` of the current request, if it is being sampled."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_phase(name, time.perf_counter() - started)
+
+
+def record_cache(name, result):
+    """Record the result ('hit', 'stale' or 'miss') of a cache lookup made by the current request."""
+    timings = _current.get()
+    if timings is not None:
+        with timings.lock:
+            timings.cache[name] = result
+
+
+class Metrics:
+    """Process-wide counters built from sampled requests. Each worker process keeps its own."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sampled = defaultdict(int)                  # (view, status) -> requests
+        self.duration_sum = defaultdict(float)           # view -> seconds
+        self.duration_buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.phase_seconds = defaultdict(float)          # (view, phase) -> seconds
+        self.phase_calls = defaultdict(int)              # (view, phase) -> calls
+        self.cache = defaultdict(int)                    # (cache, result) -> lookups
+        self.queries = defaultdict(int)                  # view -> queries
+        self.query_seconds = defaultdict(float)          # view -> seconds
+
+    def observe(self, view, status, duration, timings):
+        with self.lock:
+            self.sampled[view, status] += 1
+            self.duration_sum[view] += duration
+            buckets = self.duration_buckets[view]
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[index] += 1
+            for name, (seconds, calls) in timings.phases.items():
+                self.phase_seconds[view, name] += seconds
+                self.phase_calls[view, name] += calls
+            for name, result in timings.cache.items():
+                self.cache[name, result] += 1
+            self.queries[view] += timings.queries
+            self.query_seconds[view] += timings.query_seconds
+
+
+metrics = Metrics()
+
+
+def server_timing(timings, total):
+    """Format a request's timings as a Server-Timing header value."""
+    entries = [
+        f'{name};dur={seconds * 1000:.1f}' + (f';desc="{calls} calls"' if calls > 1 else '')
+        for name, (seconds, calls) in timings.phases.items()
+    ]
+    entries.append(f'db;dur={timings.query_seconds * 1000:.1f};desc="{timings.queries} queries"')
+    entries += [f'cache-{name};desc={result}' for name, result in timings.cache.items()]
+    entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def view_name(request):
+    """Return the URL name of the view that handled a request, or 'unresolved'."""
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name or match._func_path) if match else 'unresolved'
+
+
+class TimingMiddleware:
+    """
+    Times a sample of requests. Database queries are counted and timed with a connection execute
+    wrapper, and view code records phases through phase() and record_cache().
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = get_setting('SAMPLE_RATE')
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+
+        def count_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timings.add_query(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        try:
+            with connections['default'].execute_wrapper(count_query):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        view = view_name(request)
+        metrics.observe(view, response.status_code, total, timings)
+        if get_setting('SERVER_TIMING'):
+            response['Server-Timing'] = server_timing(timings, total)
+        if get_setting('LOG'):
+            logger.info(json.dumps({
+                'event': 'request_timing',
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 1),
+                'phases_ms': {name: round(seconds * 1000, 1) for name, (seconds, _) in timings.phases.items()},
+                'cache': timings.cache,
+                'db_queries': timings.queries,
+                'db_ms': round(timings.query_seconds * 1000, 1),
+            }))
+        return response
+
+
+def prometheus_metrics():
+    """Render the request metrics and the upstream, single-flight and background refresh counters as Prometheus text."""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in samples:
+            label_text = ','.join(f'{key}="{label}"' for key, label in labels.items())
+            lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+
+    with metrics.lock:
+        metric('nba_stats_sampled_requests_total', 'counter', 'Sampled requests by view and status.',
+               [({'view': view, 'status': status}, count) for (view, status), count in sorted(metrics.sampled.items())])
+
+        lines.append('# HELP nba_stats_request_duration_seconds Duration of sampled requests.')
+        lines.append('# TYPE nba_stats_request_duration_seconds histogram')
+        for view, buckets in sorted(metrics.duration_buckets.items()):
+            for bound, count in zip(DURATION_BUCKETS, buckets):
+                lines.append(f'nba_stats_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {count}')
+            count = sum(value for (name, _), value in metrics.sampled.items() if name == view)
+            lines.append(f'nba_stats_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {count}')
+            lines.append(f'nba_stats_request_duration_seconds_sum{{view="{view}"}} {metrics.duration_sum[view]:.6f}')
+            lines.append(f'nba_stats_request_duration_seconds_count{{view="{view}"}} {count}')
+
+        metric('nba_stats_phase_seconds_total', 'counter', 'Time spent in each phase of sampled requests.',
+               [({'view': view, 'phase': name}, f'{seconds:.6f}')
+                for (view, name), seconds in sorted(metrics.phase_seconds.items())])
+        metric('nba_stats_phase_calls_total', 'counter', 'Phase executions in sampled requests.',
+               [({'view': view, 'phase': name}, calls) for (view, name), calls in sorted(metrics.phase_calls.items())])
+        metric('nba_stats_cache_lookups_total', 'counter', 'Career stats and headshot lookups by result.',
+               [({'cache': name, 'result': result}, count) for (name, result), count in sorted(metrics.cache.items())])
+        metric('nba_stats_db_queries_total', 'counter', 'Database queries made by sampled requests.',
+               [({'view': view}, count) for view, count in sorted(metrics.queries.items())])
+        metric('nba_stats_db_query_seconds_total', 'counter', 'Database time of sampled requests.',
+               [({'view': view}, f'{seconds:.6f}') for view, seconds in sorted(metrics.query_seconds.items())])
+
+    flights = get_flight_stats()
+    for counter in ('requests', 'executions', 'coalesced'):
+        metric(f'nba_stats_singleflight_{counter}_total', 'counter', f'Single-flight {counter} by group.',
+               [({'group': name}, stats[counter]) for name, stats in flights.items()])
+    metric('nba_stats_singleflight_in_flight', 'gauge', 'Upstream calls currently in flight by group.',
+           [({'group': name}, stats['in_flight']) for name, stats in flights.items()])
+
+    refreshes = player_revalidator.stats()
+    for counter in ('scheduled', 'skipped', 'failed'):
+        metric(f'nba_stats_revalidate_{counter}_total', 'counter', f'Background refreshes {counter}.',
+               [({}, refreshes[counter])])
+    metric('nba_stats_revalidate_pending', 'gauge', 'Background refreshes queued or running.',
+           [({}, refreshes['pending'])])
+
+    metric('nba_stats_upstream_breaker_state', 'gauge', 'Circuit breaker state by upstream host (1 for the current state).',
+           [({'host': host, 'state': state}, int(state == current))
+            for host, current in get_breaker_states().items() for state in ('closed', 'open', 'half-open')])
+
+    return '\n'.join(lines) + '\n'
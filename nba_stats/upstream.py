@@ -0,0 +1,266 @@
+"""
+File: upstream.py
+Description: The single client used for every call to stats.nba.com and nba.com. Requests share a
+keep-alive connection pool, have strict connect/read timeouts, are retried a bounded number of times
+with exponential backoff (tenacity), and go through a per-host circuit breaker that fails fast while
+the upstream is down so callers can serve cached or stale data instead. requests, tenacity and nba_api
+(which loads pandas and every endpoint module) are imported when the client is first used rather than
+at start-up.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Default client configuration, overridable through settings.NBA_STATS_UPSTREAM
+DEFAULTS = {
+    'STATS_BASE_URL': 'https://stats.nba.com/stats',
+    'WEB_BASE_URL': 'https://www.nba.com',
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 8,
+    'RETRIES': 2,              # extra attempts after the first one
+    'BACKOFF': 0.5,            # seconds; doubled after every failed attempt
+    'POOL_SIZE': 10,           # keep-alive connections per host
+    'BREAKER_THRESHOLD': 5,    # consecutive failures before the circuit opens
+    'BREAKER_RESET': 60,       # seconds the circuit stays open before a trial request
+}
+
+# Status codes worth retrying; anything else is returned or raised immediately
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def get_setting(name):
+    """Return an upstream client setting, falling back to DEFAULTS."""
+    return getattr(settings, 'NBA_STATS_UPSTREAM', {}).get(name, DEFAULTS[name])
+
+
+class UpstreamError(Exception):
+    """An upstream request failed (timeout, connection error, bad status or bad response)."""
+
+
+class PlayerNotFound(UpstreamError):
+    """The upstream answered, but has no data for the requested player (e.g. an unknown player ID)."""
+
+
+class UpstreamUnavailable(UpstreamError):
+    """The circuit breaker for a host is open, so the request was not attempted."""
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive failures for one upstream host.
+
+    After `threshold` consecutive failures the circuit opens and calls fail immediately. Once `reset`
+    seconds have passed a single trial call is let through: success closes the circuit, failure
+    opens it again.
+    """
+
+    def __init__(self, name, threshold, reset):
+        self.name = name
+        self.threshold = threshold
+        self.reset = reset
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self):
+        """
+        Raise UpstreamUnavailable unless a call may be made right now.
+
+        Returns:
+            bool: True if the call is the half-open trial call (see release_trial).
+        """
+        with self.lock:
+            state = self.state
+            if state == 'open' or (state == 'half-open' and self.trial_in_flight):
+                raise UpstreamUnavailable(f"{self.name} circuit is open")
+            if state == 'half-open':
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release_trial(self):
+        """Free the half-open trial slot if the trial call ended without recording a result."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.threshold or self.opened_at is not None:
+                if self.opened_at is None:
+                    logger.warning("Opening %s circuit after %s consecutive failures", self.name, self.failures)
+                self.opened_at = time.monotonic()
+
+
+def is_host_failure(error):
+    """
+    Return True if an error means the host itself is failing (connection problems, timeouts, throttling
+    or server errors). Other 4xx responses, such as a 404 for an unknown player, are answers from a
+    healthy host and must not open its circuit.
+    """
+    import requests
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRY_STATUSES or error.response.status_code >= 500
+    return True
+
+
+def is_retryable(error):
+    """Retry connection problems, connect timeouts and throttling/server errors, but not read timeouts."""
+    import requests
+
+    if isinstance(error, requests.ReadTimeout):
+        return False
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUSES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class UpstreamClient:
+    """A pooled HTTP session plus one circuit breaker per upstream host."""
+
+    def __init__(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=get_setting('POOL_SIZE'))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        threshold, reset = get_setting('BREAKER_THRESHOLD'), get_setting('BREAKER_RESET')
+        self.breakers = {
+            'stats': CircuitBreaker('stats.nba.com', threshold, reset),
+            'web': CircuitBreaker('nba.com', threshold, reset),
+            'images': CircuitBreaker('cdn.nba.com', threshold, reset),
+        }
+
+    def get(self, host, url, **kwargs):
+        """
+        GET `url` through the breaker for `host` ('stats', 'web' or 'images'), with timeouts and retries.
+
+        Returns:
+            requests.Response: A response with a successful status code.
+
+        Raises:
+            UpstreamUnavailable: The host's circuit is open.
+            UpstreamError: The request failed after all retries.
+        """
+        breaker = self.breakers[host]
+        trial = breaker.before_call()
+        try:
+            return self._get(breaker, url, **kwargs)
+        finally:
+            # However the trial call ended (including errors that are not requests exceptions), free its slot
+            if trial:
+                breaker.release_trial()
+
+    def _get(self, breaker, url, **kwargs):
+        import requests
+        from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+        retrying = Retrying(
+            stop=stop_after_attempt(get_setting('RETRIES') + 1),
+            wait=wait_exponential(multiplier=get_setting('BACKOFF'), max=4),
+            retry=retry_if_exception(is_retryable),
+            reraise=True,
+        )
+        timeout = (get_setting('CONNECT_TIMEOUT'), get_setting('READ_TIMEOUT'))
+        try:
+            for attempt in retrying:
+                with attempt:
+                    response = self.session.get(url, timeout=timeout, **kwargs)
+                    response.raise_for_status()
+        except requests.RequestException as e:
+            if is_host_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise UpstreamError(f"GET {url} failed: {e!r}") from e
+
+        breaker.record_success()
+        return response
+
+    def stats_endpoint(self, endpoint):
+        """
+        Call a stats.nba.com endpoint described by an nba_api endpoint object (built with
+        get_request=False), using the same parameters and headers nba_api would.
+
+        Returns:
+            NBAStatsResponse: nba_api's response wrapper (get_dict, get_normalized_dict, ...).
+        """
+        from nba_api.stats.library.http import NBAStatsResponse, STATS_HEADERS
+
+        url = f"{get_setting('STATS_BASE_URL')}/{endpoint.endpoint}"
+        parameters = sorted(endpoint.parameters.items())
+        response = self.get('stats', url, params=parameters, headers=STATS_HEADERS)
+        data = NBAStatsResponse(response=response.text, status_code=response.status_code, url=response.url)
+        if not data.valid_json():
+            self.breakers['stats'].record_failure()
+            raise UpstreamError(f"Invalid JSON from {response.url}")
+        return data
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide upstream client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = UpstreamClient()
+    return _client
+
+
+def get_career_stats(player_id):
+    """Fetch a player's PlayerCareerStats as nba_api's normalized dict."""
+    from nba_api.stats.endpoints.playercareerstats import PlayerCareerStats
+
+    endpoint = PlayerCareerStats(player_id=player_id, get_request=False)
+    return get_client().stats_endpoint(endpoint).get_normalized_dict()
+
+
+def get_common_player_info(player_id):
+    """Fetch a player's raw CommonPlayerInfo response dict."""
+    from nba_api.stats.endpoints.commonplayerinfo import CommonPlayerInfo
+
+    endpoint = CommonPlayerInfo(player_id=player_id, get_request=False)
+    return get_client().stats_endpoint(endpoint).get_dict()
+
+
+def get_player_page(player_id):
+    """Fetch the HTML of a player's nba.com page."""
+    return get_client().get('web', f"{get_setting('WEB_BASE_URL')}/player/{player_id}").content
+
+
+def get_image(url):
+    """Fetch the bytes of a headshot image (hosted on cdn.nba.com)."""
+    return get_client().get('images', url).content
+
+
+def get_breaker_states():
+    """Return each upstream host's circuit breaker state ('closed', 'open' or 'half-open')."""
+    return {breaker.name: breaker.state for breaker in get_client().breakers.values()}
@@ -14,8 +14,20 @@ urlpatterns = [
         next_page='nba_stats:roster'  # Redirects to the roster page after login
     ), name='login'),
     path('logout/', custom_logout, name='logout'),
+    path('search/autocomplete/', views.player_autocomplete, name='player_autocomplete'),
     path('player/<int:player_id>/', views.player_details, name='player_details'),
+    path('player/<int:player_id>/seasons/<slug:season_type>/', views.season_table, name='season_table'),
+    path('player/<int:player_id>/chart/<slug:version>.json', views.career_chart, name='career_chart'),
+    path('player/<int:player_id>/async/', views.player_details_async, name='player_details_async'),
+    path('headshot/<int:player_id>/<slug:version>/<slug:size>.<slug:ext>', views.headshot_image, name='headshot_image'),
     path('add_to_roster/<int:player_id>/', add_to_roster, name='add_to_roster'),
     path('remove_from_roster/<int:player_id>/', remove_from_roster, name='remove_from_roster'),
     path('roster/', user_roster, name='roster'),
+    path('leaderboard/', views.leaderboard, name='leaderboard'),
+    path('export/', views.export_stats, name='export_stats'),
+    path('api/players/', views.api_players, name='api_players'),
+    path('api/players/<int:player_id>/', views.api_player, name='api_player'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('compare/', views.compare, name='compare'),
+    path('api/compare/', views.api_compare, name='api_compare'),
 ]
\ No newline at end of file
@@ -1,19 +1,156 @@
 """
-File: models.py
+File: utils.py
 Author: Mark Maci, markmaci@bu.edu, 12/10/2024
 Description: Utility functions to assist in player data retrieval from the NBA API and related sources.
 These functions do not directly render views but provide helper logic, such as fetching
 a player's name and headshot image.
 """
 
-from nba_api.stats.endpoints import commonplayerinfo
-import requests
-from bs4 import BeautifulSoup
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import upstream
+from .models import PlayerHeadShot
+from .revalidate import player_revalidator
+from .search import find_player
+from .singleflight import player_info_flight, headshot_flight
+from .timing import phase, record_cache
+
+# Image shown when nba.com has no headshot for a player
+PLACEHOLDER_IMAGE_URL = "https://via.placeholder.com/150"
+
+# Default number of days a stored name/headshot is trusted before it is scraped again
+# (settings.NBA_STATS_HEADSHOT_REFRESH_DAYS)
+HEADSHOT_REFRESH_DAYS = 30
+
+# Placeholder (negative) entries are retried sooner in case nba.com adds the image later
+# (settings.NBA_STATS_PLACEHOLDER_REFRESH_DAYS)
+PLACEHOLDER_REFRESH_DAYS = 1
+
+
+def _fetch_player_name(player_id):
+    info = upstream.get_common_player_info(player_id)
+    rows = info['resultSets'][0]['rowSet'] if info.get('resultSets') else []
+    if not rows:
+        raise upstream.PlayerNotFound(f"No CommonPlayerInfo for player {player_id}")
+    data = rows[0]
+
+    # The name at index 3 is DISPLAY_FIRST_LAST (e.g., "LeBron James")
+    return data[3]
+
+
+def fetch_player_name(player_id):
+    """
+    Fetch a player's display name from the NBA API's CommonPlayerInfo endpoint.
+    Concurrent calls for the same player share a single API request.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+
+    Returns:
+        str: The player's display name (e.g., "LeBron James").
+
+    Raises:
+        upstream.PlayerNotFound: The API has no info for the player.
+        upstream.UpstreamError: The API call failed.
+    """
+    with phase('player_info'):
+        return player_info_flight.do(player_id, _fetch_player_name, player_id)
+
+
+def _fetch_player_headshot_url(player_id):
+    from bs4 import BeautifulSoup
+
+    with phase('scrape'):
+        page = upstream.get_player_page(player_id)
+
+    with phase('parse'):
+        soup = BeautifulSoup(page, 'html.parser')
+        player_image_div = soup.find('div', {'class': 'PlayerSummary_mainInnerTeam____nFZ'})
+        img_tag = None
+        if player_image_div:
+            img_tag = player_image_div.find('img', {'class': 'PlayerImage_image__wH_YX PlayerSummary_playerImage__sysif'})
+
+    return img_tag['src'] if img_tag else None
+
+
+def fetch_player_headshot_url(player_id):
+    """
+    Scrape a player's headshot URL from their nba.com player page.
+    Concurrent calls for the same player share a single page request.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+
+    Returns:
+        str or None: The headshot image URL, or None if the page has no headshot.
+    """
+    return headshot_flight.do(player_id, _fetch_player_headshot_url, player_id)
+
+
+def needs_refresh(headshot):
+    """Return True if a stored PlayerHeadShot row is missing or older than its refresh window."""
+    if headshot is None or headshot.fetched_at is None:
+        return True
+    if headshot.is_placeholder:
+        days = getattr(settings, 'NBA_STATS_PLACEHOLDER_REFRESH_DAYS', PLACEHOLDER_REFRESH_DAYS)
+    else:
+        days = getattr(settings, 'NBA_STATS_HEADSHOT_REFRESH_DAYS', HEADSHOT_REFRESH_DAYS)
+    return timezone.now() - headshot.fetched_at >= timedelta(days=days)
+
+
+def store_player_name_and_image(player_id, player_name, head_shot_url):
+    """
+    Save a freshly fetched name/headshot pair to the PlayerHeadShot table.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+        player_name (str): The player's display name.
+        head_shot_url (str or None): The scraped headshot URL, or None if none was found.
+
+    Returns:
+        PlayerHeadShot: The saved row.
+    """
+    headshot, _ = PlayerHeadShot.objects.update_or_create(
+        player_id=player_id,
+        defaults={
+            'player_name': player_name,
+            'player_image_url': head_shot_url or PLACEHOLDER_IMAGE_URL,
+            'is_placeholder': head_shot_url is None,
+            'fetched_at': timezone.now(),
+        },
+    )
+    return headshot
+
+
+def refresh_player_name_and_image(player_id):
+    """
+    Fetch a player's name and headshot URL from upstream and store them. Players the API does not
+    know get a placeholder row (their static name, if any), which is retried after
+    NBA_STATS_PLACEHOLDER_REFRESH_DAYS.
+    """
+    try:
+        player_name = fetch_player_name(player_id)
+    except upstream.PlayerNotFound:
+        player = find_player(player_id)
+        return store_player_name_and_image(player_id, player['full_name'] if player else "Unknown Player", None)
+    head_shot_url = fetch_player_headshot_url(player_id)
+    return store_player_name_and_image(player_id, player_name, head_shot_url)
+
 
 def get_player_name_and_image(player_id):
     """
     Retrieve a player's display name and headshot URL using their NBA player_id.
 
+    The PlayerHeadShot table is used as a read-through store: the NBA API and nba.com are only
+    contacted when the player has no stored row or the row is older than its refresh window.
+    An outdated row is returned right away and refreshed by a background worker (names and
+    headshots rarely change, so there is no staleness bound). Players with no stored row are
+    fetched synchronously; if that fails (or the upstream circuit is open) they get their static
+    name and the placeholder image. When NBA_STATS_OFFLINE is set, nothing is fetched.
+
     Args:
         player_id (int): The unique NBA player ID.
 
@@ -21,25 +158,50 @@ def get_player_name_and_image(player_id):
         (str, str): A tuple containing the player's display name and headshot image URL.
                     If no headshot is found, a placeholder image URL is returned.
     """
-    # Fetch general player info from the NBA API
-    info = commonplayerinfo.CommonPlayerInfo(player_id=player_id).get_dict()
-    data = info['resultSets'][0]['rowSet'][0]
+    headshot = PlayerHeadShot.objects.filter(player_id=player_id).first()
 
-    # The name at index 3 is DISPLAY_FIRST_LAST (e.g., "LeBron James")
-    player_name = data[3]
+    if getattr(settings, 'NBA_STATS_OFFLINE', False):
+        # Never scrape at request time when offline; use whatever is stored locally
+        record_cache('headshot', 'miss' if headshot is None else 'hit')
+        if headshot is not None:
+            return headshot.player_name, headshot.player_image_url
+        player = find_player(player_id)
+        return (player['full_name'] if player else "Unknown Player"), PLACEHOLDER_IMAGE_URL
 
-    # Attempt to retrieve the player's headshot from nba.com
-    url = f'https://www.nba.com/player/{player_id}'
-    response = requests.get(url)
-    response.raise_for_status()
+    if headshot is None:
+        record_cache('headshot', 'miss')
+        try:
+            headshot = refresh_player_name_and_image(player_id)
+        except upstream.UpstreamError:
+            # Nothing stored to fall back to; use the static player list
+            player = find_player(player_id)
+            return (player['full_name'] if player else "Unknown Player"), PLACEHOLDER_IMAGE_URL
+    elif needs_refresh(headshot):
+        # Serve the stored row now and refresh it off the request thread
+        record_cache('headshot', 'stale')
+        player_revalidator.schedule(('headshot', player_id), refresh_player_name_and_image, player_id)
+    else:
+        record_cache('headshot', 'hit')
 
-    soup = BeautifulSoup(response.content, 'html.parser')
-    player_image_div = soup.find('div', {'class': 'PlayerSummary_mainInnerTeam____nFZ'})
-    head_shot_url = "https://via.placeholder.com/150"  # fallback if image not found
+    return headshot.player_name, headshot.player_image_url
 
-    if player_image_div:
-        img_tag = player_image_div.find('img', {'class': 'PlayerImage_image__wH_YX PlayerSummary_playerImage__sysif'})
-        if img_tag:
-            head_shot_url = img_tag['src']
 
-    return player_name, head_shot_url
+def get_local_player_name_and_image(player_id):
+    """
+    Resolve a player's display name and headshot URL without any network calls.
+
+    Uses a single PlayerHeadShot lookup, falling back to the static player list for the name
+    and the placeholder image when the player has never been fetched.
+
+    Args:
+        player_id (int): The unique NBA player ID.
+
+    Returns:
+        (str, str): The player's display name and headshot image URL.
+    """
+    headshot = PlayerHeadShot.objects.filter(player_id=player_id).values('player_name', 'player_image_url').first()
+    if headshot is not None:
+        return headshot['player_name'], headshot['player_image_url']
+
+    player = find_player(player_id)
+    return (player['full_name'] if player else "Unknown Player"), PLACEHOLDER_IMAGE_URL
@@ -5,22 +5,82 @@ Description: This module defines views to handle rendering and processing of the
 It includes:
 - The home page view, which provides a search form for players.
 - A search view for listing found players.
+- A JSON autocomplete endpoint for as-you-type player suggestions.
 - A detailed player page view, showing career totals and seasonal breakdowns.
+- An async variant of the player page that fetches upstream data concurrently.
+- A paginated league leaderboard view served from precomputed rankings.
+- A side-by-side comparison page (and JSON endpoint) for several players.
+- Career trajectory chart JSON, loaded by the player page after it renders.
 """
 
-from nba_api.stats.endpoints import playercareerstats
-from django.shortcuts import render, redirect
-from .forms import PlayerSearchForm, StatsDropdownForm
-from nba_api.stats.static import players
-from .utils import get_player_name_and_image
-from django.contrib.auth.models import User
-from django.contrib.auth import login, authenticate, logout
-from .forms import SignupForm
-from .models import UserProfile
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
-from .models import Roster, UserProfile
-from django.shortcuts import get_object_or_404
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import PermissionDenied
+from django.db.models import F, OuterRef, Subquery
+from django.http import FileResponse, HttpResponse, JsonResponse, Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_GET
+
+from .api import API_BATCH_LIMIT, parse_fields, parse_stats, parse_ids, serialize_players
+from .cache import (
+    get_career_stats, get_stale_entry, get_stale_entries, is_fresh, is_servable_stale, is_usable,
+    revalidate_career_stats, store_career_stats, fetch_career_stats, is_offline
+)
+from .charts import PLOTLY_JS_URL, chart_version, get_chart
+from .compare import (
+    COMPARE_LIMIT, COMPARE_MIN, COMPARE_SEASON_TYPES, COMPARE_STATS, compare_players as build_comparison,
+    parse_options as parse_compare_options, stat_decimals
+)
+from .conditional import (
+    fresh_stats_version, player_max_age, make_etag, player_page_validators, roster_page_validators, not_modified,
+    set_validators, player_page_cache_control, fragment_cache_control, roster_cache_control
+)
+from .export import EXPORT_TABLES, export_formats, iter_csv, parquet_file, valid_season_type
+from .forms import PlayerSearchForm, SignupForm, StatsDropdownForm
+from .images import FORMATS, PLACEHOLDER_VERSION, SIZES, ensure_placeholder, ensure_variant, headshot_urls, source_version
+from .leaderboards import LEADERBOARD_STATS, available_seasons, get_page
+from .models import CareerTotals, PlayerHeadShot, Roster, UserProfile
+from .revalidate import player_revalidator
+from .search import search_players, complete_players, find_player
+from .stats import with_averages
+from .timing import get_setting as get_timing_setting, phase, prometheus_metrics
+from .upstream import UpstreamError
+from .utils import (
+    get_player_name_and_image, fetch_player_name, fetch_player_headshot_url, needs_refresh,
+    store_player_name_and_image, refresh_player_name_and_image, get_local_player_name_and_image,
+    PLACEHOLDER_IMAGE_URL
+)
+from .warm import record_view
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on suggestions returned by player_autocomplete
+AUTOCOMPLETE_MAX_RESULTS = 20
+
+# Rows shown per leaderboard page
+LEADERBOARD_PAGE_SIZE = 50
+
+# Season table URL slugs -> (career stats result set, display title)
+SEASON_TABLES = {
+    'regular': ('SeasonTotalsRegularSeason', 'Regular Season'),
+    'post': ('SeasonTotalsPostSeason', 'Post Season'),
+}
+
+# StatsDropdownForm options -> season table slugs
+DROPDOWN_SEASON_TABLES = {'Reg. Season': 'regular', 'Post Season': 'post'}
+
+# How long a rendered season table (for one version of a player's stats) stays in the cache
+SEASON_TABLE_CACHE_SECONDS = 60 * 60 * 24
 
 def signup(request):
     if request.method == "POST":
@@ -52,16 +112,16 @@ def custom_logout(request):
 def home(request):
     """
     Render the home page with a player search form. When a player name is submitted via POST,
-    the first matching player's ID is used to redirect to that player's details page.
+    the best ranked match from the player search index is used to redirect to that player's details page.
     """
     if request.method == 'POST':
         form = PlayerSearchForm(request.POST)
         if form.is_valid():
-            player_name = form.cleaned_data['player_name'].title()
-            player_info = players.find_players_by_full_name(player_name)
+            player_name = form.cleaned_data['player_name']
+            player_info = search_players(player_name, limit=1)
 
             if player_info:
-                # Redirect to the first found player's details page
+                # Redirect to the best ranked player's details page
                 player_id = player_info[0]['id']
                 return redirect('nba_stats:player_details', player_id=player_id)
             else:
@@ -82,8 +142,8 @@ def search_player(request):
     if request.method == 'POST':
         form = PlayerSearchForm(request.POST)
         if form.is_valid():
-            player_name = form.cleaned_data['player_name'].title()
-            player_info = players.find_players_by_full_name(player_name)
+            player_name = form.cleaned_data['player_name']
+            player_info = search_players(player_name)
 
             # Render a list of players if found, otherwise show an error
             if player_info:
@@ -96,128 +156,650 @@ def search_player(request):
     return render(request, 'nba_stats/search.html', {'form': form})
 
 
-def player_details(request, player_id):
+@require_GET
+@cache_control(public=True, max_age=60 * 60)
+def player_autocomplete(request):
     """
-    Show detailed stats for a particular player, identified by player_id.
+    Return as-you-type player suggestions as JSON for the home page search box.
 
-    The view:
-    - Fetches the player's career stats and calculates career per-game averages.
-    - Provides a dropdown form to select either Regular Season or Post Season stats by year.
-    - On form submission (POST), updates the chosen_stats table accordingly.
-    - Renders a page with the player's headshot, name, career totals, per-game averages,
-      and a selected seasonal breakdown if requested.
+    Query parameters:
+    - q: the text typed so far.
+    - limit: maximum number of suggestions (default 10, at most AUTOCOMPLETE_MAX_RESULTS).
+
+    Suggestions come from the precomputed player search index, so no upstream calls are made.
+    The static player list only changes on deploy, so responses may be cached publicly.
     """
-    # Retrieve comprehensive career stats
-    career = playercareerstats.PlayerCareerStats(player_id=player_id)
-    career_dict = career.get_normalized_dict()
-    career_stats = career_dict['CareerTotalsRegularSeason'][0] if career_dict['CareerTotalsRegularSeason'] else None
+    query = request.GET.get('q', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), AUTOCOMPLETE_MAX_RESULTS)
+    except ValueError:
+        limit = 10
 
-    # Get player's display name and headshot image
-    player_name, headshot_url = get_player_name_and_image(player_id)
+    results = [
+        {'id': player['id'], 'name': player['full_name'], 'is_active': player['is_active']}
+        for player in complete_players(query, limit=limit)
+    ]
+    return JsonResponse({'query': query, 'results': results})
 
-    dropdown_form = StatsDropdownForm()
 
-    # Compute career per-game averages if career_stats are available
-    if career_stats and career_stats.get('GP', 0) > 0:
-        gp = career_stats.get('GP', 0) or 0
-        pts = career_stats.get('PTS', 0) or 0
-        reb = career_stats.get('REB', 0) or 0
-        ast = career_stats.get('AST', 0) or 0
-        stl = career_stats.get('STL', 0) or 0
-        blk = career_stats.get('BLK', 0) or 0
-
-        pts_pg = round(pts / gp, 2) if gp > 0 else 0
-        reb_pg = round(reb / gp, 2) if gp > 0 else 0
-        ast_pg = round(ast / gp, 2) if gp > 0 else 0
-        stl_pg = round(stl / gp, 2) if gp > 0 else 0
-        blk_pg = round(blk / gp, 2) if gp > 0 else 0
-    else:
-        pts_pg = reb_pg = ast_pg = stl_pg = blk_pg = 0
+def build_player_context(request, player_id, career_dict, player_name, headshot_url):
+    """
+    Build the player_details template context from already fetched data.
+
+    Calculates career per-game averages and, if the dropdown form was submitted (POST),
+    the selected Regular Season or Post Season breakdown with per-season averages
+    (see nba_stats.stats). The fetched career_dict is not modified.
+    """
+    career_rows = with_averages(career_dict.get('CareerTotalsRegularSeason', []))
+    career_stats = career_rows[0] if career_rows else None
+
+    dropdown_form = StatsDropdownForm()
 
     chosen_stats = []
     chosen_title = None
+    chosen_table = None
 
-    # Process the dropdown form for selecting seasonal stats
+    # Process the dropdown form for selecting seasonal stats. The page's script loads season tables
+    # from season_table instead; this POST path is the fallback for browsers without JavaScript.
     if request.method == 'POST':
         dropdown_form = StatsDropdownForm(request.POST)
         if dropdown_form.is_valid():
-            option = dropdown_form.cleaned_data['option']
-            if option == 'Reg. Season':
-                chosen_stats = career_dict.get('SeasonTotalsRegularSeason', [])
-                chosen_title = "Regular Season"
-            elif option == 'Post Season':
-                chosen_stats = career_dict.get('SeasonTotalsPostSeason', [])
-                chosen_title = "Post Season"
-
-            # Compute per-game averages for the chosen stats
-            for season in chosen_stats:
-                gp_s = season.get('GP', 0) or 0
-                pts = season.get('PTS', 0) or 0
-                reb = season.get('REB', 0) or 0
-                ast = season.get('AST', 0) or 0
-                stl = season.get('STL', 0) or 0
-                blk = season.get('BLK', 0) or 0
-
-                if gp_s > 0:
-                    season['PPG'] = round(pts / gp_s, 2)
-                    season['RPG'] = round(reb / gp_s, 2)
-                    season['APG'] = round(ast / gp_s, 2)
-                    season['STLPG'] = round(stl / gp_s, 2)
-                    season['BLKPG'] = round(blk / gp_s, 2)
-                else:
-                    season['PPG'] = season['RPG'] = season['APG'] = season['STLPG'] = season['BLKPG'] = 0
-
-                if season['FG3_PCT'] is None:
-                    season['FG3_PCT'] = 0
+            chosen_table = DROPDOWN_SEASON_TABLES.get(dropdown_form.cleaned_data['option'])
+            if chosen_table:
+                result_set, chosen_title = SEASON_TABLES[chosen_table]
+                # Per-game averages for every season in one vectorized pass
+                chosen_stats = with_averages(career_dict.get(result_set, []))
 
-    context = {
+    return {
         'player_id': player_id,
         'player_name': player_name,
         'headshot_url': headshot_url,
+        'headshot': headshot_urls(player_id, headshot_url, 'page'),
         'career_stats': career_stats,
         'dropdown_form': dropdown_form,
-        'pts_pg': pts_pg,
-        'reb_pg': reb_pg,
-        'ast_pg': ast_pg,
-        'stl_pg': stl_pg,
-        'blk_pg': blk_pg,
+        'pts_pg': career_stats['PPG'] if career_stats else 0,
+        'reb_pg': career_stats['RPG'] if career_stats else 0,
+        'ast_pg': career_stats['APG'] if career_stats else 0,
+        'stl_pg': career_stats['STLPG'] if career_stats else 0,
+        'blk_pg': career_stats['BLKPG'] if career_stats else 0,
         'chosen_stats': chosen_stats,
-        'chosen_title': chosen_title
+        'chosen_title': chosen_title,
+        'chosen_table': chosen_table,
+        'season_table_urls': {
+            option: reverse('nba_stats:season_table', kwargs={'player_id': player_id, 'season_type': slug})
+            for option, slug in DROPDOWN_SEASON_TABLES.items()
+        },
+        'chart_url': reverse('nba_stats:career_chart', kwargs={'player_id': player_id, 'version': 'latest'}),
+        'plotly_js_url': PLOTLY_JS_URL,
     }
 
-    return render(request, 'nba_stats/player_details.html', context)
+
+def player_details(request, player_id):
+    """
+    Show detailed stats for a particular player, identified by player_id.
+
+    The view:
+    - Fetches the player's career stats and calculates career per-game averages.
+    - Provides a dropdown form to select either Regular Season or Post Season stats by year.
+    - On form submission (POST), updates the chosen_stats table accordingly.
+    - Renders a page with the player's headshot, name, career totals, per-game averages,
+      and a selected seasonal breakdown if requested.
+
+    GET responses carry an ETag/Last-Modified derived from when the stored stats and headshot were
+    fetched, so a repeat visit is answered with a 304 without rendering while the data is fresh.
+    """
+    # Count the view (buffered in memory) so popular players are kept warm by the warm_cache command,
+    # including repeat visits answered with a 304 below
+    record_view(player_id)
+
+    validators = player_page_validators(request, player_id) if request.method == 'GET' else None
+    if validators:
+        response = not_modified(request, validators[0], validators[1])
+        if response is not None:
+            set_validators(response, validators[0], validators[1])
+            return player_page_cache_control(response, validators[2])
+
+    # Retrieve comprehensive career stats (served from the career stats cache when fresh)
+    try:
+        with phase('career'):
+            career_dict = get_career_stats(player_id)
+    except UpstreamError as e:
+        # The API is down and nothing is stored for this player; render the page without stats
+        logger.warning("Career stats for player %s unavailable: %r", player_id, e)
+        career_dict = {}
+
+    # Get player's display name and headshot image
+    with phase('headshot'):
+        player_name, headshot_url = get_player_name_and_image(player_id)
+
+    with phase('render'):
+        context = build_player_context(request, player_id, career_dict, player_name, headshot_url)
+        response = render(request, 'nba_stats/player_details.html', context)
+    if request.method != 'GET':
+        return response
+
+    # The stats may have just been fetched, in which case the page now has a version to validate against
+    validators = validators or player_page_validators(request, player_id)
+    if validators is None:
+        # Rendered from expired data that is being refreshed; don't let caches keep it
+        return player_page_cache_control(response, 0)
+    etag, last_modified, max_age = validators
+    set_validators(response, etag, last_modified)
+    return player_page_cache_control(response, max_age)
+
+
+@require_GET
+def season_table(request, player_id, season_type):
+    """
+    Return one of a player's season-by-season tables ('regular' or 'post') with per-game averages,
+    as an HTML fragment (loaded into the player page by its dropdown) or, with ?format=json, as JSON.
+
+    While the stored stats are fresh, the rendered fragment and the computed rows are cached per
+    version of the stats, and responses carry an ETag so repeat requests get a 304. Switching tables
+    therefore costs a version lookup and a cache hit instead of a full page rebuild.
+    """
+    if season_type not in SEASON_TABLES:
+        raise Http404("Unknown season type")
+    result_set, title = SEASON_TABLES[season_type]
+    as_json = request.GET.get('format') == 'json'
+
+    version = fresh_stats_version(player_id)
+    if version is not None:
+        etag = make_etag('seasons', player_id, season_type, version, as_json)
+        response = not_modified(request, etag, None)
+        if response is not None:
+            return fragment_cache_control(response, player_max_age(player_id, version))
+
+    def load_seasons():
+        try:
+            career_dict = get_career_stats(player_id)
+        except UpstreamError as e:
+            logger.warning("Season stats for player %s unavailable: %r", player_id, e)
+            career_dict = {}
+        return with_averages(career_dict.get(result_set, []))
+
+    if as_json:
+        if version is None:
+            seasons = load_seasons()
+        else:
+            key = f'nba_stats:seasons:{player_id}:{season_type}:{version}'
+            seasons = caches['default'].get_or_set(key, load_seasons, SEASON_TABLE_CACHE_SECONDS)
+        response = JsonResponse({'player_id': player_id, 'season_type': season_type, 'title': title, 'seasons': seasons})
+    else:
+        # The template only calls load_seasons when the fragment is not already cached
+        response = render(request, 'nba_stats/season_table.html', {
+            'player_id': player_id,
+            'season_type': season_type,
+            'title': title,
+            'seasons': load_seasons,
+            'version': version or '',
+            'fragment_timeout': SEASON_TABLE_CACHE_SECONDS if version is not None else 0,
+        })
+
+    if version is None:
+        # Built from data that was missing or expired; don't let caches keep it
+        return fragment_cache_control(response, 0)
+    response['ETag'] = etag
+    return fragment_cache_control(response, player_max_age(player_id, version))
+
+
+@require_GET
+def career_chart(request, player_id, version):
+    """
+    Serve a player's career trajectory chart as Plotly figure JSON (see nba_stats.charts).
+
+    `version` identifies the career stats the chart was built from, so a versioned URL's content never
+    changes and responses are cached as immutable. The player page requests 'latest', which redirects
+    to the current version and may be reused for as long as the stored stats stay fresh. While the
+    stats are missing or expired, the chart is built from whatever is available and not cached.
+    """
+    stats_version = fresh_stats_version(player_id)
+    current = chart_version(player_id, stats_version)
+    if current is not None and version != current:
+        response = redirect('nba_stats:career_chart', player_id=player_id, version=current)
+        return fragment_cache_control(response, player_max_age(player_id, stats_version))
+
+    with phase('chart'):
+        chart = get_chart(player_id, current)
+    response = HttpResponse(chart, content_type='application/json')
+    if current is None:
+        return fragment_cache_control(response, 0)
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+async def fetch_with_timeout(func, player_id, timeout):
+    """Run a blocking upstream fetch in a worker thread, giving up after `timeout` seconds."""
+    return await asyncio.wait_for(sync_to_async(func, thread_sensitive=False)(player_id), timeout)
+
+
+async def player_details_async(request, player_id):
+    """
+    Async variant of player_details.
+
+    Cached data is read first, and recently expired data is served while it is refreshed in the
+    background; whatever is missing (career stats, CommonPlayerInfo name, nba.com headshot) is then
+    fetched concurrently, each call with its own timeout, so the
+    page waits for the slowest call instead of the sum of all three. Calls that fail or time
+    out are left out and the page is rendered with whatever arrived.
+    """
+    timeout = settings.NBA_STATS_UPSTREAM_TIMEOUT
+
+    record_view(player_id)
+    stale = await sync_to_async(get_stale_entry)(player_id)
+    career_dict = stale['data'] if is_usable(stale, player_id) else None
+    headshot = await PlayerHeadShot.objects.filter(player_id=player_id).afirst()
+
+    # Only go upstream for the pieces that are missing or stale (and never when offline).
+    # Recently expired data is served as-is and refreshed in the background instead.
+    fetches = {}
+    offline = is_offline()
+    if career_dict is None and not offline:
+        if is_servable_stale(stale, player_id):
+            career_dict = stale['data']
+            revalidate_career_stats(player_id)
+        else:
+            fetches['career'] = fetch_career_stats
+    if needs_refresh(headshot) and not offline:
+        if headshot is not None:
+            player_revalidator.schedule(('headshot', player_id), refresh_player_name_and_image, player_id)
+        else:
+            fetches['name'] = fetch_player_name
+            fetches['headshot'] = fetch_player_headshot_url
+
+    results = await asyncio.gather(
+        *(fetch_with_timeout(func, player_id, timeout) for func in fetches.values()),
+        return_exceptions=True
+    )
+    results = dict(zip(fetches, results))
+    for name, result in results.items():
+        if isinstance(result, BaseException):
+            logger.warning("Upstream %s fetch for player %s failed: %r", name, player_id, result)
+
+    def arrived(name):
+        return name in results and not isinstance(results[name], BaseException)
+
+    if arrived('career'):
+        career_dict = results['career']
+        await sync_to_async(store_career_stats)(player_id, career_dict)
+    elif 'career' in results and stale is not None:
+        # Serve expired data rather than an empty page while the API is failing
+        career_dict = stale['data']
+
+    if arrived('name') and arrived('headshot'):
+        headshot = await sync_to_async(store_player_name_and_image)(player_id, results['name'], results['headshot'])
+
+    # Fall back to stored or static data for anything that did not arrive in time
+    if headshot is not None:
+        player_name, headshot_url = headshot.player_name, headshot.player_image_url
+    else:
+        player = find_player(player_id)
+        player_name = results['name'] if arrived('name') else (player['full_name'] if player else "Unknown Player")
+        headshot_url = (results['headshot'] if arrived('headshot') else None) or PLACEHOLDER_IMAGE_URL
+
+    context = build_player_context(request, player_id, career_dict or {}, player_name, headshot_url)
+
+    # Rendering touches request.user (a lazy database lookup), so it has to run in a sync thread
+    return await sync_to_async(render)(request, 'nba_stats/player_details.html', context)
+
+def load_api_entries(player_ids):
+    """
+    Load stored career stats for API requests without waiting on the NBA API. Expired entries are
+    still served, and refreshed in the background for next time.
+    """
+    entries = get_stale_entries(player_ids)
+    if not is_offline():
+        for player_id, entry in entries.items():
+            if not is_fresh(entry, player_id):
+                revalidate_career_stats(player_id)
+    return entries
+
+
+@require_GET
+@cache_control(public=True, max_age=300)
+def api_player(request, player_id):
+    """
+    Read-only JSON stats for one player, from the local career stats cache and stats store.
+
+    Query parameters:
+        fields: Comma-separated top-level fields (id, name, is_active, fetched_at, career,
+                career_postseason, seasons, seasons_postseason). Defaults to everything but the
+                season tables and post season totals.
+        stats: Comma-separated stat columns to keep in each row (e.g. PTS,PPG,FG_PCT).
+    """
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+        stats = parse_stats(request.GET.get('stats'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    entries = load_api_entries([player_id])
+    if player_id not in entries:
+        return JsonResponse({'error': f'No stored stats for player {player_id}'}, status=404)
+    return JsonResponse(serialize_players([player_id], entries, fields, stats)[0])
+
+
+@require_GET
+@cache_control(public=True, max_age=300)
+def api_players(request):
+    """
+    Read-only JSON stats for up to API_BATCH_LIMIT players at once (?ids=2544,201939,...).
+
+    Accepts the same fields and stats parameters as api_player. The whole batch is read with a
+    single cache query (plus one store lookup for players the cache does not hold). Players with no
+    stored stats are listed under 'missing'.
+    """
+    try:
+        player_ids = parse_ids(request.GET.get('ids'), API_BATCH_LIMIT)
+        fields = parse_fields(request.GET.get('fields'))
+        stats = parse_stats(request.GET.get('stats'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    entries = load_api_entries(player_ids)
+    found = [player_id for player_id in player_ids if player_id in entries]
+    return JsonResponse({
+        'players': serialize_players(found, entries, fields, stats),
+        'missing': [player_id for player_id in player_ids if player_id not in entries],
+    })
+
+
+@require_GET
+@cache_control(public=True, max_age=300)
+def api_compare(request):
+    """
+    Compare COMPARE_MIN to COMPARE_LIMIT players as JSON (?ids=2544,201939,...).
+
+    Query parameters:
+        season_type: 'regular' (default) or 'post'.
+        align: line season tables up by 'season' (default) or by 'year' of career.
+        stats: Comma-separated stats to build season-by-season tables for (default PPG,RPG,APG).
+
+    All players are loaded in one batch, with any missing from the local data fetched concurrently.
+    """
+    try:
+        options = parse_compare_options(request.GET)
+        stats = parse_stats(request.GET.get('stats')) or ['PPG', 'RPG', 'APG']
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse(build_comparison(stats=stats, **options))
+
+
+@require_GET
+def export_stats(request):
+    """
+    Stream an export of the local stats store.
+
+    Query parameters:
+        table: 'seasons' (season-by-season rows, the default) or 'career' (career totals).
+        season_type: 'RegularSeason' or 'PostSeason' (default: both).
+        ids: Optional comma-separated player IDs (default: every stored player).
+        format: 'csv' (the default) or, where pyarrow is installed, 'parquet'.
+
+    Rows are read with a chunked iterator and written as they are produced, so memory use does
+    not grow with the size of the export. Parquet files are built in a temporary file first.
+    """
+    table = request.GET.get('table', 'seasons')
+    season_type = request.GET.get('season_type', '')
+    export_format = request.GET.get('format', 'csv')
+    if table not in EXPORT_TABLES or not valid_season_type(season_type):
+        return JsonResponse({'error': "table must be 'seasons' or 'career', season_type 'RegularSeason' or 'PostSeason'."},
+                            status=400)
+    if export_format not in export_formats():
+        return JsonResponse({'error': f"format must be one of: {', '.join(export_formats())}."}, status=400)
+    player_ids = None
+    if request.GET.get('ids'):
+        try:
+            player_ids = parse_ids(request.GET['ids'], limit=float('inf'))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+    filename = f'nba_{table}{"_" + season_type if season_type else ""}.{export_format}'
+    if export_format == 'parquet':
+        handle = parquet_file(table, player_ids=player_ids, season_type=season_type or None)
+        return FileResponse(handle, as_attachment=True, filename=filename, content_type='application/vnd.apache.parquet')
+
+    response = StreamingHttpResponse(
+        iter_csv(table, player_ids=player_ids, season_type=season_type or None),
+        content_type='text/csv',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@require_GET
+def headshot_image(request, player_id, version, size, ext):
+    """
+    Serve a locally stored, resized headshot (see nba_stats.images).
+
+    `version` identifies the source image, so a URL's content never changes and responses are
+    cached as immutable. The source is downloaded and resized on the first request for it. If the
+    player's headshot has changed since the page was rendered, redirect to the current version;
+    if the download fails, serve the placeholder with a short cache lifetime.
+    """
+    if size not in SIZES or ext not in FORMATS:
+        raise Http404("Unknown image variant")
+    content_type = FORMATS[ext][1]
+    cache_control_header = 'public, max-age=31536000, immutable'
+
+    if version == PLACEHOLDER_VERSION:
+        path = ensure_placeholder(size, ext)
+    else:
+        headshot = PlayerHeadShot.objects.filter(player_id=player_id).values('player_image_url', 'is_placeholder').first()
+        current = source_version(headshot['player_image_url'], headshot['is_placeholder']) if headshot else PLACEHOLDER_VERSION
+        if current != version:
+            return redirect('nba_stats:headshot_image', player_id=player_id, version=current, size=size, ext=ext)
+        try:
+            path = ensure_variant(player_id, headshot['player_image_url'], size, ext)
+        except (UpstreamError, OSError) as e:
+            logger.warning("Headshot image for player %s unavailable: %r", player_id, e)
+            path = ensure_placeholder(size, ext)
+            cache_control_header = 'public, max-age=300'
+
+    response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response['Cache-Control'] = cache_control_header
+    return response
+
+
+@require_GET
+def metrics(request):
+    """
+    Serve this process's request timings, cache hit rates, database query counts and upstream counters
+    in Prometheus text format (see nba_stats.timing).
+
+    Readable by staff users, or by a scraper sending `Authorization: Bearer <NBA_STATS_TIMING['METRICS_TOKEN']>`;
+    anyone else gets a 403.
+    """
+    token = get_timing_setting('METRICS_TOKEN')
+    authorized = request.user.is_staff or (token and request.headers.get('Authorization') == f'Bearer {token}')
+    if not authorized:
+        raise PermissionDenied()
+    response = HttpResponse(prometheus_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@require_GET
+def compare(request):
+    """
+    Show several players side by side: career per-game averages and shooting, plus one stat season by
+    season, with the best value in each row highlighted.
+
+    Query parameters: ids (comma-separated player IDs), season_type ('regular' or 'post'), align ('season'
+    or 'year'), stat (see COMPARE_STATS), and add (a player name to search for and add to the comparison).
+    """
+    ids = [player_id for player_id in request.GET.get('ids', '').split(',') if player_id.strip()]
+
+    # Adding a player by name redirects to the comparison with their ID appended
+    name = request.GET.get('add', '').strip()
+    if name:
+        found = search_players(name, limit=1)
+        if found:
+            query = request.GET.copy()
+            query.pop('add')
+            query['ids'] = ','.join(ids + [str(found[0]['id'])])
+            return redirect(f"{reverse('nba_stats:compare')}?{query.urlencode(safe=',')}")
+
+    stat = request.GET.get('stat', 'PPG')
+    if stat not in COMPARE_STATS:
+        stat = 'PPG'
+    context = {
+        'ids': ','.join(ids),
+        'stat': stat,
+        'stats': COMPARE_STATS,
+        'decimals': stat_decimals(stat),
+        'season_types': {slug: title for slug, (_, _, title) in COMPARE_SEASON_TYPES.items()},
+        'season_type': request.GET.get('season_type', 'regular'),
+        'align': request.GET.get('align', 'season'),
+        'limit': COMPARE_LIMIT,
+        'error': f"No player found matching \"{name}\"." if name else None,
+    }
+    if len(ids) < COMPARE_MIN:
+        # Not enough players yet; show the form for adding them
+        return render(request, 'nba_stats/compare.html', context)
+
+    try:
+        options = parse_compare_options(request.GET)
+    except ValueError as e:
+        context['error'] = str(e)
+        return render(request, 'nba_stats/compare.html', context, status=400)
+
+    comparison = build_comparison(stats=[stat], **options)
+    for player in comparison['players']:
+        player['thumbnail'] = headshot_urls(player['id'], player['image_url'], 'thumb', player['is_placeholder'])
+        player['remove_ids'] = ','.join(str(other) for other in options['player_ids'] if other != player['id'])
+    for row in comparison['career']:
+        row['decimals'] = stat_decimals(row['stat'])
+    context.update(options)
+    context.update({
+        'players': comparison['players'],
+        'career': comparison['career'],
+        'seasons': comparison['seasons'][stat],
+        'season_title': COMPARE_SEASON_TYPES[options['season_type']][2],
+    })
+    return render(request, 'nba_stats/compare.html', context)
+
+
+def leaderboard(request):
+    """
+    Show a page of a precomputed league leaderboard.
+
+    Query parameters select the board: stat (see LEADERBOARD_STATS), scope ('career' or 'season'),
+    season_type ('RegularSeason' or 'PostSeason'), season (e.g. '2023-24', defaults to the latest)
+    and page. Rows come straight from the materialized LeaderboardEntry table.
+    """
+    stat = request.GET.get('stat', 'PPG')
+    if stat not in LEADERBOARD_STATS:
+        stat = 'PPG'
+    scope = 'season' if request.GET.get('scope') == 'season' else 'career'
+    season_type = 'PostSeason' if request.GET.get('season_type') == 'PostSeason' else 'RegularSeason'
+
+    seasons = available_seasons(season_type) if scope == 'season' else []
+    season_id = request.GET.get('season')
+    if season_id not in seasons:
+        season_id = seasons[0] if seasons else ''
+
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    entries, has_next = get_page(scope, season_type, season_id, stat, page, LEADERBOARD_PAGE_SIZE)
+
+    context = {
+        'entries': entries,
+        'stat': stat,
+        'stat_name': LEADERBOARD_STATS[stat],
+        'stats': LEADERBOARD_STATS,
+        'scope': scope,
+        'season_type': season_type,
+        'season_id': season_id,
+        'seasons': seasons,
+        'page': page,
+        'has_next': has_next,
+        # Percentages get 3 decimals, totals none, per-game averages 2
+        'decimals': 3 if stat.endswith('_PCT') else 0 if stat == 'PTS' else 2,
+    }
+    return render(request, 'nba_stats/leaderboard.html', context)
 
 @login_required
 def add_to_roster(request, player_id):
-    player_name, player_image_url = get_player_name_and_image(player_id)
+    # Name and image come from the local headshot store, so adding never waits on nba.com
+    player_name, player_image_url = get_local_player_name_and_image(player_id)
 
     user_profile = get_object_or_404(UserProfile, user=request.user)
 
-    # Check if player already in the user's roster
-    if Roster.objects.filter(user=user_profile, player_id=player_id).exists():
-        return JsonResponse({'status': 'error', 'message': 'Player already in roster'})
-
-    # Add player to roster
-    Roster.objects.create(
+    # Add player to roster in a single insert; the unique (user, player_id) index makes
+    # concurrent double-clicks fall back to fetching the existing row instead of duplicating it
+    _, created = Roster.objects.get_or_create(
         user=user_profile,
         player_id=player_id,
-        player_name=player_name,
-        player_image_url=player_image_url
+        defaults={'player_name': player_name, 'player_image_url': player_image_url}
     )
+    if not created:
+        return JsonResponse({'status': 'error', 'message': 'Player already in roster'})
+    UserProfile.objects.filter(pk=user_profile.pk).update(roster_modified=timezone.now())
 
     return JsonResponse({'status': 'success', 'message': f'{player_name} added to roster!'})
 
 @login_required
 def user_roster(request):
-    user_profile = get_object_or_404(UserProfile, user=request.user)
-    roster = user_profile.roster.all()
+    """
+    Show the user's roster with each player's current name, headshot and career per-game averages.
 
-    return render(request, 'nba_stats/roster.html', {'roster': roster})
+    Everything is loaded in two queries: the roster rows annotated with the latest PlayerHeadShot
+    name/image, and the regular season career totals of every rostered player. Per-game averages
+    are then computed for the whole roster in one vectorized pass. Repeat visits are answered with
+    a 304 until the roster or one of its players' stored data changes.
+    """
+    etag, last_modified = roster_page_validators(request)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+        return roster_cache_control(response)
+
+    headshots = PlayerHeadShot.objects.filter(player_id=OuterRef('player_id'))
+    roster = list(
+        Roster.objects.filter(user__user=request.user)
+        .annotate(
+            current_name=Subquery(headshots.values('player_name')[:1]),
+            current_image_url=Subquery(headshots.values('player_image_url')[:1]),
+        )
+        .order_by('id')
+    )
+
+    # Career totals for the whole roster in one query
+    totals = {
+        row['PLAYER_ID']: row
+        for row in CareerTotals.objects.filter(
+            player_id__in=[player.player_id for player in roster], season_type='RegularSeason'
+        ).values(PLAYER_ID=F('player_id'), GP=F('gp'), MIN=F('min'), PTS=F('pts'), REB=F('reb'), AST=F('ast'),
+                 STL=F('stl'), BLK=F('blk'), TOV=F('tov'), FGM=F('fgm'), FGA=F('fga'), FG3M=F('fg3m'),
+                 FG3A=F('fg3a'), FTM=F('ftm'), FTA=F('fta'))
+    }
+    averages = {row['PLAYER_ID']: row for row in with_averages(list(totals.values()))}
+
+    for player in roster:
+        # Prefer the latest stored metadata over the values saved when the player was added
+        player.player_name = player.current_name or player.player_name
+        player.player_image_url = player.current_image_url or player.player_image_url
+        player.thumbnail = headshot_urls(player.player_id, player.player_image_url, 'thumb')
+        player.averages = averages.get(player.player_id)
+
+    # The comparison page takes up to COMPARE_LIMIT players
+    compare_ids = ','.join(str(player.player_id) for player in roster[:COMPARE_LIMIT]) if len(roster) >= COMPARE_MIN else ''
+
+    with phase('render'):
+        response = render(request, 'nba_stats/roster.html', {'roster': roster, 'compare_ids': compare_ids})
+    set_validators(response, etag, last_modified)
+    return roster_cache_control(response)
 
 @login_required
 def remove_from_roster(request, player_id):
-    user_profile = get_object_or_404(UserProfile, user=request.user)
-    player = get_object_or_404(Roster, user=user_profile, player_id=player_id)
-
-    player.delete()
+    # Delete by (user, player_id) in one indexed statement
+    deleted, _ = Roster.objects.filter(user__user=request.user, player_id=player_id).delete()
+    if not deleted:
+        raise Http404("Player not in roster")
+    UserProfile.objects.filter(user=request.user).update(roster_modified=timezone.now())
     return redirect('nba_stats:roster')
\ No newline at end of file
@@ -0,0 +1,268 @@
+"""
+File: warm.py
+Description: Cache warming for player pages. Players on anyone's roster and the most viewed players are
+checked against the career stats cache and the PlayerHeadShot store, and whatever is missing or expired
+is fetched ahead of time with a bounded, rate limited worker pool, and career trajectory charts are built
+for the freshly stored stats. Used by the warm_cache command and by an optional in-process background worker.
+Page views are counted in memory and written to PlayerViewCount in periodic batches.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .charts import prebuild_chart
+from .cache import fetch_career_stats, get_backend, is_fresh, store_career_stats
+from .ingest import RateLimiter, run_ingest
+from .models import Player, PlayerHeadShot, PlayerViewCount, Roster
+from .revalidate import player_revalidator
+from .upstream import UpstreamError
+from .utils import fetch_player_name, fetch_player_headshot_url, needs_refresh, store_player_name_and_image
+
+logger = logging.getLogger(__name__)
+
+# Default warming configuration, overridable through settings.NBA_STATS_WARM
+DEFAULTS = {
+    'INTERVAL': 0,       # seconds between in-process warming runs; 0 disables the worker
+    'TOP_VIEWED': 100,   # number of most viewed players to keep warm
+    'WORKERS': 2,
+    'RATE': 0.5,         # upstream requests per second
+    'VIEW_FLUSH_INTERVAL': 60,  # seconds page views are buffered in memory before being written
+}
+
+
+def get_setting(name):
+    """Return a warming setting, falling back to DEFAULTS."""
+    return getattr(settings, 'NBA_STATS_WARM', {}).get(name, DEFAULTS[name])
+
+
+class ViewBuffer:
+    """
+    Page views counted in memory since the last flush, so recording a view costs no database write.
+    Each process keeps its own buffer; views not yet flushed when a process exits are lost.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.last_viewed = {}
+        self.flushed_at = time.monotonic()
+
+    def add(self, player_id):
+        """Count one view. Returns True if the buffer is due to be flushed."""
+        with self.lock:
+            self.counts[player_id] += 1
+            self.last_viewed[player_id] = timezone.now()
+            return time.monotonic() - self.flushed_at >= get_setting('VIEW_FLUSH_INTERVAL')
+
+    def take(self):
+        """Empty the buffer, returning its view counts and last view times."""
+        with self.lock:
+            counts, last_viewed = self.counts, self.last_viewed
+            self.counts, self.last_viewed = Counter(), {}
+            self.flushed_at = time.monotonic()
+            return counts, last_viewed
+
+
+view_buffer = ViewBuffer()
+
+
+def record_view(player_id):
+    """Add one to a player's page view tally, flushing the buffered tallies in the background when due."""
+    if view_buffer.add(player_id):
+        player_revalidator.schedule(('views',), flush_views)
+
+
+def flush_views():
+    """
+    Write the buffered page views to PlayerViewCount: one insert for players without a row, then one
+    update per player.
+
+    Returns:
+        int: The number of players whose tally was updated.
+    """
+    counts, last_viewed = view_buffer.take()
+    if not counts:
+        return 0
+    with transaction.atomic():
+        PlayerViewCount.objects.bulk_create(
+            [PlayerViewCount(player_id=player_id, views=0) for player_id in counts], ignore_conflicts=True
+        )
+        for player_id, views in counts.items():
+            PlayerViewCount.objects.filter(player_id=player_id).update(
+                views=F('views') + views, last_viewed=last_viewed[player_id]
+            )
+    return len(counts)
+
+
+def select_targets(top_viewed, include_rosters=True):
+    """
+    Return the player IDs worth keeping warm: the `top_viewed` most viewed players, then every
+    rostered player not already included.
+    """
+    player_ids = list(
+        PlayerViewCount.objects.order_by('-views', 'player_id').values_list('player_id', flat=True)[:top_viewed]
+    )
+    if include_rosters:
+        seen = set(player_ids)
+        for player_id in Roster.objects.order_by('player_id').values_list('player_id', flat=True).distinct():
+            if player_id not in seen:
+                seen.add(player_id)
+                player_ids.append(player_id)
+    return player_ids
+
+
+def find_cold(player_ids):
+    """
+    Work out what each player is missing locally.
+
+    Career stats are warm if the cache holds a fresh entry or the local stats store holds a fresh
+    snapshot; the name/headshot is warm if its PlayerHeadShot row does not need refreshing.
+
+    Returns:
+        dict: Maps player_id to a (needs_career, needs_headshot) tuple, for every player in player_ids.
+    """
+    snapshots = dict(Player.objects.filter(player_id__in=player_ids, fetched_at__isnull=False)
+                     .values_list('player_id', 'fetched_at'))
+    headshots = PlayerHeadShot.objects.in_bulk(player_ids)
+    entries = get_backend().get_many(player_ids)
+
+    cold = {}
+    for player_id in player_ids:
+        snapshot = snapshots.get(player_id)
+        career_warm = is_fresh(entries.get(player_id), player_id) or (
+            snapshot is not None and is_fresh({'fetched_at': snapshot.timestamp()}, player_id)
+        )
+        cold[player_id] = (not career_warm, needs_refresh(headshots.get(player_id)))
+    return cold
+
+
+def hit_rates(player_ids):
+    """
+    Measure how many of the given players a page view could be served for without upstream calls.
+
+    Returns:
+        dict: 'players', fractions 'career' and 'headshot' warm, 'page' (both warm), and 'weighted',
+              the page hit rate weighted by each player's view count.
+    """
+    if not player_ids:
+        return {'players': 0, 'career': 0.0, 'headshot': 0.0, 'page': 0.0, 'weighted': 0.0}
+
+    cold = find_cold(player_ids)
+    views = dict(PlayerViewCount.objects.filter(player_id__in=player_ids).values_list('player_id', 'views'))
+    total = len(player_ids)
+    page_warm = [player_id for player_id, needs in cold.items() if not any(needs)]
+    total_views = sum(views.get(player_id, 0) for player_id in player_ids)
+    warm_views = sum(views.get(player_id, 0) for player_id in page_warm)
+    return {
+        'players': total,
+        'career': sum(not needs[0] for needs in cold.values()) / total,
+        'headshot': sum(not needs[1] for needs in cold.values()) / total,
+        'page': len(page_warm) / total,
+        'weighted': warm_views / total_views if total_views else len(page_warm) / total,
+    }
+
+
+def warm(player_ids, workers=None, rate=None, on_progress=None):
+    """
+    Fetch and store whatever the given players are missing locally.
+
+    Fetches run through run_ingest, so they use a bounded pool of `workers` threads while results are
+    stored from the calling thread. Every upstream call (a player may need up to three) is throttled
+    to `rate` requests per second overall. Career stats and the name/headshot are fetched and stored
+    independently, so one failing does not discard the other.
+
+    Returns:
+        dict: 'before' and 'after' hit_rates(), plus the number of players 'fetched' (at least partly)
+              and 'failed' (nothing could be fetched).
+    """
+    workers = workers or get_setting('WORKERS')
+    rate = get_setting('RATE') if rate is None else rate
+
+    before = hit_rates(player_ids)
+    cold = {player_id: needs for player_id, needs in find_cold(player_ids).items() if any(needs)}
+
+    limiter = RateLimiter(rate)
+
+    def fetch(player_id):
+        needs_career, needs_headshot = cold[player_id]
+        result, errors = {}, []
+        if needs_career:
+            limiter.acquire()
+            try:
+                result['career'] = fetch_career_stats(player_id)
+            except UpstreamError as e:
+                errors.append(e)
+        if needs_headshot:
+            try:
+                limiter.acquire()
+                name = fetch_player_name(player_id)
+                limiter.acquire()
+                result['headshot'] = (name, fetch_player_headshot_url(player_id))
+            except UpstreamError as e:
+                errors.append(e)
+        if errors and not result:
+            raise errors[0]
+        for error in errors:
+            logger.warning("Warming player %s partly failed: %r", player_id, error)
+        return result
+
+    def save(player_id, result):
+        if 'career' in result:
+            store_career_stats(player_id, result['career'])
+            prebuild_chart(player_id)
+        if 'headshot' in result:
+            store_player_name_and_image(player_id, *result['headshot'])
+
+    # The limiter above throttles each upstream call, so run_ingest itself is not rate limited
+    fetched, failed = run_ingest(list(cold), fetch=fetch, save=save, workers=workers, rate=0,
+                                 on_progress=on_progress)
+    return {'before': before, 'after': hit_rates(player_ids), 'fetched': fetched, 'failed': failed}
+
+
+def warm_popular(top_viewed=None, include_rosters=True, **kwargs):
+    """Warm the most viewed and rostered players. Takes the same keyword arguments as warm()."""
+    # Rank players on up-to-date view counts
+    flush_views()
+    top_viewed = get_setting('TOP_VIEWED') if top_viewed is None else top_viewed
+    return warm(select_targets(top_viewed, include_rosters), **kwargs)
+
+
+_worker = None
+
+
+def start_worker(interval=None):
+    """
+    Start a daemon thread that calls warm_popular() every `interval` seconds (default
+    NBA_STATS_WARM['INTERVAL']). Does nothing if the interval is 0 or a worker is already running.
+
+    Returns:
+        threading.Thread or None: The worker thread.
+    """
+    global _worker
+    interval = get_setting('INTERVAL') if interval is None else interval
+    if not interval or _worker is not None:
+        return _worker
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                report = warm_popular()
+                logger.info("Warmed %s players (%s failed); page hit rate %.0f%% -> %.0f%%",
+                            report['fetched'], report['failed'],
+                            report['before']['page'] * 100, report['after']['page'] * 100)
+            except Exception:
+                logger.exception("Cache warming run failed")
+            finally:
+                connections.close_all()
+
+    _worker = threading.Thread(target=loop, name='nba-stats-warm', daemon=True)
+    _worker.start()
+    return _worker